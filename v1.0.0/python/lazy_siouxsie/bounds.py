@@ -0,0 +1,239 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tight bounds of the turntable set, computed from the actual world space points.
+
+Points are pulled in bulk, one OpenMaya call per shape, straight into NumPy arrays, and worked on there: an axis
+aligned box, an oriented box (PCA) and a near minimal bounding sphere.  Dense assets can be decimated to a point
+budget so the cost stays predictable; the outermost points are always kept, so framing never loses the silhouette.
+Without NumPy only the axis aligned box is exact; the oriented box falls back to the axis aligned one and the sphere
+to the box's circumscribed sphere.
+"""
+
+import math
+from maya import cmds
+import maya.api.OpenMaya as om
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Upper bound of points used for the oriented box and to find the sphere.  The axis aligned box always uses every
+# point, and so does the sphere's radius.
+MAX_POINTS = 200000
+SPHERE_ITERATIONS = 200
+# Directions the outermost points are looked for along, besides the six axes, when points are decimated
+EXTREME_DIRECTIONS = 128
+# Upper bound of the point by direction products worked on at once
+CHUNK_SIZE = 2000000
+
+
+class Bounds(object):
+    """
+    Axis aligned box, oriented box and bounding sphere of a point set.
+    """
+
+    def __init__(self, aabb=None, obb_center=None, obb_axes=None, obb_extents=None, sphere_center=None,
+                 sphere_radius=0.0, points=None):
+        # [x_min, y_min, z_min, x_max, y_max, z_max], the same layout as xform -q -bb
+        self.aabb = aabb
+        self.obb_center = obb_center
+        # Rows are the box axes, obb_extents the half sizes along them.
+        self.obb_axes = obb_axes
+        self.obb_extents = obb_extents
+        self.sphere_center = sphere_center
+        self.sphere_radius = sphere_radius
+        # The (possibly decimated) points the box and sphere came from, plus the outermost ones, kept for framing.
+        self.points = points
+
+    @property
+    def center(self):
+        return [(self.aabb[i] + self.aabb[i + 3]) / 2.0 for i in range(3)]
+
+    @property
+    def size(self):
+        return [self.aabb[i + 3] - self.aabb[i] for i in range(3)]
+
+
+def renderable_shapes(nodes):
+    """
+    The non intermediate mesh and NURBS surface shapes under a set of nodes.
+    """
+    shapes = cmds.listRelatives(nodes, allDescendents=True, fullPath=True, type=['mesh', 'nurbsSurface']) or []
+    if not shapes:
+        return []
+    return cmds.ls(shapes, long=True, noIntermediate=True) or []
+
+
+def shape_points(shape):
+    """
+    World space points (or CVs) of a shape as an MPointArray, from a single API call.
+    """
+    selection = om.MSelectionList()
+    selection.add(shape)
+    dag_path = selection.getDagPath(0)
+    if dag_path.apiType() == om.MFn.kNurbsSurface:
+        return om.MFnNurbsSurface(dag_path).cvPositions(om.MSpace.kWorld)
+    return om.MFnMesh(dag_path).getPoints(om.MSpace.kWorld)
+
+
+def scene_bounds(nodes, max_points=MAX_POINTS):
+    """
+    Bounds of every renderable shape under nodes.
+    """
+    shapes = [points for points in (shape_points(shape) for shape in renderable_shapes(nodes)) if len(points)]
+    if not shapes:
+        raise ValueError('No renderable geometry found under %s' % nodes)
+    if numpy is None:
+        flat = []
+        for points in shapes:
+            for point in points:
+                flat.extend((point.x, point.y, point.z))
+        return _python_bounds(flat)
+    # MPoints are (x, y, z, w)
+    points = numpy.concatenate([numpy.array(points, dtype=numpy.float64)[:, :3] for points in shapes])
+    return compute_bounds(points, max_points=max_points)
+
+
+def compute_bounds(points, max_points=MAX_POINTS):
+    """
+    Bounds of an (N, 3) array of points.
+    """
+    aabb = list(points.min(axis=0)) + list(points.max(axis=0))
+    sample = decimate(points, max_points)
+    obb_center, obb_axes, obb_extents = oriented_box(sample)
+    sphere_center, sphere_radius = bounding_sphere(sample)
+    framing_points = sample
+    if len(sample) < len(points):
+        # The sphere was found from the sample; grow it to take in every point the sample skipped.
+        sphere_radius = max(sphere_radius, float(numpy.sqrt(((points - sphere_center) ** 2).sum(axis=1).max())))
+        # And frame the outline of every point, not just of the sample.
+        framing_points = numpy.concatenate([sample, extreme_points(points)])
+    return Bounds(aabb=[float(v) for v in aabb], obb_center=obb_center, obb_axes=obb_axes,
+                  obb_extents=obb_extents, sphere_center=sphere_center, sphere_radius=sphere_radius,
+                  points=framing_points)
+
+
+def decimate(points, max_points=MAX_POINTS):
+    if not max_points or len(points) <= max_points:
+        return points
+    step = int(math.ceil(len(points) / float(max_points)))
+    return points[::step]
+
+
+def extreme_points(points, directions=EXTREME_DIRECTIONS):
+    """
+    The points furthest out along the six axes and along evenly spread directions: the outline of the points, which
+    is what a camera has to keep in frame.
+    """
+    vectors = numpy.vstack([numpy.identity(3), -numpy.identity(3), sphere_directions(directions)])
+    # The outline of a sample first.  A point inside the largest ellipsoid (shaped like the sample's box) that fits
+    # in that outline can't be further out than it along any direction, so only the points past it are looked at.
+    probe = decimate(points, MAX_POINTS)
+    reach, index = _furthest(probe, vectors)
+    middle = (probe.min(axis=0) + probe.max(axis=0)) / 2.0
+    scale = numpy.maximum((probe.max(axis=0) - probe.min(axis=0)) / 2.0, 1e-9)
+    inner = max(float(((reach - vectors.dot(middle)) / numpy.sqrt(((vectors * scale) ** 2).sum(axis=1))).min()), 0.0)
+    outside = points[(((points - middle) / scale) ** 2).sum(axis=1) > inner * inner]
+    candidates = numpy.concatenate([probe[index], outside])
+    return candidates[_furthest(candidates, vectors)[1]]
+
+
+def _furthest(points, vectors):
+    """
+    How far out the points reach along each of vectors, and the (unique) indices of the points that do.
+    """
+    reach = numpy.full(len(vectors), -numpy.inf)
+    index = numpy.zeros(len(vectors), dtype=numpy.int64)
+    rows = numpy.arange(len(vectors))
+    chunk = max(CHUNK_SIZE // len(vectors), 1)
+    for i in range(0, len(points), chunk):
+        # Vectors by points, so each row's maximum is a contiguous scan
+        products = vectors.dot(points[i:i + chunk].T)
+        columns = products.argmax(axis=1)
+        values = products[rows, columns]
+        further = values > reach
+        reach[further] = values[further]
+        index[further] = columns[further] + i
+    return reach, numpy.unique(index)
+
+
+def sphere_directions(count):
+    """
+    count unit vectors spread evenly over the sphere (a Fibonacci lattice).
+    """
+    i = numpy.arange(count) + 0.5
+    y = 1.0 - 2.0 * i / count
+    r = numpy.sqrt(1.0 - y * y)
+    theta = math.pi * (1.0 + math.sqrt(5.0)) * i
+    return numpy.column_stack([r * numpy.cos(theta), y, r * numpy.sin(theta)])
+
+
+def oriented_box(points):
+    """
+    PCA oriented box.  Returns center, axes (rows) and half extents.
+    """
+    mean = points.mean(axis=0)
+    if len(points) < 3:
+        axes = numpy.identity(3)
+    else:
+        covariance = numpy.cov((points - mean).T)
+        axes = numpy.linalg.eigh(covariance)[1].T
+    local = (points - mean).dot(axes.T)
+    low = local.min(axis=0)
+    high = local.max(axis=0)
+    center = mean + ((low + high) / 2.0).dot(axes)
+    return center, axes, (high - low) / 2.0
+
+
+def bounding_sphere(points, iterations=SPHERE_ITERATIONS):
+    """
+    Near minimal bounding sphere of points.  Ritter's sphere is the starting guess, then Badoiu-Clarkson iterations
+    walk the center towards the minimal one.  The radius always encloses every point given.
+    """
+    # Ritter: start from a far pair of points, then grow to take in stragglers.
+    p = points[0]
+    q = points[numpy.argmax(((points - p) ** 2).sum(axis=1))]
+    r = points[numpy.argmax(((points - q) ** 2).sum(axis=1))]
+    center = (q + r) / 2.0
+    radius = numpy.sqrt(((r - q) ** 2).sum()) / 2.0
+    distances = numpy.sqrt(((points - center) ** 2).sum(axis=1))
+    while distances.max() > radius * (1.0 + 1e-9):
+        far = numpy.argmax(distances)
+        new_radius = (radius + distances[far]) / 2.0
+        center = center + (points[far] - center) * ((new_radius - radius) / distances[far])
+        radius = new_radius
+        distances = numpy.sqrt(((points - center) ** 2).sum(axis=1))
+    best_center, best_radius = center, float(distances.max())
+
+    # Badoiu-Clarkson
+    center = best_center.copy()
+    for i in range(1, iterations + 1):
+        distances = ((points - center) ** 2).sum(axis=1)
+        center = center + (points[numpy.argmax(distances)] - center) / (i + 1.0)
+    radius = float(numpy.sqrt(((points - center) ** 2).sum(axis=1).max()))
+    if radius < best_radius:
+        best_center, best_radius = center, radius
+    return best_center, best_radius
+
+
+def _python_bounds(flat):
+    xs = flat[0::3]
+    ys = flat[1::3]
+    zs = flat[2::3]
+    aabb = [min(xs), min(ys), min(zs), max(xs), max(ys), max(zs)]
+    center = [(aabb[i] + aabb[i + 3]) / 2.0 for i in range(3)]
+    extents = [(aabb[i + 3] - aabb[i]) / 2.0 for i in range(3)]
+    radius = math.sqrt(sum(e * e for e in extents))
+    axes = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    return Bounds(aabb=aabb, obb_center=center, obb_axes=axes, obb_extents=extents, sphere_center=center,
+                  sphere_radius=radius, points=None)
@@ -0,0 +1,157 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Runs the turntable build as a list of stages on Maya's main thread.
+
+Every stage is scheduled with maya.utils.executeDeferred, so Maya gets to process its event loop between stages:
+the UI repaints, progress is real, and the artist can cancel.  Stages register rollback actions as they go.  A
+cancel, or a stage that raises, plays them back in reverse order.  Past the point of no return only the actions the
+stages after it registered are played back, and the built scene is kept.
+"""
+
+import sgtk
+import maya.utils
+
+from sgtk.platform.qt import QtCore
+logger = sgtk.platform.get_logger(__name__)
+
+
+class BuildAborted(Exception):
+    """
+    Raised by a stage to stop the build on purpose.  The message is shown to the artist.
+    """
+    pass
+
+
+class BuildStage(object):
+    """
+    One step of the build.  Once a stage that isn't cancellable has started, the build can no longer be cancelled.
+    """
+
+    def __init__(self, name=None, function=None, weight=1, cancellable=True):
+        self.name = name
+        self.function = function
+        self.weight = weight
+        self.cancellable = cancellable
+
+
+class BuildExecutor(QtCore.QObject):
+    """
+    Deferred, cancellable stage runner.
+    """
+    # percent, stage name
+    progress = QtCore.Signal(int, str)
+    finished = QtCore.Signal()
+    cancelled = QtCore.Signal()
+    failed = QtCore.Signal(str)
+
+    def __init__(self, stages=None, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.stages = stages or []
+        self._next = 0
+        self._running = False
+        self._cancel_requested = False
+        self._committed = False
+        self._rollback = []
+        # How many rollback actions were registered before the build was committed
+        self._commit_mark = 0
+        self._total_weight = float(sum(stage.weight for stage in self.stages)) or 1.0
+        self._done_weight = 0
+
+    def start(self):
+        self._next = 0
+        self._done_weight = 0
+        self._running = True
+        self._cancel_requested = False
+        self._committed = False
+        self._rollback = []
+        self._commit_mark = 0
+        self._announce()
+        maya.utils.executeDeferred(self._run_next)
+
+    def is_running(self):
+        return self._running
+
+    def can_cancel(self):
+        return self._running and not self._committed
+
+    def is_committed(self):
+        """
+        True once a stage that can't be cancelled has started.  A build that fails after that keeps what was built
+        before it.
+        """
+        return self._committed
+
+    def cancel(self):
+        """
+        Asks the build to stop at the next stage boundary.  Returns False if it is past the point of no return.
+        """
+        if not self.can_cancel():
+            return False
+        self._cancel_requested = True
+        return True
+
+    def on_rollback(self, action):
+        """
+        Registers a callable that undoes something a stage did.
+        """
+        self._rollback.append(action)
+
+    def _announce(self):
+        percent = int(100 * self._done_weight / self._total_weight)
+        if self._next < len(self.stages):
+            self.progress.emit(percent, self.stages[self._next].name)
+        else:
+            self.progress.emit(100, 'Done!')
+
+    def _run_next(self):
+        if not self._running:
+            return
+        if self._cancel_requested:
+            logger.info('Turntable build cancelled.')
+            self._roll_back()
+            self._running = False
+            self.cancelled.emit()
+            return
+
+        stage = self.stages[self._next]
+        if not stage.cancellable and not self._committed:
+            self._committed = True
+            self._commit_mark = len(self._rollback)
+        logger.debug('Build stage: %s' % stage.name)
+        try:
+            stage.function()
+        except Exception as e:
+            if isinstance(e, BuildAborted):
+                logger.warning('Turntable build stopped: %s' % e)
+            else:
+                logger.exception('Turntable build failed during "%s"' % stage.name)
+            self._roll_back(self._commit_mark if self._committed else 0)
+            self._running = False
+            self.failed.emit(str(e))
+            return
+
+        self._done_weight += stage.weight
+        self._next += 1
+        self._announce()
+        if self._next < len(self.stages):
+            maya.utils.executeDeferred(self._run_next)
+        else:
+            self._running = False
+            self.finished.emit()
+
+    def _roll_back(self, keep=0):
+        while len(self._rollback) > keep:
+            action = self._rollback.pop()
+            try:
+                action()
+            except Exception as e:
+                logger.error('Rollback step failed: %s' % e)
@@ -0,0 +1,360 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Farm cost model for turntables.
+
+Every turntable job is tagged with the renderer, quality and pixel count it was submitted with.  Completed jobs are
+harvested from Deadline in the background, and their per-frame render times are fitted, per renderer, to
+
+    log(seconds per frame) = a + b * log(quality) + c * log(megapixels)
+
+That gives an estimate of the core-hours a turntable will cost before it is submitted, and the highest quality that
+still fits an hours budget.  Until there is enough history the exponents fall back to sensible defaults.
+
+The Web Service can't filter jobs by tag or date, so a harvest lists job ids only and keeps a high-water mark.
+Deadline ids start with their submission time, so every id up to the mark is done with and only newer ones are
+fetched, by id, in batches.  The mark stops short of turntable jobs that are still rendering, so they are picked up
+once they complete.
+"""
+
+import sgtk
+import os
+import json
+import math
+import time
+import threading
+from datetime import datetime
+from multiprocessing.pool import ThreadPool
+
+from sgtk.platform.qt import QtCore
+from .file_utils import write_json
+
+logger = sgtk.platform.get_logger(__name__)
+
+# The tag the submitter puts in ExtraInfo4 of every turntable job
+JOB_TAG = 'Lazy Siouxsie Auto Turntable'
+# ExtraInfoKeyValue keys the submitter records the cost inputs in
+RENDERER_KEY = 'LazySiouxsieRenderer'
+QUALITY_KEY = 'LazySiouxsieQuality'
+PIXELS_KEY = 'LazySiouxsiePixels'
+
+# (a, b, c) used until a renderer has history: seconds per frame = e^a * quality^b * megapixels^c.  Arnold's AA
+# samples are squared per pixel, the V-Ray DMC settings grow a little slower.
+DEFAULT_COEFFICIENTS = {
+    'arnold': (math.log(4.0), 2.0, 1.0),
+    'vray': (math.log(20.0), 1.5, 1.0),
+}
+FALLBACK_COEFFICIENTS = (math.log(20.0), 1.5, 1.0)
+# Samples needed before the exponents are fitted rather than just the scale
+MIN_SAMPLES = 6
+# Newest samples kept
+MAX_SAMPLES = 2000
+# How far back the first harvest looks, and how long a turntable job may stay open before the mark moves past it
+HISTORY_DAYS = 30
+# Job ids asked for per request, and task lists fetched at once
+FETCH_BATCH = 100
+FETCH_WORKERS = 4
+# Deadline job states
+COMPLETED = 3
+OPEN_STATES = (1, 2, 6)
+
+
+class FarmCostModel(QtCore.QObject):
+    """
+    Render time history and the fitted per renderer cost curves.
+    """
+    updated = QtCore.Signal()
+
+    def __init__(self, gateway=None, cache_dir=None, cores_per_task=16, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.gateway = gateway
+        self.cache_dir = cache_dir
+        self.cores_per_task = cores_per_task
+        self._lock = threading.Lock()
+        self._harvesting = False
+        # Every job id up to the mark has been looked at; seen are the ones past it that have been too
+        self._mark = ''
+        self._seen = set()
+        self._samples = []
+        self._coefficients = {}
+        self._load()
+        self._fit()
+
+    def seconds_per_frame(self, renderer=None, quality=None, pixels=None):
+        """
+        Predicted wall clock seconds per frame on one farm task.
+        """
+        a, b, c = self._coefficients.get(renderer) or DEFAULT_COEFFICIENTS.get(renderer, FALLBACK_COEFFICIENTS)
+        return math.exp(a + b * math.log(max(quality, 1)) + c * math.log(max(pixels, 1) / 1e6))
+
+    def estimate(self, renderer=None, quality=None, pixels=None, frames=None, layers=1):
+        """
+        Predicted core-hours of a turntable.
+        """
+        seconds = self.seconds_per_frame(renderer=renderer, quality=quality, pixels=pixels)
+        return seconds * frames * layers * self.cores_per_task / 3600.0
+
+    def fit_quality(self, budget=None, renderer=None, pixels=None, frames=None, layers=1, lowest=1, highest=10):
+        """
+        The highest quality whose estimate fits in budget core-hours.  Never lower than lowest.
+        """
+        for quality in range(highest, lowest, -1):
+            if self.estimate(renderer=renderer, quality=quality, pixels=pixels, frames=frames,
+                             layers=layers) <= budget:
+                return quality
+        return lowest
+
+    def has_history(self, renderer):
+        return renderer in self._coefficients
+
+    def harvest_async(self):
+        """
+        Pulls render times of turntable jobs that completed since the last harvest, on a background thread.
+        """
+        with self._lock:
+            if self._harvesting:
+                return
+            self._harvesting = True
+        harvest = threading.Thread(target=self._harvest_quietly, name='lazy_siouxsie_cost_model')
+        harvest.daemon = True
+        harvest.start()
+
+    def _harvest_quietly(self):
+        try:
+            if self.harvest():
+                self.updated.emit()
+        except Exception as e:
+            logger.warning('Could not harvest turntable render times from Deadline: %s' % e)
+        finally:
+            with self._lock:
+                self._harvesting = False
+
+    def harvest(self):
+        """
+        Adds the turntable jobs that completed since the last harvest.  Returns the number of new samples.
+        """
+        session = self.gateway.session()
+        with self._lock:
+            mark = self._mark
+            seen = set(self._seen)
+        horizon = job_id_at(time.time() - HISTORY_DAYS * 86400)
+        job_ids = sorted(job_id for job_id in _job_ids(session.request('GET', '/api/jobs?IdOnly=true'))
+                         if job_id and job_id > max(mark, horizon) and job_id not in seen)
+        if not job_ids:
+            return 0
+
+        jobs = []
+        for index in range(0, len(job_ids), FETCH_BATCH):
+            batch = job_ids[index:index + FETCH_BATCH]
+            jobs.extend(session.request('GET', '/api/jobs?JobID=%s' % ','.join(batch)) or [])
+        fetched = dict((job.get('_id'), job) for job in jobs)
+        completed = []
+        blocked = False
+        # Ids seen before are done with; they only wait for the mark to catch up.
+        for job_id in sorted(set(fetched) | seen):
+            job = fetched.get(job_id) or {}
+            props = job.get('Props') or {}
+            if props.get('Ex4') == JOB_TAG:
+                if job.get('Stat') in OPEN_STATES and job_id > horizon:
+                    # Still rendering; the mark waits for it, and everything after it is remembered until then.
+                    blocked = True
+                    continue
+                if job.get('Stat') == COMPLETED:
+                    completed.append((job_id, props.get('ExDic') or {}))
+            if blocked:
+                seen.add(job_id)
+            else:
+                mark = job_id
+
+        new_samples = []
+        if completed:
+            pool = ThreadPool(min(FETCH_WORKERS, len(completed)))
+            try:
+                tasks = pool.map(lambda job: session.request('GET', '/api/tasks?JobID=%s' % job[0]), completed)
+            finally:
+                pool.close()
+                pool.join()
+            for (job_id, extra_info), job_tasks in zip(completed, tasks):
+                sample = job_sample(extra_info, job_tasks)
+                if sample:
+                    new_samples.append(sample)
+        with self._lock:
+            self._mark = mark
+            self._seen = set(job_id for job_id in seen if job_id > mark)
+            self._samples = (self._samples + new_samples)[-MAX_SAMPLES:]
+        if new_samples:
+            self._fit()
+        self._save()
+        logger.debug('Cost model: %i new render time samples from Deadline.' % len(new_samples))
+        return len(new_samples)
+
+    def _fit(self):
+        with self._lock:
+            samples = list(self._samples)
+        by_renderer = {}
+        for sample in samples:
+            by_renderer.setdefault(sample['renderer'], []).append(sample)
+        coefficients = {}
+        for renderer, renderer_samples in by_renderer.items():
+            coefficients[renderer] = fit_coefficients(renderer_samples, DEFAULT_COEFFICIENTS.get(
+                renderer, FALLBACK_COEFFICIENTS))
+        self._coefficients = coefficients
+
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, 'farm_cost_samples.json')
+
+    def _load(self):
+        if not self.cache_dir or not os.path.isfile(self._cache_file()):
+            return
+        try:
+            with open(self._cache_file(), 'r') as f:
+                data = json.load(f)
+            self._mark = data.get('mark', '')
+            self._seen = set(data.get('seen', []))
+            self._samples = data.get('samples', [])
+        except (IOError, ValueError) as e:
+            logger.warning('Ignoring unreadable render time history: %s' % e)
+
+    def _save(self):
+        if not self.cache_dir:
+            return
+        with self._lock:
+            data = {'saved': time.time(), 'mark': self._mark, 'seen': sorted(self._seen),
+                    'samples': list(self._samples)}
+        try:
+            write_json(self._cache_file(), data)
+        except (IOError, OSError) as e:
+            logger.warning('Could not write the render time history: %s' % e)
+
+
+def job_id_at(timestamp):
+    """
+    The lowest possible id of a job submitted at timestamp.  Deadline ids are MongoDB ObjectIds, which start with their
+    creation time in hex, so they sort in submission order.
+    """
+    return '%08x' % int(max(timestamp, 0)) + '0' * 16
+
+
+def _job_ids(reply):
+    # A list of ids, or of jobs holding just their _id, depending on the Web Service version
+    return [item.get('_id') if isinstance(item, dict) else item for item in reply or []]
+
+
+def job_sample(extra_info, tasks):
+    """
+    One history sample from a completed job: its cost inputs and median seconds per frame.  None if the job wasn't
+    tagged with its cost inputs or has no usable task times.
+    """
+    try:
+        renderer = extra_info[RENDERER_KEY]
+        quality = float(extra_info[QUALITY_KEY])
+        pixels = float(extra_info[PIXELS_KEY])
+    except (KeyError, ValueError):
+        return None
+    per_frame = []
+    for task in (tasks or {}).get('Tasks', []):
+        seconds = _task_seconds(task)
+        try:
+            frames = _frame_count(task.get('Frames'))
+        except ValueError:
+            continue
+        if seconds and frames:
+            per_frame.append(seconds / frames)
+    if not per_frame:
+        return None
+    per_frame.sort()
+    return {'renderer': renderer, 'quality': quality, 'pixels': pixels,
+            'seconds': per_frame[len(per_frame) // 2]}
+
+
+def fit_coefficients(samples, default):
+    """
+    Least squares fit of (a, b, c).  With too little history, or history that doesn't vary enough to tell quality
+    and resolution apart, only the scale a is fitted and the default exponents are kept.
+    """
+    rows = [(math.log(s['quality']), math.log(s['pixels'] / 1e6), math.log(s['seconds'])) for s in samples
+            if s['quality'] > 0 and s['pixels'] > 0 and s['seconds'] > 0]
+    if not rows:
+        return default
+    a, b, c = default
+    if len(rows) >= MIN_SAMPLES and len(set(r[0] for r in rows)) > 1 and len(set(r[1] for r in rows)) > 1:
+        # Normal equations of y = a + b * q + c * p
+        matrix = [[0.0] * 4 for i in range(3)]
+        for q, p, y in rows:
+            x = (1.0, q, p)
+            for i in range(3):
+                for j in range(3):
+                    matrix[i][j] += x[i] * x[j]
+                matrix[i][3] += x[i] * y
+        solved = _solve(matrix)
+        # A negative exponent means the history is too noisy to trust; keep the defaults then.
+        if solved and solved[1] > 0 and solved[2] > 0:
+            return tuple(solved)
+    a = sum(y - b * q - c * p for q, p, y in rows) / len(rows)
+    return a, b, c
+
+
+def _solve(matrix):
+    """
+    Gaussian elimination with partial pivoting of an n x (n + 1) augmented matrix.  None if it is singular.
+    """
+    n = len(matrix)
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[pivot][col]) < 1e-12:
+            return None
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        for row in range(col + 1, n):
+            factor = matrix[row][col] / matrix[col][col]
+            for k in range(col, n + 1):
+                matrix[row][k] -= factor * matrix[col][k]
+    result = [0.0] * n
+    for row in range(n - 1, -1, -1):
+        result[row] = (matrix[row][n] - sum(matrix[row][k] * result[k] for k in range(row + 1, n))) / matrix[row][row]
+    return result
+
+
+def _task_seconds(task):
+    start = _parse_time(task.get('StartRen') or task.get('Start'))
+    end = _parse_time(task.get('Comp'))
+    if not start or not end:
+        return None
+    seconds = (end - start).total_seconds()
+    return seconds if seconds > 0 else None
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        return None
+
+
+def _frame_count(frames):
+    """
+    Frames in a Deadline frame list like "1-10,12,20-30x5".
+    """
+    count = 0
+    for part in str(frames or '').replace(' ', '').split(','):
+        if not part:
+            continue
+        step = 1
+        if 'x' in part:
+            part, step = part.split('x', 1)
+            step = max(int(step), 1)
+        if '-' in part[1:]:
+            first, last = part[0] + part[1:].split('-', 1)[0], part[1:].split('-', 1)[1]
+            count += abs(int(last) - int(first)) // step + 1
+        else:
+            count += 1
+    return count
@@ -0,0 +1,130 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Lazy connection to the Deadline Web Service.
+
+The connection is warmed up on a worker thread as soon as the dialog opens, and only blocks the caller at the
+moment a Deadline request actually needs to be made.
+"""
+
+import sgtk
+import platform
+import sys
+import threading
+
+from sgtk.platform.qt import QtCore
+from .deadline_submitter import DeadlineSession
+logger = sgtk.platform.get_logger(__name__)
+
+# Connection states reported through DeadlineGateway.state_changed
+IDLE = 'idle'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+FAILED = 'failed'
+
+
+def deadline_python_path():
+    """
+    Returns the site-packages folder that holds the Deadline standalone python API.
+    """
+    # This should go into the paths.yml perhaps.  Setup a series of universal paths, and then call them here.
+    if platform.system() == 'Windows':
+        return 'C:\\Python27\\Lib\\site-packages'
+    return '/Volumes/Applications/Python27/Lib/site-packages'
+
+
+class DeadlineGateway(QtCore.QObject):
+    """
+    Lazily initialised, background pre-warmed DeadlineCon.
+    """
+    state_changed = QtCore.Signal(str)
+
+    def __init__(self, host=None, port=None, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.host = host
+        self.port = port
+        self.state = IDLE
+        self.error = None
+        self._connection = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def prewarm(self):
+        """
+        Starts connecting on a worker thread.  Safe to call more than once.
+        """
+        with self._lock:
+            if self._thread or self._connection:
+                return
+            self._thread = threading.Thread(target=self._connect, name='lazy_siouxsie_deadline')
+            self._thread.daemon = True
+            self._set_state(CONNECTING)
+        self._thread.start()
+
+    def connection(self, timeout=None):
+        """
+        Returns the DeadlineCon, waiting on the warm up if it is still running.  If the warm up failed, a single
+        synchronous retry is made before the error is raised.
+        """
+        if not self._thread and not self._connection:
+            self.prewarm()
+        if not self._ready.wait(timeout):
+            raise RuntimeError('Timed out waiting for the Deadline connection.')
+        if self._connection is None:
+            logger.warning('Deadline warm up failed (%s).  Retrying...' % self.error)
+            with self._lock:
+                self._ready.clear()
+                self._thread = None
+            self._connect()
+        if self._connection is None:
+            raise RuntimeError('Could not connect to Deadline: %s' % self.error)
+        return self._connection
+
+    def session(self):
+        """
+        The keep-alive JSON session used to post jobs, shared by everything that submits.
+        """
+        with self._lock:
+            if self._session is None:
+                self._session = DeadlineSession(host=self.host, port=self.port)
+            return self._session
+
+    def is_connected(self):
+        return self._connection is not None
+
+    def _connect(self):
+        try:
+            python_path = deadline_python_path()
+            if python_path not in sys.path:
+                sys.path.append(python_path)
+            from Deadline import DeadlineConnect as connect
+            con = connect.DeadlineCon(self.host, self.port)
+            # The constructor does not talk to the server, so make one cheap request to open the connection and
+            # prove the Web Service is actually there.
+            con.Repository.GetRootDirectory()
+            self._connection = con
+            self.error = None
+            self._set_state(CONNECTED)
+            logger.debug('Deadline Connection made!')
+        except Exception as e:
+            self._connection = None
+            self.error = e
+            self._set_state(FAILED)
+            logger.error('Deadline Connection failed! %s' % e)
+        finally:
+            self._ready.set()
+
+    def _set_state(self, state):
+        self.state = state
+        # Emitted from the worker thread; Qt queues it onto the receiver's (main) thread.
+        self.state_changed.emit(state)
@@ -0,0 +1,298 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Posts turntable jobs straight to the Deadline Web Service.
+
+Job and plugin info are plain dictionaries sent as JSON, so nothing is written to disk.  One session is shared by
+every thread that submits; it keeps a persistent (keep-alive) HTTP connection per thread instead of opening a new one
+for every request, as the standalone API does.
+
+A layer goes out as a chain of jobs, each depending on the one before it, for renders done in passes.  Every job is
+tagged with a submission key, so a job whose submission may or may not have reached the farm can be found again
+instead of being submitted twice.
+
+Nothing in here needs Maya, so the submission spool's command line can use it too.
+"""
+
+import json
+import time
+import errno
+import socket
+import logging
+import threading
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+
+try:
+    import sgtk
+    logger = sgtk.platform.get_logger(__name__)
+except ImportError:
+    logger = logging.getLogger(__name__)
+
+TIMEOUT = 60
+# A connection idle for longer than this may have been closed by the server, so a job isn't posted on it
+KEEP_ALIVE_IDLE = 5
+# Connection errors that mean the server dropped an idle keep-alive connection rather than ever reading the request
+STALE_ERRNOS = (errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
+# The extra info key the submission key of a job is kept under
+SUBMISSION_KEY = 'SubmissionKey'
+# Jobs that may still be found on the farm when a submission is retried
+OPEN_STATES = 'Active,Suspended,Pending'
+# ExtraInfo4 of a job that only makes a Draft movie, so the cost model doesn't take it for a turntable render
+DRAFT_JOB_TAG = 'Lazy Siouxsie Draft Movie'
+
+
+class DeadlineError(RuntimeError):
+    """
+    Deadline answered with an error.  Server side (5xx) errors are transient and worth retrying, the rest mean the
+    job was refused.
+    """
+
+    def __init__(self, status=None, message=None):
+        RuntimeError.__init__(self, 'Deadline replied %s: %s' % (status, message))
+        self.status = status
+        self.transient = status >= 500
+
+
+class DeadlineSession(object):
+    """
+    Keep-alive JSON client of the Deadline Web Service, safe to share between threads.
+    """
+
+    def __init__(self, host=None, port=None, timeout=TIMEOUT):
+        # The app setting is the Web Service's URL, httplib wants the bare host name
+        self.secure = host.lower().startswith('https://')
+        self.host = host.split('://', 1)[-1].rstrip('/')
+        self.port = int(port)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        """
+        Sends a request and returns the decoded JSON reply.
+
+        Only a reused keep-alive connection that the server turns out to have dropped is retried, once, on a fresh
+        one: when sending failed, or, for anything but a POST, when the server hung up without answering.  A POST that
+        went out is never sent again, since the job may already be on the farm; the error is raised so the spool can
+        look for the job there.  Timeouts are never retried.
+        """
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        for attempt in range(2):
+            if method == 'POST':
+                self._close_if_idle()
+            connection, reused = self._connection()
+            try:
+                connection.request(method, path, payload, headers)
+            except (httplib.HTTPException, socket.error) as e:
+                self._close()
+                if attempt or not reused or isinstance(e, socket.timeout):
+                    raise
+                logger.debug('Deadline dropped an idle connection, reconnecting: %s' % e)
+                continue
+            try:
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (httplib.HTTPException, socket.error) as e:
+                self._close()
+                if attempt or not reused or method == 'POST' or not _is_stale(e):
+                    raise
+                logger.debug('Deadline dropped an idle connection, reconnecting: %s' % e)
+        self._local.last_used = time.time()
+        if response.status != 200:
+            raise DeadlineError(response.status, data)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            # A few calls answer in plain text
+            return data
+
+    def submit_job(self, job_info, plugin_info, aux_files=None):
+        """
+        Submits a job and returns its id.
+        """
+        body = {
+            'JobInfo': _as_text(job_info),
+            'PluginInfo': _as_text(plugin_info),
+            'AuxFiles': aux_files or [],
+            'IdOnly': True
+        }
+        return self.request('POST', '/api/jobs', body)['_id']
+
+    def find_job(self, submission_key):
+        """
+        The id of the open job tagged with submission_key, or None if the farm has none.
+        """
+        jobs = self.request('GET', '/api/jobs?States=%s' % OPEN_STATES) or []
+        for job in jobs:
+            extra_info = (job.get('Props') or {}).get('ExDic') or {}
+            if extra_info.get(SUBMISSION_KEY) == submission_key:
+                return job['_id']
+        return None
+
+    def delete_jobs(self, job_ids):
+        """
+        Removes jobs from the farm.
+        """
+        if job_ids:
+            self.request('DELETE', '/api/jobs?JobID=%s' % ','.join(job_ids))
+
+    def _connection(self):
+        """
+        This thread's connection, and whether it has been used before.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection, True
+        connection_class = httplib.HTTPSConnection if self.secure else httplib.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.timeout)
+        self._local.connection = connection
+        return connection, False
+
+    def _close_if_idle(self):
+        last_used = getattr(self._local, 'last_used', None)
+        if last_used is not None and time.time() - last_used > KEEP_ALIVE_IDLE:
+            self._close()
+
+    def _close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+        self._local.connection = None
+
+
+def _is_stale(error):
+    """
+    Whether error is the server closing an idle connection without answering, as opposed to a timeout or a
+    failure while it was working on the request.
+    """
+    if isinstance(error, socket.timeout):
+        return False
+    if isinstance(error, httplib.BadStatusLine):
+        # Python 3 raises RemoteDisconnected, a subclass; an empty status line means the server closed on us.
+        return True
+    return getattr(error, 'errno', None) in STALE_ERRNOS
+
+
+def _as_text(info):
+    # Deadline reads every info value as text, the same as a line of a .job file
+    return dict((key, '%s' % value) for key, value in info.items())
+
+
+def merge_layer_jobs(name, jobs):
+    """
+    Folds per layer (layer, job_info, plugin_info) jobs into one job that renders every layer in the same Maya
+    session.  The first job's settings are kept, and each layer keeps its own output directory and file name.  The
+    merged job makes no Draft movie, as Quick Draft would only encode its first output; give each layer a draft_job.
+    """
+    layer, job_info, plugin_info = jobs[0]
+    job_info = quick_draft(job_info, False)
+    job_info = dict((key, value) for key, value in job_info.items() if not key.startswith('Output'))
+    job_info['Name'] = name
+    for index, (layer, layer_info, layer_plugin) in enumerate(jobs):
+        job_info['OutputDirectory%i' % index] = layer_info['OutputDirectory0']
+        job_info['OutputFilename%i' % index] = layer_info['OutputFilename0']
+    plugin_info = dict(plugin_info)
+    # An empty layer with render layers on renders every renderable layer of the scene
+    plugin_info['UsingRenderLayers'] = 1
+    plugin_info['RenderLayer'] = ''
+    return name, job_info, plugin_info
+
+
+def pass_jobs(job, passes, priority_step=10):
+    """
+    Splits a (layer, job_info, plugin_info) job into a job per (degrees, frame list) pass, coarsest first.  Earlier
+    passes get a higher priority.  No pass makes a Draft movie, since each would only encode its own frames; follow
+    the passes with a draft_job of the whole job.
+    """
+    layer, job_info, plugin_info = job
+    jobs = []
+    for index, (degrees, frames) in enumerate(passes):
+        info = dict(job_info)
+        step = '%g deg' % degrees if degrees else 'all frames'
+        info['Name'] = '%s (pass %i of %i, %s)' % (job_info['Name'], index + 1, len(passes), step)
+        info['Frames'] = frames
+        info['Priority'] = min(int(job_info.get('Priority', 50)) + priority_step * (len(passes) - 1 - index), 100)
+        jobs.append((layer, quick_draft(info, False), plugin_info))
+    return jobs
+
+
+def draft_job(job, frame_count):
+    """
+    A job that makes the Draft movie of a (layer, job_info, plugin_info) job once that job's frames are rendered.
+    It runs the same render over all frame_count frames as one task, skipping the frames that already exist, so Maya
+    only loads the scene once and Quick Draft then encodes every frame of the layer.
+    """
+    layer, job_info, plugin_info = job
+    info = quick_draft(job_info, True)
+    info['Name'] = '%s (Draft movie)' % job_info['Name']
+    info['ChunkSize'] = max(frame_count, 1)
+    info['MachineLimit'] = 1
+    info['ExtraInfo4'] = DRAFT_JOB_TAG
+    plugin_info = dict(plugin_info)
+    options = '%s -skipExistingFrames true' % plugin_info.get('CommandLineOptions', '')
+    plugin_info['CommandLineOptions'] = options.strip()
+    return layer, info, plugin_info
+
+
+def quick_draft(job_info, enabled):
+    """
+    A copy of job_info with Quick Draft turned on or off.
+    """
+    job_info = dict(job_info)
+    for key, value in job_info.items():
+        if key.startswith('ExtraInfoKeyValue') and value.startswith('SubmitQuickDraft='):
+            job_info[key] = 'SubmitQuickDraft=%s' % enabled
+    return job_info
+
+
+def tag_job(job_info, submission_key):
+    """
+    A copy of job_info carrying submission_key in its first free extra info slot.
+    """
+    job_info = dict(job_info)
+    index = 0
+    while 'ExtraInfoKeyValue%i' % index in job_info:
+        index += 1
+    job_info['ExtraInfoKeyValue%i' % index] = '%s=%s' % (SUBMISSION_KEY, submission_key)
+    return job_info
+
+
+def submit_chain(session, chain, submission_key=None, job_ids=None, uncertain=False, on_submitted=None):
+    """
+    Submits the jobs of a chain of (layer, job_info, plugin_info) jobs that aren't on the farm yet, each depending on
+    the one before it.  job_ids are the ids of the jobs already submitted; on_submitted(job_ids) is called after every
+    job so they can be recorded.  If the last attempt may have reached the farm (uncertain), the farm is asked for
+    the job before it is submitted again.  Returns the ids of the whole chain.
+    """
+    job_ids = list(job_ids or [])
+    for index in range(len(job_ids), len(chain)):
+        layer, job_info, plugin_info = chain[index]
+        job_key = '%s/%i' % (submission_key, index)
+        job_id = session.find_job(job_key) if uncertain else None
+        if job_id:
+            logger.debug('Job %s of layer %s already reached the farm as %s.' % (job_key, layer, job_id))
+        else:
+            job_info = tag_job(job_info, job_key)
+            if job_ids:
+                job_info['JobDependencies'] = job_ids[-1]
+            job_id = session.submit_job(job_info, plugin_info)
+        uncertain = False
+        job_ids.append(job_id)
+        if on_submitted:
+            on_submitted(job_ids)
+    return job_ids
@@ -0,0 +1,66 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Shotgun Versions of the turntable layers, made in one batch request.
+
+A Shotgun batch is all or nothing, so when it fails nothing has been created and the layers are retried one at a
+time to find out which of them Shotgun won't take.  Versions of layers whose jobs then can't be submitted are removed
+again, in one batch, so no Version is left without a render behind it.
+
+Nothing in here needs Maya, so the submission spool's command line can use it too.
+"""
+
+import logging
+
+try:
+    import sgtk
+    logger = sgtk.platform.get_logger(__name__)
+except ImportError:
+    logger = logging.getLogger(__name__)
+
+
+def create_versions(sg, version_data):
+    """
+    Creates a Version per (layer, data) pair.  Returns {layer: version} and {layer: error} for the layers that
+    couldn't be created.
+    """
+    if not version_data:
+        return {}, {}
+    requests = [{'request_type': 'create', 'entity_type': 'Version', 'data': data} for layer, data in version_data]
+    try:
+        created = sg.batch(requests)
+        return dict((layer, version) for (layer, data), version in zip(version_data, created)), {}
+    except Exception as e:
+        logger.warning('Creating the Versions in one batch failed (%s), creating them one by one.' % e)
+
+    versions = {}
+    failures = {}
+    for layer, data in version_data:
+        try:
+            versions[layer] = sg.create('Version', data)
+        except Exception as e:
+            logger.error('Could not create the Version of layer %s: %s' % (layer, e))
+            failures[layer] = str(e)
+    return versions, failures
+
+
+def delete_versions(sg, versions):
+    """
+    Removes Versions, in one batch.
+    """
+    if not versions:
+        return
+    requests = [{'request_type': 'delete', 'entity_type': 'Version', 'entity_id': version['id']}
+                for version in versions]
+    try:
+        sg.batch(requests)
+    except Exception as e:
+        logger.error('Could not remove the Versions of the failed layers: %s' % e)
@@ -0,0 +1,199 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Disk backed cache of what the farm has to offer: pools, groups, limits and how many workers serve each pool and group.
+
+The farm is asked once, in the background, when the dialog opens, and the answer is kept on disk between sessions.
+Cached metadata is always used straight away; once it is older than the TTL it is refreshed in the background for
+next time.  Picking a pool and group for a submission then costs no requests at all, and the dialog can show the
+choice before the build starts.
+"""
+
+import sgtk
+import os
+import json
+import time
+import threading
+
+from sgtk.platform.qt import QtCore
+from .file_utils import write_json
+
+logger = sgtk.platform.get_logger(__name__)
+
+CACHE_FILE = 'farm_metadata.json'
+# Deadline worker states that count as up, and the one that counts as free
+RENDERING = 1
+IDLE = 2
+STARTING_JOB = 8
+ONLINE_STATES = (RENDERING, IDLE, STARTING_JOB)
+DEFAULT_POOL = 'none'
+DEFAULT_GROUP = 'none'
+# How long, in seconds, a submission waits on a first fetch before going to the default pool and group
+REFRESH_WAIT = 5
+
+
+class FarmMetadata(QtCore.QObject):
+    """
+    Pools, groups, limits and worker counts of the farm.
+    """
+    updated = QtCore.Signal()
+
+    def __init__(self, gateway=None, cache_dir=None, ttl=3600, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.gateway = gateway
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Set whenever no background refresh is running
+        self._refreshed = threading.Event()
+        self._refreshed.set()
+        self._cached = self._load()
+
+    def metadata(self):
+        """
+        The cached metadata, straight away, with a background refresh started if it is stale.  When nothing has ever
+        been cached it waits up to REFRESH_WAIT for the background fetch, started by prefetch() or here, and never
+        fetches a second time on the calling thread.  Empty if that fetch hasn't come back, so choose_target falls
+        back to the default pool and group.
+        """
+        if not self._cached:
+            self.refresh_async()
+            self._refreshed.wait(REFRESH_WAIT)
+            if not self._cached:
+                logger.warning('The farm pools are not known yet, submitting to the default pool and group.')
+                return {}
+        if time.time() - self._cached['fetched'] > self.ttl:
+            self.refresh_async()
+        return self._cached['metadata']
+
+    def cached(self):
+        """
+        Whatever metadata is cached, never asking the farm.  None if there is none yet.
+        """
+        return self._cached['metadata'] if self._cached else None
+
+    def prefetch(self):
+        """
+        Makes sure the metadata is there, or on its way, without blocking.
+        """
+        if not self._cached or time.time() - self._cached['fetched'] > self.ttl:
+            self.refresh_async()
+
+    def refresh(self):
+        logger.debug('Fetching the farm pools, groups, limits and workers from Deadline...')
+        con = self.gateway.connection()
+        metadata = farm_metadata(pools=con.Pools.GetPoolNames(), groups=con.Groups.GetGroupNames(),
+                                 limits=con.Limits.GetLimitGroupNames(), workers=con.Slaves.GetSlavesInfoSettings())
+        self._cached = {'fetched': time.time(), 'metadata': metadata}
+        self._save()
+        return metadata
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._refreshed.clear()
+        refresh = threading.Thread(target=self._refresh_quietly, name='lazy_siouxsie_farm_metadata')
+        refresh.daemon = True
+        refresh.start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+            self.updated.emit()
+        except Exception as e:
+            logger.warning('Could not fetch the farm metadata from Deadline: %s' % e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._refreshed.set()
+
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, CACHE_FILE)
+
+    def _load(self):
+        if not self.cache_dir or not os.path.isfile(self._cache_file()):
+            return None
+        try:
+            with open(self._cache_file(), 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning('Ignoring unreadable farm metadata cache: %s' % e)
+            return None
+
+    def _save(self):
+        if not self.cache_dir:
+            return
+        try:
+            write_json(self._cache_file(), self._cached)
+        except (IOError, OSError) as e:
+            logger.warning('Could not write the farm metadata cache: %s' % e)
+
+
+def farm_metadata(pools=None, groups=None, limits=None, workers=None):
+    """
+    The names Deadline lists, plus the {'total', 'idle'} workers of every pool and group, from the workers' info and
+    settings.
+    """
+    pool_workers = {}
+    group_workers = {}
+    for worker in workers or []:
+        info = worker.get('Info') or {}
+        settings = worker.get('Settings') or {}
+        state = info.get('Stat')
+        for counts, names in ((pool_workers, settings.get('Pools')), (group_workers, settings.get('Grps'))):
+            for name in _names(names):
+                count = counts.setdefault(name, {'total': 0, 'idle': 0})
+                if state in ONLINE_STATES:
+                    count['total'] += 1
+                if state == IDLE:
+                    count['idle'] += 1
+    return {
+        'pools': list(pools or []),
+        'groups': list(groups or []),
+        'limits': list(limits or []),
+        'pool_workers': pool_workers,
+        'group_workers': group_workers
+    }
+
+
+def choose_target(metadata, renderer):
+    """
+    The pool and group a renderer's jobs go to: of those named after the renderer, the one with the most idle
+    workers, then the most workers online.  Deadline's defaults if none are.
+    """
+    pool = _best_match(metadata.get('pools'), metadata.get('pool_workers'), renderer) or DEFAULT_POOL
+    group = _best_match(metadata.get('groups'), metadata.get('group_workers'), renderer) or DEFAULT_GROUP
+    return pool, group
+
+
+def _best_match(names, workers, renderer):
+    matches = [name for name in names or [] if renderer and renderer in name]
+    if not matches:
+        return None
+    workers = workers or {}
+
+    def capacity(name):
+        count = workers.get(name) or {}
+        return count.get('idle', 0), count.get('total', 0)
+    # max keeps the first of equals, so ties go by Deadline's order, as the plain name match used to
+    return max(matches, key=capacity)
+
+
+def _names(value):
+    # Deadline lists these either as a list or as a comma separated string
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return value
+    return [name.strip() for name in value.split(',') if name.strip()]
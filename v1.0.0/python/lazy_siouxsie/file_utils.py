@@ -0,0 +1,70 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Small file system helpers shared by the on-disk caches and the submission spool.
+
+Nothing in here needs Maya or toolkit, so the submission spool's command line can use it too.
+"""
+
+import os
+import json
+import errno
+import threading
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        # Python 2.7 needs the scandir back port
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+def replace_file(source, destination):
+    """
+    Moves source over destination in one step, so a reader sees either the old file or the new one, never neither.
+    Only where the OS refuses to rename over an existing file (Windows, on Python 2) is destination removed first.
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+        return
+    try:
+        os.rename(source, destination)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+        os.remove(destination)
+        os.rename(source, destination)
+
+
+def write_json(path, data):
+    """
+    Writes data to path as JSON.  It is written next to path first and then swapped in with replace_file, so a crash
+    never leaves half a file behind.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            # Somebody else made it in the meantime
+            if e.errno != errno.EEXIST:
+                raise
+    # Unique per process and thread, as several of either may write the same file
+    tmp_file = '%s.%s.%s.tmp' % (path, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+        replace_file(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
@@ -0,0 +1,101 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Which frames of a turntable to render for a render slice, as a Deadline frame list.
+
+A slice of n degrees is a frame every (range / 2) / 360 * n frames of the submitted range, starting on its first
+frame.  Those frames are worked out before submission and sent as a stepped list like "1-240x15", so the farm is
+never given frames it isn't meant to render.
+
+Progressive rendering splits the slice's frames into coarse to fine passes: every 45 degrees, then every 15, then
+whatever the slice has left.  The coarse passes are picked from the slice's own frames, the nearest whole number of
+slice steps apart, so no pass ever renders a frame outside the slice.  Each pass only holds the frames no earlier
+pass renders.
+"""
+
+# The coarse passes of a progressive render, in degrees, coarsest first
+PROGRESSIVE_PASSES = (45, 15)
+
+
+def slice_step(start, end, degrees):
+    """
+    How many frames apart a slice of degrees renders.  0 degrees renders every frame.
+    """
+    if not degrees:
+        return 1
+    frame_range = float(end - start + 1)
+    frames_per_degree = (frame_range / 2) / 360.0
+    return max(int(frames_per_degree * degrees), 1)
+
+
+def slice_frames(start, end, degrees):
+    """
+    The frames a slice of degrees renders, in order.
+    """
+    return list(range(start, end + 1, slice_step(start, end, degrees)))
+
+
+def frame_list(frames):
+    """
+    Deadline's compact spelling of frames: evenly stepped runs as "first-lastxstep", the rest comma separated.
+    """
+    frames = sorted(set(frames))
+    runs = []
+    index = 0
+    while index < len(frames):
+        first = frames[index]
+        if index + 1 == len(frames):
+            runs.append('%s' % first)
+            break
+        step = frames[index + 1] - first
+        last = index + 1
+        while last + 1 < len(frames) and frames[last + 1] - frames[last] == step:
+            last += 1
+        if last - index < 2 and step != 1:
+            # Two frames aren't worth a step
+            runs.append('%s' % first)
+            index += 1
+            continue
+        if step == 1:
+            runs.append('%s-%s' % (first, frames[last]))
+        else:
+            runs.append('%s-%sx%s' % (first, frames[last], step))
+        index = last + 1
+    return ','.join(runs)
+
+
+def slice_frame_list(start, end, degrees):
+    """
+    The Deadline frame list of a slice of degrees.
+    """
+    return frame_list(slice_frames(start, end, degrees))
+
+
+def progressive_passes(start, end, degrees=0, passes=PROGRESSIVE_PASSES):
+    """
+    The (degrees, frame list) of each pass of a progressive render of a slice of degrees, coarsest first.  Passes
+    no coarser than the slice itself are left out, and the last pass renders the rest of the slice.
+    """
+    coarse = [pass_degrees for pass_degrees in passes if not degrees or pass_degrees > degrees]
+    step = slice_step(start, end, degrees)
+    frames = slice_frames(start, end, degrees)
+    rendered = set()
+    result = []
+    for pass_degrees in coarse + [degrees]:
+        # Every nth frame of the slice, n slice steps being as close as they get to the pass's own step
+        every = max(int(round(slice_step(start, end, pass_degrees) / float(step))), 1)
+        pass_frames = [frame for frame in frames[::every] if frame not in rendered]
+        if not pass_frames:
+            continue
+        rendered.update(pass_frames)
+        result.append((pass_degrees, frame_list(pass_frames)))
+    assert rendered == set(frames), 'Progressive passes must render exactly the slice'
+    return result
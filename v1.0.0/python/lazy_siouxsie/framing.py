@@ -0,0 +1,183 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Closed form camera framing.
+
+Works out where the turntable camera goes from the set's bounds and the camera's lens alone, so there is no viewport
+involved (no lookThru/viewFit round trips) and it works the same in a batch session.  Nothing in here touches Maya.
+All angles are radians internally and only converted to degrees for the rotate values handed back.
+
+solve_framing fits the bounding sphere.  solve_turntable_framing fits the actual points at every angle the set is
+keyed to spin through, so wide or lopsided assets stay in frame for the whole turn.
+"""
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Film fit modes, as in the camera's filmFit attribute
+FILL = 0
+HORIZONTAL = 1
+VERTICAL = 2
+OVERSCAN = 3
+
+# A little breathing room around the set
+FRAME_PADDING = 1.05
+# Steepest the camera is allowed to look down (or up) at the set
+MAX_PITCH = math.radians(80.0)
+# Largest gap, in degrees, between the turntable angles the set is checked at
+SAMPLE_STEP = 5.0
+# Rough cap on the angle x point array sizes, to keep memory flat on dense sets
+CHUNK_SIZE = 2000000
+
+
+class Framing(object):
+    """
+    A solved camera placement.  translate is world space, rotate is in degrees, distance is from the camera to the
+    frame center.
+    """
+
+    def __init__(self, translate=None, rotate=None, distance=0.0):
+        self.translate = translate
+        self.rotate = rotate
+        self.distance = distance
+
+
+def half_angles(horizontal_aperture, vertical_aperture, focal_length, aspect_ratio, film_fit=FILL):
+    """
+    The horizontal and vertical half field of view, in radians, of a camera rendering at aspect_ratio.
+
+    Apertures are in inches as stored on the camera shape, focal length in mm.  The film fit decides which side of
+    the film gate the render resolution is matched to, the same way Maya resolves it.
+    """
+    film_aspect = horizontal_aperture / float(vertical_aperture)
+    if film_fit == FILL:
+        fit_horizontal = aspect_ratio >= film_aspect
+    elif film_fit == OVERSCAN:
+        fit_horizontal = aspect_ratio < film_aspect
+    else:
+        fit_horizontal = film_fit == HORIZONTAL
+    if fit_horizontal:
+        half_width = horizontal_aperture * 25.4 / 2.0
+        half_height = half_width / aspect_ratio
+    else:
+        half_height = vertical_aperture * 25.4 / 2.0
+        half_width = half_height * aspect_ratio
+    return math.atan(half_width / focal_length), math.atan(half_height / focal_length)
+
+
+def fit_distance(radius, horizontal_half_angle, vertical_half_angle, padding=FRAME_PADDING):
+    """
+    The distance at which a sphere of radius fills, but doesn't exceed, the narrower side of the frame.
+    """
+    half_angle = min(horizontal_half_angle, vertical_half_angle)
+    return radius * padding / math.sin(half_angle)
+
+
+def solve_framing(center, radius, horizontal_aperture, vertical_aperture, focal_length, aspect_ratio,
+                  height=None, film_fit=FILL, padding=FRAME_PADDING):
+    """
+    Places a camera on the +Z side of center, looking at it, far enough back to hold the whole bounding sphere.
+
+    height is the world space height of the camera.  If it isn't given the camera sits level with the center.  The
+    camera is pitched to look at the center from that height; the distance to the center stays the fitted one unless
+    the height alone puts it further away.
+    """
+    horizontal, vertical = half_angles(horizontal_aperture, vertical_aperture, focal_length, aspect_ratio,
+                                       film_fit=film_fit)
+    distance = fit_distance(radius, horizontal, vertical, padding=padding)
+    rise = 0.0 if height is None else height - center[1]
+    if abs(rise) >= distance:
+        ground_distance = 0.0
+    else:
+        ground_distance = math.sqrt(distance * distance - rise * rise)
+    # Don't let a high (or low) camera end up looking straight down on the set
+    ground_distance = max(ground_distance, abs(rise) / math.tan(MAX_PITCH))
+    pitch = math.atan2(rise, ground_distance)
+    translate = [float(center[0]), float(center[1] + rise), float(center[2] + ground_distance)]
+    rotate = [-math.degrees(pitch), 0.0, 0.0]
+    return Framing(translate=translate, rotate=rotate, distance=math.hypot(rise, ground_distance))
+
+
+def sample_angles(start_angle, end_angle, step=SAMPLE_STEP):
+    """
+    Evenly spaced angles, in degrees, from start_angle to end_angle inclusive, no more than step apart.
+    """
+    span = end_angle - start_angle
+    count = max(int(math.ceil(abs(span) / step)), 1)
+    return [start_angle + span * i / float(count) for i in range(count + 1)]
+
+
+def solve_turntable_framing(points, pivot, start_angle, end_angle, horizontal_aperture, vertical_aperture,
+                            focal_length, aspect_ratio, height=None, radius=None, film_fit=FILL,
+                            padding=FRAME_PADDING, step=SAMPLE_STEP):
+    """
+    Places the camera so the set stays in frame while it spins about pivot, around Y, from start_angle to
+    end_angle (degrees, as keyed on the set group).
+
+    The pitch comes from the camera height, as with solve_framing.  With the pitch fixed, every point at every
+    sampled angle is taken into the camera's axes and the closest position that keeps all of them inside the frustum
+    is solved for, along with the sideways and vertical offsets that center the swept silhouette.  Without NumPy, or
+    without points, this falls back to the sphere of radius about the pivot, which is safe at any angle but looser.
+    """
+    pivot = [float(v) for v in pivot]
+    if numpy is None or points is None or not len(points):
+        return solve_framing(pivot, radius, horizontal_aperture, vertical_aperture, focal_length, aspect_ratio,
+                             height=height, film_fit=film_fit, padding=padding)
+    points = numpy.asarray(points, dtype=numpy.float64)
+    offsets = points - pivot
+    radius = float(numpy.sqrt((offsets ** 2).sum(axis=1)).max())
+    # The sphere about the pivot gives the pitch, and is the answer if the points can't do better
+    sphere = solve_framing(pivot, radius, horizontal_aperture, vertical_aperture, focal_length, aspect_ratio,
+                           height=height, film_fit=film_fit, padding=padding)
+    pitch = -math.radians(sphere.rotate[0])
+    horizontal, vertical = half_angles(horizontal_aperture, vertical_aperture, focal_length, aspect_ratio,
+                                       film_fit=film_fit)
+    tan_h = math.tan(horizontal) / padding
+    tan_v = math.tan(vertical) / padding
+    sin_p = math.sin(pitch)
+    cos_p = math.cos(pitch)
+
+    # Camera axes: right is X, up and forward are tilted by the pitch.  Per point: a along right, b along up and
+    # c along forward.  A point is in frame when |a - a0| <= (c - c0) tan_h and |b - b0| <= (c - c0) tan_v, and
+    # each of those splits into two linear limits whose minimums over all points pin down the camera.
+    angles = numpy.radians(sample_angles(start_angle, end_angle, step=step))
+    x = offsets[:, 0]
+    y = offsets[:, 1]
+    z = offsets[:, 2]
+    limits = numpy.full(4, numpy.inf)
+    chunk = max(CHUNK_SIZE // len(points), 1)
+    for i in range(0, len(angles), chunk):
+        cos_a = numpy.cos(angles[i:i + chunk])[:, None]
+        sin_a = numpy.sin(angles[i:i + chunk])[:, None]
+        # Rotate about Y the way Maya's ry does
+        rx = x * cos_a + z * sin_a
+        rz = z * cos_a - x * sin_a
+        b = y * cos_p - rz * sin_p
+        c = -y * sin_p - rz * cos_p
+        limits = numpy.minimum(limits, [(c - rx / tan_h).min(), (c + rx / tan_h).min(), (c - b / tan_v).min(),
+                                        (c + b / tan_v).min()])
+    c_h = (limits[0] + limits[1]) / 2.0
+    c_v = (limits[2] + limits[3]) / 2.0
+    a0 = tan_h * (limits[1] - limits[0]) / 2.0
+    b0 = tan_v * (limits[3] - limits[2]) / 2.0
+    # Backing off to the tighter of the two keeps the other one in frame as well
+    c0 = min(c_h, c_v)
+    translate = [
+        pivot[0] + a0,
+        pivot[1] + b0 * cos_p - c0 * sin_p,
+        pivot[2] - b0 * sin_p - c0 * cos_p
+    ]
+    distance = math.sqrt(sum((translate[i] - pivot[i]) ** 2 for i in range(3)))
+    return Framing(translate=[float(v) for v in translate], rotate=sphere.rotate, distance=distance)
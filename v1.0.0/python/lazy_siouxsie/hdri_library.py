@@ -0,0 +1,255 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Persistent index of the studio HDRI library.
+
+The library usually lives on a network share, so the dialog fills its list from the on-disk index and rescans in the
+background.  A rescan only lists the folder when its mtime has moved, and only opens the files that are new or have
+changed size/mtime to read their resolution from the header.
+"""
+
+import sgtk
+import os
+import re
+import json
+import struct
+import hashlib
+import threading
+
+from sgtk.platform.qt import QtCore
+from .file_utils import scandir, write_json
+logger = sgtk.platform.get_logger(__name__)
+
+HDRI_EXTENSIONS = ('.hdr', '.exr')
+INDEX_VERSION = 1
+
+
+class HdriLibrary(QtCore.QObject):
+    """
+    On-disk, incrementally rescanned index of the HDRI files in a folder.
+    """
+    updated = QtCore.Signal()
+
+    def __init__(self, root=None, cache_dir=None, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.root = root
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._thread = None
+        self._index = self._load()
+
+    def names(self):
+        """
+        Returns the sorted HDRI file names currently in the index.
+        """
+        with self._lock:
+            return sorted(self._index['files'].keys(), key=lambda n: n.lower())
+
+    def entry(self, name):
+        with self._lock:
+            return self._index['files'].get(name)
+
+    def path(self, name):
+        return os.path.join(self.root, name).replace('\\', '/')
+
+    def refresh_async(self):
+        """
+        Rescans the library on a worker thread and emits updated if anything changed.
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._refresh_quietly, name='lazy_siouxsie_hdri_index')
+            self._thread.daemon = True
+        self._thread.start()
+
+    def _refresh_quietly(self):
+        try:
+            if self.rescan():
+                self.updated.emit()
+        except Exception as e:
+            logger.warning('HDRI library rescan failed: %s' % e)
+
+    def rescan(self):
+        """
+        Brings the index up to date.  Returns True if it changed.
+        """
+        dir_mtime = os.stat(self.root).st_mtime
+        with self._lock:
+            if self._index['dir_mtime'] == dir_mtime:
+                logger.debug('HDRI library unchanged since the last scan.')
+                return False
+            old_files = dict(self._index['files'])
+
+        files = {}
+        for name, size, mtime in _list_files(self.root):
+            if not name.lower().endswith(HDRI_EXTENSIONS):
+                continue
+            known = old_files.get(name)
+            if known and known['size'] == size and known['mtime'] == mtime:
+                files[name] = known
+                continue
+            entry = {
+                'size': size,
+                'mtime': mtime,
+                'format': os.path.splitext(name)[1].lower().strip('.'),
+                'width': None,
+                'height': None
+            }
+            try:
+                entry['width'], entry['height'] = read_resolution(os.path.join(self.root, name))
+            except Exception as e:
+                logger.debug('Could not read the header of %s: %s' % (name, e))
+            files[name] = entry
+
+        changed = files != old_files
+        with self._lock:
+            self._index = {'version': INDEX_VERSION, 'root': self.root, 'dir_mtime': dir_mtime, 'files': files}
+        self._save()
+        logger.debug('HDRI library indexed: %i files.' % len(files))
+        return changed
+
+    def _index_file(self):
+        key = hashlib.md5(self.root.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'hdri_index_%s.json' % key)
+
+    def _load(self):
+        empty = {'version': INDEX_VERSION, 'root': self.root, 'dir_mtime': None, 'files': {}}
+        if not self.root or not self.cache_dir or not os.path.isfile(self._index_file()):
+            return empty
+        try:
+            with open(self._index_file(), 'r') as f:
+                index = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning('Ignoring unreadable HDRI index: %s' % e)
+            return empty
+        if index.get('version') != INDEX_VERSION:
+            return empty
+        return index
+
+    def _save(self):
+        if not self.root or not self.cache_dir:
+            return
+        with self._lock:
+            # The index is only ever replaced whole, never changed in place
+            index = self._index
+        try:
+            write_json(self._index_file(), index)
+        except (IOError, OSError) as e:
+            logger.warning('Could not write the HDRI index: %s' % e)
+
+
+def _list_files(root):
+    """
+    Yields (name, size, mtime) for the files in root, with as few stat calls as the platform allows.
+    """
+    if scandir:
+        for entry in scandir(root):
+            # On Windows the stat result comes free with the directory listing.
+            if entry.is_file():
+                st = entry.stat()
+                yield entry.name, st.st_size, st.st_mtime
+    else:
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                st = os.stat(path)
+                yield name, st.st_size, st.st_mtime
+
+
+def read_resolution(path):
+    """
+    Returns (width, height) read from the header of a Radiance .hdr or OpenEXR file.
+    """
+    if path.lower().endswith('.exr'):
+        return read_exr_resolution(path)
+    return read_hdr_resolution(path)
+
+
+def read_hdr_resolution(path):
+    with open(path, 'rb') as f:
+        f.readline()
+        # The header is a run of text lines closed by a blank line, followed by the resolution string.
+        for _ in range(64):
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                return _parse_hdr_resolution(f.readline())
+    raise ValueError('No resolution string found in %s' % path)
+
+
+def _parse_hdr_resolution(line):
+    # e.g. "-Y 1024 +X 2048"
+    match = re.match(br'\s*([-+])([XY])\s+(\d+)\s+([-+])([XY])\s+(\d+)', line)
+    if not match:
+        raise ValueError('Bad resolution string %r' % line)
+    if match.group(2) == b'Y':
+        return int(match.group(6)), int(match.group(3))
+    return int(match.group(3)), int(match.group(6))
+
+
+def read_exr_resolution(path):
+    window = read_exr_header(path)['dataWindow']
+    return window[2] - window[0] + 1, window[3] - window[1] + 1
+
+
+def read_exr_header(path):
+    """
+    Returns the attributes of an OpenEXR header that the tool cares about.  Only the header bytes are read.
+    """
+    header = {}
+    with open(path, 'rb') as f:
+        magic, version = struct.unpack('<ii', f.read(8))
+        if magic != 20000630:
+            raise ValueError('%s is not an OpenEXR file' % path)
+        while True:
+            name = _read_cstring(f)
+            if not name:
+                break
+            attr_type = _read_cstring(f)
+            size = struct.unpack('<i', f.read(4))[0]
+            value = f.read(size)
+            if attr_type == b'box2i':
+                header[name.decode('ascii')] = struct.unpack('<iiii', value)
+            elif attr_type == b'compression':
+                header[name.decode('ascii')] = struct.unpack('<B', value)[0]
+            elif attr_type == b'lineOrder':
+                header[name.decode('ascii')] = struct.unpack('<B', value)[0]
+            elif attr_type == b'chlist':
+                header[name.decode('ascii')] = _parse_chlist(value)
+        header['version'] = version
+        header['header_end'] = f.tell()
+    if 'dataWindow' not in header:
+        raise ValueError('%s has no dataWindow' % path)
+    return header
+
+
+def _read_cstring(f):
+    chars = []
+    while True:
+        c = f.read(1)
+        if not c or c == b'\x00':
+            return b''.join(chars)
+        chars.append(c)
+
+
+def _parse_chlist(value):
+    channels = []
+    offset = 0
+    while offset < len(value) and value[offset:offset + 1] != b'\x00':
+        end = value.index(b'\x00', offset)
+        name = value[offset:end].decode('ascii')
+        pixel_type, = struct.unpack('<i', value[end + 1:end + 5])
+        channels.append((name, pixel_type))
+        # pixel type, pLinear + 3 reserved bytes, xSampling, ySampling
+        offset = end + 1 + 16
+    return channels
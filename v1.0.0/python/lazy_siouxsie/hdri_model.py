@@ -0,0 +1,136 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Lazy list model for the HDRI library, plus the proxy behind the search box.
+
+Rows are handed to the view in batches as it scrolls, and previews are only asked for when the view paints a row, so
+a library of 10k+ HDRIs costs a list of strings until somebody looks at it.
+"""
+
+import sgtk
+from sgtk.platform.qt import QtCore, QtGui
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class HdriListModel(QtCore.QAbstractListModel):
+    """
+    HDRI names from an HdriLibrary, fetched into the view in batches.
+    """
+    BATCH_SIZE = 200
+
+    def __init__(self, library=None, thumbnails=None, parent=None):
+        QtCore.QAbstractListModel.__init__(self, parent)
+        self.library = library
+        self.thumbnails = thumbnails
+        self._names = []
+        self._rows = {}
+        self._loaded = 0
+        self._icons = {}
+        self._tooltips = {}
+        self._requested = set()
+        if thumbnails:
+            thumbnails.thumbnail_ready.connect(self.set_thumbnail)
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self._names = list(names)
+        self._rows = dict((name, row) for row, name in enumerate(self._names))
+        self._loaded = min(self.BATCH_SIZE, len(self._names))
+        self.endResetModel()
+
+    def row_of(self, name):
+        """
+        The source row of an HDRI, fetching up to it if needed.  None if it isn't in the library.
+        """
+        row = self._rows.get(name)
+        if row is not None and row >= self._loaded:
+            self._fetch_to(row + 1)
+        return row
+
+    def fetch_all(self):
+        self._fetch_to(len(self._names))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._names)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        self._fetch_to(self._loaded + self.BATCH_SIZE)
+
+    def _fetch_to(self, count):
+        count = min(count, len(self._names))
+        if count <= self._loaded:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, count - 1)
+        self._loaded = count
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        name = self._names[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return name
+        if role == QtCore.Qt.DecorationRole:
+            # Only rows the view is painting get here, so this is where previews are asked for.
+            if name not in self._requested:
+                self._request_thumbnail(name)
+            return self._icons.get(name)
+        if role == QtCore.Qt.ToolTipRole:
+            return self._tooltips.get(name, name)
+        return None
+
+    def _request_thumbnail(self, name):
+        self._requested.add(name)
+        if not self.thumbnails:
+            return
+        entry = self.library.entry(name) or {}
+        thumbnail = self.thumbnails.request(name, self.library.path(name), size=entry.get('size'),
+                                            mtime=entry.get('mtime'))
+        if thumbnail:
+            self._store_thumbnail(name, thumbnail)
+
+    def set_thumbnail(self, name, thumbnail):
+        self._store_thumbnail(name, thumbnail)
+        row = self._rows.get(name)
+        if row is not None and row < self._loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def _store_thumbnail(self, name, thumbnail):
+        self._icons[name] = QtGui.QIcon(thumbnail['thumbnail'])
+        self._tooltips[name] = '%s\nMean luminance: %.3f\nPeak luminance: %.1f' % (name, thumbnail['mean'],
+                                                                                   thumbnail['peak'])
+
+
+class HdriFilterModel(QtGui.QSortFilterProxyModel):
+    """
+    Case insensitive type-to-filter over an HdriListModel.
+    """
+
+    def __init__(self, parent=None):
+        QtGui.QSortFilterProxyModel.__init__(self, parent)
+        self.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+    def set_filter_text(self, text):
+        # Rows that have not been fetched yet can't match, so a search pulls in the (cheap) names first.
+        if text:
+            self.sourceModel().fetch_all()
+        self.setFilterFixedString(text)
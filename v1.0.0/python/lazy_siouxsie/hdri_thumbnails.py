@@ -0,0 +1,378 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tone mapped HDRI previews and luminance stats, decoded on a thread pool.
+
+Only the scanlines that land on a thumbnail row are decoded.  Radiance files are streamed a scanline at a time
+(run-length rows have to be walked to be skipped), and scanline OpenEXR files are read through their offset table,
+so only the chunks holding the sampled rows are ever read.  A 16K lat-long costs a couple of MB of RAM, not GBs.
+
+Results are cached on disk under a key made from the path, size and mtime of the source.
+"""
+
+import sgtk
+import os
+import json
+import math
+import zlib
+import struct
+import hashlib
+from multiprocessing.pool import ThreadPool
+
+from sgtk.platform.qt import QtCore
+from .hdri_library import read_exr_header, read_hdr_resolution
+logger = sgtk.platform.get_logger(__name__)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+THUMBNAIL_WIDTH = 256
+WORKERS = 4
+CACHE_VERSION = 1
+
+# OpenEXR compression id: scanlines per chunk.  Only these are decoded here.
+EXR_LINES_PER_CHUNK = {
+    0: 1,   # NO_COMPRESSION
+    1: 1,   # RLE_COMPRESSION
+    2: 1,   # ZIPS_COMPRESSION
+    3: 16,  # ZIP_COMPRESSION
+}
+# OpenEXR version flags of layouts that aren't decoded here: tiled (0x200), deep (0x800) and multi-part (0x1000)
+EXR_UNSUPPORTED_FLAGS = 0x200 | 0x800 | 0x1000
+# OpenEXR pixel type: bytes per sample, numpy dtype
+EXR_PIXEL_TYPES = {
+    0: (4, '<u4'),
+    1: (2, '<f2'),
+    2: (4, '<f4'),
+}
+
+
+class HdriThumbnailCache(QtCore.QObject):
+    """
+    Content addressed thumbnail cache, fed by a pool of decoder threads.
+    """
+    # name, {'thumbnail': png path, 'mean': mean luminance, 'peak': peak luminance, ...}
+    thumbnail_ready = QtCore.Signal(str, object)
+
+    def __init__(self, cache_dir=None, width=THUMBNAIL_WIDTH, workers=WORKERS, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.cache_dir = os.path.join(cache_dir, 'hdri_thumbnails') if cache_dir else None
+        self.width = width
+        self.workers = workers
+        self._pool = None
+        self._pending = set()
+
+    @staticmethod
+    def available():
+        return numpy is not None
+
+    def request(self, name, path, size=None, mtime=None):
+        """
+        Returns the cached result for an HDRI, or None after queueing it for decoding.  Queued results arrive
+        through thumbnail_ready.
+        """
+        if not self.cache_dir or not self.available():
+            return None
+        key = cache_key(path, size, mtime)
+        result = self._load(key)
+        if result:
+            return result
+        if key in self._pending:
+            return None
+        self._pending.add(key)
+        if not self._pool:
+            self._pool = ThreadPool(self.workers)
+        self._pool.apply_async(self._build, (name, path, key))
+        return None
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.terminate()
+            self._pool = None
+        self._pending.clear()
+
+    def _build(self, name, path, key):
+        try:
+            pixels, width, height, stats = make_thumbnail(path, self.width)
+            result = dict(stats)
+            result['thumbnail'] = self._path(key, '.png')
+            folder = os.path.dirname(result['thumbnail'])
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            write_png(result['thumbnail'], width, height, pixels)
+            with open(self._path(key, '.json'), 'w') as f:
+                json.dump(result, f)
+        except Exception as e:
+            logger.debug('No preview for %s: %s' % (path, e))
+            # So asking again, once the file is fixed say, tries again
+            self._pending.discard(key)
+            return
+        try:
+            self.thumbnail_ready.emit(name, result)
+        except RuntimeError:
+            # The dialog went away while we were decoding.
+            pass
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def _load(self, key):
+        stats_file = self._path(key, '.json')
+        if not os.path.isfile(stats_file):
+            return None
+        try:
+            with open(stats_file, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+
+def cache_key(path, size=None, mtime=None):
+    if size is None or mtime is None:
+        st = os.stat(path)
+        size = st.st_size
+        mtime = st.st_mtime
+    source = '%s|%s|%s|%s' % (CACHE_VERSION, path.replace('\\', '/'), size, mtime)
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+def make_thumbnail(path, thumb_width=THUMBNAIL_WIDTH):
+    """
+    Returns (rgb bytes, width, height, stats) for an 8 bit, tone mapped preview of an HDRI.
+    """
+    if path.lower().endswith('.exr'):
+        rows = _sample_exr(path, thumb_width)
+    else:
+        rows = _sample_hdr(path, thumb_width)
+    image = numpy.vstack([r[numpy.newaxis] for r, _ in rows]).astype(numpy.float64)
+    image = numpy.nan_to_num(numpy.clip(image, 0.0, None))
+    peak = max(p for _, p in rows)
+    luminance = image.dot([0.2126, 0.7152, 0.0722])
+    mean = float(luminance.mean())
+
+    # Reinhard, keyed so the average luminance lands on middle grey.
+    exposure = 0.18 / mean if mean > 0 else 1.0
+    mapped = image * exposure
+    mapped = mapped / (1.0 + mapped)
+    mapped = numpy.power(mapped, 1.0 / 2.2)
+    pixels = (numpy.clip(mapped, 0.0, 1.0) * 255.0 + 0.5).astype(numpy.uint8)
+    height, width = pixels.shape[:2]
+    stats = {'mean': mean, 'peak': float(peak), 'width': width, 'height': height}
+    return pixels.tobytes(), width, height, stats
+
+
+def _thumb_rows(width, height, thumb_width):
+    thumb_width = min(thumb_width, width)
+    thumb_height = max(1, int(round(thumb_width * float(height) / width)))
+    rows = [min(height - 1, int((i + 0.5) * height / thumb_height)) for i in range(thumb_height)]
+    return rows, thumb_width
+
+
+def _shrink_row(row, thumb_width):
+    """
+    Box filters a (width, 3) float row down to (thumb_width, 3).  Also returns the row's peak luminance.
+    """
+    peak = float(row.dot([0.2126, 0.7152, 0.0722]).max())
+    block = row.shape[0] // thumb_width
+    row = row[:block * thumb_width].reshape(thumb_width, block, 3).mean(axis=1)
+    return row, peak
+
+
+def _sample_hdr(path, thumb_width):
+    width, height = read_hdr_resolution(path)
+    rows, thumb_width = _thumb_rows(width, height, thumb_width)
+    wanted = set(rows)
+    samples = {}
+    with open(path, 'rb') as f:
+        # Skip to the pixels: header, blank line, resolution string.
+        while f.readline().strip():
+            pass
+        f.readline()
+        for y in range(rows[-1] + 1):
+            rgbe = _read_rgbe_scanline(f, width, keep=y in wanted)
+            if rgbe is None:
+                continue
+            exponent = rgbe[3].astype(numpy.int32)
+            scale = numpy.where(exponent > 0, numpy.ldexp(1.0, exponent - 136), 0.0)
+            rgb = (rgbe[:3].astype(numpy.float64) + 0.5) * scale
+            samples[y] = _shrink_row(rgb.T, thumb_width)
+    return [samples[y] for y in rows]
+
+
+def _read_rgbe_scanline(f, width, keep=True):
+    """
+    Reads one Radiance scanline.  Returns a (4, width) uint8 array, or None when keep is False.
+    """
+    header = bytearray(f.read(4))
+    if len(header) < 4:
+        raise ValueError('Unexpected end of file')
+    if width < 8 or width > 0x7fff or header[0] != 2 or header[1] != 2 or header[2] & 0x80:
+        # Flat scanline
+        data = bytes(header) + _read_exactly(f, 4 * width - 4)
+        if not keep:
+            return None
+        return numpy.frombuffer(data, numpy.uint8).reshape(width, 4).T
+    if (header[2] << 8 | header[3]) != width:
+        raise ValueError('Scanline width mismatch')
+    # A channel byte takes at most two bytes encoded, so the whole scanline is in one read; what is left over is
+    # given back with a seek.
+    data = bytearray(f.read(8 * width))
+    values = numpy.frombuffer(data, numpy.uint8) if keep else None
+    rgbe = numpy.empty((4, width), numpy.uint8) if keep else None
+    end = len(data)
+    pos = 0
+    for c in range(4):
+        x = 0
+        while x < width:
+            if pos >= end:
+                raise ValueError('Unexpected end of file')
+            count = data[pos]
+            run = count > 128
+            if run:
+                count -= 128
+            # A zero run would never move on, and a run past the end of the line would spill into the next one
+            if count == 0 or x + count > width:
+                raise ValueError('Bad run length %i at x %i of a %i wide scanline' % (count, x, width))
+            size = 1 if run else count
+            if pos + 1 + size > end:
+                raise ValueError('Unexpected end of file')
+            if keep:
+                if run:
+                    rgbe[c, x:x + count] = data[pos + 1]
+                else:
+                    rgbe[c, x:x + count] = values[pos + 1:pos + 1 + count]
+            pos += 1 + size
+            x += count
+    f.seek(pos - end, 1)
+    return rgbe
+
+
+def _read_exactly(f, size):
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError('Unexpected end of file')
+    return data
+
+
+def _sample_exr(path, thumb_width):
+    header = read_exr_header(path)
+    if header['version'] & EXR_UNSUPPORTED_FLAGS:
+        raise ValueError('Tiled, deep and multi-part OpenEXR files are not supported')
+    compression = header.get('compression', 0)
+    if compression not in EXR_LINES_PER_CHUNK:
+        raise ValueError('OpenEXR compression %s is not supported' % compression)
+    lines_per_chunk = EXR_LINES_PER_CHUNK[compression]
+    x_min, y_min, x_max, y_max = header['dataWindow']
+    width = x_max - x_min + 1
+    height = y_max - y_min + 1
+    channels = sorted(header['channels'])
+    rgb_channels = _rgb_channels([name for name, _ in channels])
+
+    # Where each channel sits inside a decoded scanline.
+    layout = {}
+    offset = 0
+    for name, pixel_type in channels:
+        sample_size, dtype = EXR_PIXEL_TYPES[pixel_type]
+        layout[name] = (offset, dtype, sample_size)
+        offset += sample_size * width
+    line_size = offset
+
+    rows, thumb_width = _thumb_rows(width, height, thumb_width)
+    chunk_count = int(math.ceil(height / float(lines_per_chunk)))
+    samples = []
+    with open(path, 'rb') as f:
+        f.seek(header['header_end'])
+        offsets = struct.unpack('<%iQ' % chunk_count, f.read(8 * chunk_count))
+        last_chunk = None
+        data = None
+        for y in rows:
+            chunk = y // lines_per_chunk
+            if chunk != last_chunk:
+                f.seek(offsets[chunk])
+                chunk_y, size = struct.unpack('<ii', f.read(8))
+                lines = min(lines_per_chunk, y_max - chunk_y + 1)
+                data = _exr_decompress(f.read(size), compression, lines * line_size)
+                last_chunk = chunk
+            line = (y - chunk * lines_per_chunk) * line_size
+            row = numpy.empty((width, 3), numpy.float64)
+            for i, name in enumerate(rgb_channels):
+                start, dtype, sample_size = layout[name]
+                start += line
+                row[:, i] = numpy.frombuffer(data[start:start + width * sample_size], dtype)
+            samples.append(_shrink_row(row, thumb_width))
+    return samples
+
+
+def _rgb_channels(names):
+    for r, g, b in (('R', 'G', 'B'), ('Y', 'Y', 'Y')):
+        if r in names and g in names and b in names:
+            return r, g, b
+    # Layered files, e.g. "beauty.R"
+    for name in names:
+        if name.endswith('.R'):
+            prefix = name[:-1]
+            if prefix + 'G' in names and prefix + 'B' in names:
+                return prefix + 'R', prefix + 'G', prefix + 'B'
+    raise ValueError('No RGB or Y channels found')
+
+
+def _exr_decompress(data, compression, expected_size):
+    if compression == 0 or len(data) == expected_size:
+        return data
+    if compression == 1:
+        data = _exr_rle_decode(data)
+    else:
+        data = zlib.decompress(data)
+    # Undo the predictor, then the byte interleaving.
+    t = numpy.frombuffer(data, numpy.uint8).astype(numpy.int32)
+    t[1:] -= 128
+    t = (numpy.cumsum(t) & 0xff).astype(numpy.uint8)
+    half = (len(t) + 1) // 2
+    out = numpy.empty(len(t), numpy.uint8)
+    out[0::2] = t[:half]
+    out[1::2] = t[half:]
+    return out.tobytes()
+
+
+def _exr_rle_decode(data):
+    data = bytearray(data)
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        count = data[i]
+        if count > 127:
+            count = 256 - count
+            out.extend(data[i + 1:i + 1 + count])
+            i += 1 + count
+        else:
+            out.extend(data[i + 1:i + 2] * (count + 1))
+            i += 2
+    return bytes(out)
+
+
+def write_png(path, width, height, rgb):
+    """
+    Writes 8 bit RGB bytes out as a PNG.
+    """
+    stride = width * 3
+    raw = b''.join(b'\x00' + rgb[y * stride:(y + 1) * stride] for y in range(height))
+
+    def chunk(tag, body):
+        return (struct.pack('>I', len(body)) + tag + body +
+                struct.pack('>I', zlib.crc32(tag + body) & 0xffffffff))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+        f.write(chunk(b'IEND', b''))
@@ -0,0 +1,42 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+DAG hierarchy helpers.
+"""
+
+from maya import cmds
+
+
+def top_level_roots(nodes, exclude=None):
+    """
+    Returns the unique top level (world parented) ancestors of a set of DAG nodes.
+
+    Every path of every node is fetched in one ls query, including all the paths of instanced nodes, and the root is
+    simply the first component of each long path.  That is O(total path length) with no depth limit.  Namespaces
+    live inside path components, so they come through untouched.
+    """
+    if not nodes:
+        return []
+    # An empty list would make ls return every node in the scene.
+    exclude = set(cmds.ls(exclude, long=True) or []) if exclude else set()
+    roots = []
+    seen = set()
+    for path in cmds.ls(nodes, long=True, allPaths=True) or []:
+        # "|root|child|shape" and underworld paths like "|root|surface->|curve" both start with the root.
+        root = '|' + path.split('|', 2)[1].split('->')[0]
+        if root in seen or root in exclude:
+            continue
+        seen.add(root)
+        roots.append(root)
+    # Hand back the same shortest unique names the rest of the tool works with.
+    if not roots:
+        return []
+    return cmds.ls(roots) or []
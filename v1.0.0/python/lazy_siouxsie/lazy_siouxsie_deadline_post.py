@@ -1,28 +1,116 @@
+import os
 import re
-from System.IO import *
+import threading
 from Deadline.Scripting import *
 
+# Frame padding of an output file name, e.g. the #### of layer_v001.####.exr
+paddingRegex = re.compile("([^\\?#]*)([\\?#]+)(.*)")
+# Threads that stat the frames; the outputs usually live on a file server, so most of the time goes on round trips
+STAT_THREADS = 16
+# The extra info key counting how often this script has requeued the job, so a frame that never renders can't keep
+# the job going round forever
+REQUEUE_KEY = "LazySiouxsieRequeues"
+MAX_REQUEUES = 2
+
+
 def __main__( *args ):
     deadlinePlugin = args[0]
     job = deadlinePlugin.GetJob()
-    outputDirectories = job.OutputDirectories
-    outputFilenames = job.OutputFileNames
-    paddingRegex = re.compile("[^\\?#]*([\\?#]+).*")
-
-    for i in range( 0, len(outputDirectories) ):
-        outputDirectory = outputDirectories[i]
-        outputFilename = outputFilenames[i]
-
-        startFrame = deadlinePlugin.GetStartFrame()
-        endFrame = deadlinePlugin.GetEndFrame()
-        for frameNum in range(startFrame, endFrame+1):
-            outputPath = Path.Combine(outputDirectory,outputFilename)
-            outputPath = outputPath.replace("//","/")
-
-            m = re.match(paddingRegex,outputPath)
-            if( m != None):
-                padding = m.group(1)
-                frame = StringUtils.ToZeroPaddedString(frameNum,len(padding),False)
-                outputPath = outputPath.replace( padding, frame )
-
-            deadlinePlugin.LogInfo( "Output file: " + outputPath )
\ No newline at end of file
+    frames = jobFrames( deadlinePlugin, job )
+
+    # Every output is expanded once, and every frame path built from it without going back to the regex
+    paths = []
+    for outputDirectory, outputFilename in zip( job.OutputDirectories, job.OutputFileNames ):
+        outputPath = os.path.join( outputDirectory, outputFilename ).replace( "//", "/" )
+        paths.extend( framePaths( outputPath, frames ) )
+
+    missing, empty = checkFrames( paths )
+    badFrames = sorted( set( [frame for frame, path in missing + empty] ) )
+    summary = "Verified %i frames of %i outputs: %i missing, %i empty" % (
+        len( frames ), len( job.OutputDirectories ), len( missing ), len( empty ) )
+    if not badFrames:
+        deadlinePlugin.LogInfo( summary + "." )
+        return
+
+    badPaths = ", ".join( [path for frame, path in (missing + empty)[:10]] )
+    requeues = int( job.GetJobExtraInfoKeyValueWithDefault( REQUEUE_KEY, "0" ) or 0 )
+    if requeues >= MAX_REQUEUES:
+        deadlinePlugin.LogWarning( "%s; frames %s are still bad after %i requeues, leaving them: %s" % (
+            summary, listFrames( badFrames ), requeues, badPaths ) )
+        return
+
+    tasks = tasksOfFrames( job, badFrames )
+    job.SetJobExtraInfoKeyValue( REQUEUE_KEY, str( requeues + 1 ) )
+    RepositoryUtils.SaveJob( job )
+    RepositoryUtils.RequeueTasks( job, tasks )
+    deadlinePlugin.LogWarning( "%s; requeued %i tasks for frames %s: %s" % (
+        summary, len( tasks ), listFrames( badFrames ), badPaths ) )
+
+
+def jobFrames( deadlinePlugin, job ):
+    """
+    The frames the job renders.  Render slices submit a stepped frame list, so its range has gaps.
+    """
+    try:
+        return list( job.JobFramesList )
+    except AttributeError:
+        return list( range( deadlinePlugin.GetStartFrame(), deadlinePlugin.GetEndFrame() + 1 ) )
+
+
+def framePaths( outputPath, frames ):
+    """
+    (frame, path) of every frame of an output path.
+    """
+    m = paddingRegex.match( outputPath )
+    if m is None:
+        return [(frame, outputPath) for frame in frames]
+    prefix, padding, suffix = m.groups()
+    return [(frame, "%s%0*d%s" % (prefix, len( padding ), frame, suffix)) for frame in frames]
+
+
+def checkFrames( paths ):
+    """
+    Stats (frame, path) pairs on a few threads.  Returns the missing ones and the empty ones.
+    """
+    missing = []
+    empty = []
+    lock = threading.Lock()
+    pending = list( paths )
+
+    def work():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                frame, path = pending.pop()
+            try:
+                size = os.stat( path ).st_size
+            except OSError:
+                with lock:
+                    missing.append( (frame, path) )
+                continue
+            if size == 0:
+                with lock:
+                    empty.append( (frame, path) )
+
+    workers = [threading.Thread( target=work ) for i in range( min( STAT_THREADS, len( paths ) ) )]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sorted( missing ), sorted( empty )
+
+
+def tasksOfFrames( job, frames ):
+    """
+    The tasks that render any of frames.
+    """
+    frames = set( frames )
+    tasks = RepositoryUtils.GetJobTasks( job, True ).TaskCollectionTasks
+    return [task for task in tasks if frames.intersection( task.TaskFrameList )]
+
+
+def listFrames( frames ):
+    if len( frames ) > 20:
+        return "%s ... (%i frames)" % (",".join( [str( frame ) for frame in frames[:20]] ), len( frames ))
+    return ",".join( [str( frame ) for frame in frames] )
@@ -0,0 +1,130 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Disk backed cache of the Shotgun Project render settings.
+
+The Project is queried once for the union of every field the tool needs.  The result is kept on disk per project id
+and re-used until it is older than the TTL, at which point it is still returned immediately and refreshed on a
+background thread for the next time the dialog opens.
+"""
+
+import sgtk
+import os
+import json
+import time
+import threading
+
+from .file_utils import write_json
+logger = sgtk.platform.get_logger(__name__)
+
+PROJECT_FIELDS = [
+    'sg_output_resolution',
+    'sg_pixel_aspect',
+    'sg_renderers',
+    'sg_frame_rate',
+    'sg_render_format'
+]
+
+
+class ProjectSettingsCache(object):
+    """
+    Project render settings keyed by project id.
+    """
+
+    def __init__(self, tk=None, cache_dir=None, ttl=86400):
+        self.tk = tk
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, project_id):
+        """
+        Returns the settings dictionary for a project.  Only talks to Shotgun when nothing is cached yet.
+        """
+        cached = self._load(project_id)
+        if cached:
+            if time.time() - cached['fetched'] > self.ttl:
+                self.refresh_async(project_id)
+            return cached['settings']
+        return self.refresh(project_id)
+
+    def refresh(self, project_id):
+        logger.debug('Fetching render settings for project %s from Shotgun...' % project_id)
+        # tk.shotgun hands out a connection per thread, so this is safe from the refresh thread.
+        project = self.tk.shotgun.find_one('Project', [['id', 'is', project_id]], PROJECT_FIELDS)
+        settings = parse_project(project)
+        self._save(project_id, settings)
+        return settings
+
+    def refresh_async(self, project_id):
+        with self._lock:
+            if project_id in self._refreshing:
+                return
+            self._refreshing.add(project_id)
+        refresh = threading.Thread(target=self._refresh_quietly, args=(project_id,),
+                                   name='lazy_siouxsie_project_settings')
+        refresh.daemon = True
+        refresh.start()
+
+    def _refresh_quietly(self, project_id):
+        try:
+            self.refresh(project_id)
+        except Exception as e:
+            logger.warning('Background refresh of the project settings failed: %s' % e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(project_id)
+
+    def _cache_file(self, project_id):
+        return os.path.join(self.cache_dir, 'project_settings_%s.json' % project_id)
+
+    def _load(self, project_id):
+        if not self.cache_dir:
+            return None
+        cache_file = self._cache_file(project_id)
+        if not os.path.isfile(cache_file):
+            return None
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning('Ignoring unreadable project settings cache %s: %s' % (cache_file, e))
+            return None
+
+    def _save(self, project_id, settings):
+        if not self.cache_dir:
+            return
+        try:
+            write_json(self._cache_file(project_id), {'fetched': time.time(), 'settings': settings})
+        except (IOError, OSError) as e:
+            logger.warning('Could not write the project settings cache: %s' % e)
+
+
+def parse_project(project):
+    """
+    Flattens a Shotgun Project record into the plain settings the dialog uses.
+    """
+    settings = {}
+    resolution = project.get('sg_output_resolution') or ''
+    if 'x' in resolution:
+        settings['width'] = resolution.split('x')[0].strip()
+        settings['height'] = resolution.split('x')[1].strip()
+    else:
+        settings['width'] = None
+        settings['height'] = None
+    settings['aspect_ratio'] = project.get('sg_pixel_aspect')
+    settings['frame_rate'] = project.get('sg_frame_rate')
+    render_format = project.get('sg_render_format')
+    settings['render_format'] = render_format['name'] if render_format else None
+    renderers = project.get('sg_renderers')
+    settings['render_engine'] = renderers[0]['name'] if renderers else None
+    return settings
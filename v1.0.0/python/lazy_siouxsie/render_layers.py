@@ -0,0 +1,88 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Puts a render setup document (see render_setup_doc) into the scene.
+
+The document is decoded by Render Setup in one call.  If the decoder won't take it, the same document is authored
+directly on the layer objects instead: collections and absolute overrides are created on the layers and the override
+values set on the overrides, so the visible layer never has to change.  overrideUtils.createAbsoluteOverride and
+cmds.setAttr only work on the visible layer, and every switch makes Maya re-apply all overrides and re-evaluate the
+scene.
+"""
+
+import sgtk
+import maya.app.renderSetup.model.renderSetup as renderSetup
+import maya.app.renderSetup.model.renderLayer as renderLayer
+import maya.app.renderSetup.model.typeIDs as typeIDs
+
+logger = sgtk.platform.get_logger(__name__)
+
+# Render Setup backs every layer with a legacy renderLayer node named with this prefix, which is the name the Render
+# command, and so Deadline's RenderLayer, takes
+LEGACY_LAYER_PREFIX = 'rs_'
+
+
+def import_document(document):
+    """
+    Adds the layers of a render setup document to the scene's render setup.
+    """
+    rs = renderSetup.instance()
+    # Layers the artist already has are never touched, even if one happens to share a turntable layer's name.
+    existing = set(layer.name() for layer in rs.getRenderLayers())
+    try:
+        rs.decode(document, renderSetup.DECODE_AND_MERGE, None)
+    except Exception as e:
+        logger.warning('Render Setup could not decode the turntable layers (%s), building them one by one.' % e)
+        # Drop whatever the decode got through before it failed.
+        for layer in rs.getRenderLayers():
+            if layer.name() not in existing:
+                renderLayer.delete(layer)
+        author_document(rs, document)
+
+
+def author_document(rs, document):
+    """
+    Creates the layers, collections and absolute overrides of a document through the render setup model.
+    """
+    for layer_data in document['renderSetup']['renderLayers']:
+        layer_data = layer_data['renderSetupLayer']
+        layer = rs.createRenderLayer(layer_data['name'])
+        layer.setRenderable(layer_data.get('renderable', True))
+        for collection_data in layer_data['collections']:
+            collection_data = collection_data['collection']
+            selector_data = collection_data['selector']['simpleSelector']
+            collection_set = add_collection(layer, collection_data['name'], selector_data['pattern'],
+                                            filter_type=selector_data['typeFilter'])
+            for override_data in collection_data['children']:
+                override_data = override_data['absOverride']
+                absolute = collection_set.createOverride(override_data['name'], typeIDs.absOverride)
+                # Override collections select a single node; finalize points the override at its plug, then the
+                # value goes on the override itself.
+                absolute.finalize('%s.%s' % (selector_data['pattern'], override_data['attribute']))
+                absolute.setAttrValue(override_data['value'])
+
+
+def add_collection(layer, name, pattern, filter_type=None):
+    """
+    Adds a collection selecting pattern to layer.
+    """
+    collection_set = layer.createCollection(name)
+    if filter_type is not None:
+        collection_set.getSelector().setFilterType(filter_type)
+    collection_set.getSelector().setPattern(pattern)
+    return collection_set
+
+
+def legacy_layer_name(name):
+    """
+    The renderLayer node behind the render setup layer name.
+    """
+    return LEGACY_LAYER_PREFIX + name
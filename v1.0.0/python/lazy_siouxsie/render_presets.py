@@ -0,0 +1,227 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Declarative render presets.
+
+The render settings and turntable shaders are described as ordered tables of (plug, value) pairs, compiled from the
+quality, resolution and format chosen in the UI.  A table is applied in a single undo chunk, and only the plugs whose
+value actually differs are set.  The same table can be dumped to JSON, so the farm can check what a scene was meant to
+render with.
+"""
+
+import math
+import sgtk
+from maya import cmds
+
+from .file_utils import write_json
+
+logger = sgtk.platform.get_logger(__name__)
+
+# Float plugs closer than this are considered unchanged
+TOLERANCE = 1e-6
+
+# Shaders of the chrome and gray reference balls, per renderer.  Colors are (r, g, b) tuples.
+BALL_SHADERS = {
+    'arnold': {
+        'chrome': [
+            ('metalness', 1),
+            ('base', 1),
+            ('baseColor', (1, 1, 1)),
+            ('specular', 0),
+            ('specularAnisotropy', 0.5),
+        ],
+        'gray': [
+            ('base', 1),
+            ('baseColor', (0.5, 0.5, 0.5)),
+            ('specularColor', (0.5, 0.5, 0.5)),
+            ('specular', 1),
+            ('specularRoughness', 0.65),
+        ]
+    },
+    'vray': {
+        'chrome': [
+            ('useFresnel', 0),
+            ('reflectionColor', (1, 1, 1)),
+            ('diffuseColorAmount', 0),
+            ('color', (1, 1, 1)),
+        ],
+        'gray': [
+            ('color', (0.5, 0.5, 0.5)),
+            ('reflectionColor', (0.5, 0.5, 0.5)),
+            ('hilightGlossinessLock', 0),
+            ('reflectionGlossiness', 0),
+            ('hilightGlossiness', 0.35),
+        ]
+    }
+}
+
+# Shadow catcher settings of the ground material, per renderer
+GROUND_SHADERS = {
+    'vray': [
+        ('matteSurface', 1),
+        ('shadows', 1),
+        ('affectAlpha', 1),
+        ('alphaContribution', -1),
+    ]
+}
+
+# Render settings the ground shadow catcher relies on
+GROUND_RENDER_SETTINGS = {
+    'vray': [
+        ('vraySettings.giOn', 0),
+        ('vraySettings.cam_overrideEnvtex', 1),
+    ]
+}
+
+
+def node_settings(node, attributes):
+    """
+    Turns a list of (attribute, value) pairs into (plug, value) pairs on node.
+    """
+    return [('%s.%s' % (node, attribute), value) for attribute, value in attributes]
+
+
+def vray_quality(quality):
+    """
+    The V-Ray DMC sampler settings for a quality value.
+    """
+    # Adaptive Amount base on the following equation with constants figured out from domain and range variables
+    # d = Adaptive Amplitude
+    # r = Adaptive Slope
+    # f(x) = d * arctan(r * x) - 1.05
+    adaptive_amplitude = 1.35950130973274
+    adaptive_slope = 0.99
+    adaptive_amount = adaptive_amplitude * math.atan(adaptive_slope * float(quality)) - 1.05
+    # Adaptive Threshold based on the following equation with constants figured out from domain/range variables
+    # d = Threshold Amplitude
+    # f(x) = -d * arctan(x) + 0.195
+    threshold_amplitude = 0.12915262442461
+    adaptive_threshold = ((-1 * threshold_amplitude) * math.atan(float(quality))) + 0.195
+    return [
+        ('vraySettings.samplerType', 4),
+        ('vraySettings.minShadeRate', quality),
+        ('vraySettings.giOn', 0),
+        ('vraySettings.cam_overrideEnvtex', 1),
+        ('vraySettings.dmcMinSubdivs', 1),
+        ('vraySettings.dmcMaxSubdivs', int(2.4 * quality)),
+        ('vraySettings.dmcThreshold', 0.1 / quality),
+        ('vraySettings.dmcs_adaptiveAmount', adaptive_amount),
+        ('vraySettings.dmcs_adaptiveThreshold', adaptive_threshold),
+    ]
+
+
+def arnold_quality(quality):
+    """
+    The Arnold sampling settings for a quality value.
+    """
+    quality_mult = 0.4
+    secondary_samples = int(math.ceil(quality * quality_mult))
+    return [
+        ('defaultArnoldRenderOptions.AASamples', quality),
+        ('defaultArnoldRenderOptions.GIDiffuseSamples', secondary_samples),
+        ('defaultArnoldRenderOptions.GISpecularSamples', secondary_samples),
+        ('defaultArnoldRenderOptions.GITransmissionSamples', secondary_samples),
+        ('defaultArnoldRenderOptions.GISssSamples', secondary_samples),
+        ('defaultArnoldRenderOptions.GIVolumeSamples', secondary_samples - 1),
+    ]
+
+
+def render_settings(renderer=None, quality=None, width=None, height=None, pixel_aspect=1.0, start_frame=None,
+                    end_frame=None, image_format=None, task=None, version=None):
+    """
+    The render settings table of a renderer, in the order they are to be applied.
+
+    image_format is the renderer's own name for the output format.
+    """
+    if renderer == 'vray':
+        path_settings = '%s/<layer>/%s/<layer>_<scene>' % (task, version)
+        return [
+            ('defaultRenderGlobals.ren', renderer),
+            ('vraySettings.aspectLock', 0),
+            ('vraySettings.animType', 1),
+            ('defaultRenderGlobals.startFrame', start_frame),
+            ('defaultRenderGlobals.endFrame', end_frame),
+            ('vraySettings.fileNamePrefix', path_settings),
+            ('vraySettings.width', int(width)),
+            ('vraySettings.height', int(height)),
+            ('vraySettings.pixelAspect', float(pixel_aspect)),
+            ('vraySettings.imageFormatStr', image_format),
+        ] + vray_quality(quality)
+    elif renderer == 'arnold':
+        path_settings = '%s/<RenderLayer>/%s/<RenderLayer>_<Scene>' % (task, version)
+        return [
+            ('defaultRenderGlobals.ren', renderer),
+            ('defaultRenderGlobals.imageFilePrefix', path_settings),
+            ('defaultRenderGlobals.outFormatControl', 0),
+            ('defaultRenderGlobals.animation', 1),
+            ('defaultRenderGlobals.putFrameBeforeExt', 1),
+            ('defaultRenderGlobals.extensionPadding', 4),
+            ('defaultRenderGlobals.startFrame', start_frame),
+            ('defaultRenderGlobals.endFrame', end_frame),
+            ('defaultResolution.width', int(width)),
+            ('defaultResolution.height', int(height)),
+            ('defaultArnoldDriver.ai_translator', image_format),
+        ] + arnold_quality(quality)
+    return []
+
+
+def apply_settings(settings, name='lazySiouxsiePreset'):
+    """
+    Sets every plug in a settings table that doesn't already hold its value, all in one undo chunk.  Returns the
+    plugs that were changed.
+    """
+    changed = []
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    try:
+        for plug, value in settings:
+            if _matches(plug, value):
+                continue
+            _set(plug, value)
+            changed.append(plug)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    logger.debug('%s: %i of %i settings changed.' % (name, len(changed), len(settings)))
+    return changed
+
+
+def dump_settings(settings, path):
+    """
+    Writes a settings table to a JSON file.
+    """
+    write_json(path, [{'plug': plug, 'value': value} for plug, value in settings])
+    return path
+
+
+def _set(plug, value):
+    if isinstance(value, basestring):
+        cmds.setAttr(plug, value, type='string')
+    elif isinstance(value, (list, tuple)):
+        cmds.setAttr(plug, *value, type='double3')
+    else:
+        cmds.setAttr(plug, value)
+
+
+def _matches(plug, value):
+    current = cmds.getAttr(plug)
+    if isinstance(value, basestring):
+        return current == value
+    if isinstance(value, (list, tuple)):
+        # Compound plugs come back as [(x, y, z)]
+        current = current[0] if current else ()
+        return len(current) == len(value) and all(_close(a, b) for a, b in zip(current, value))
+    return _close(current, value)
+
+
+def _close(current, value):
+    try:
+        return abs(float(current) - float(value)) <= TOLERANCE
+    except (TypeError, ValueError):
+        return current == value
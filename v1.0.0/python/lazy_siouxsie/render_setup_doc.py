@@ -0,0 +1,148 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Builds the turntable's whole render setup as a Render Setup JSON document.
+
+The document is the same shape Render Setup exports, so Maya can import it with a single decode call instead of the
+layers, collections and overrides being made one by one.  Nothing in here touches Maya; a document can be generated,
+inspected, cached or diffed anywhere.
+"""
+
+import os
+
+# Collection type filters, the values of maya.app.renderSetup.model.selector.Filters
+ALL = 0
+TRANSFORMS = 1
+
+TURNTABLE_GROUP = '_Turntable_Set_Prep'
+ARTIST_LIGHTS_LAYER = 'Artist_Lights'
+# setAttr types of the hdri settings file whose values are held as a list of their components
+VECTOR_TYPES = ('double2', 'double3', 'float2', 'float3', 'long2', 'long3', 'short2', 'short3')
+
+
+def absolute_override(name, attribute, value):
+    return {
+        'absOverride': {
+            'name': name,
+            'enabled': True,
+            'selfEnabled': True,
+            'isLocal': True,
+            'attribute': attribute,
+            'value': value
+        }
+    }
+
+
+def collection(name, pattern, type_filter=TRANSFORMS, overrides=None):
+    return {
+        'collection': {
+            'name': name,
+            'selfEnabled': True,
+            'selfIsolated': False,
+            'selector': {
+                'simpleSelector': {
+                    'pattern': pattern,
+                    'staticSelection': '',
+                    'typeFilter': type_filter,
+                    'customFilterValue': ''
+                }
+            },
+            'children': overrides or []
+        }
+    }
+
+
+def node_collection(layer_name, node, overrides):
+    """
+    A collection holding just node, with an absolute override per (attribute, value) in overrides.
+    """
+    name = '%s_%s' % (layer_name, node.split('|')[-1].replace(':', '_'))
+    return collection(name, node, type_filter=ALL,
+                      overrides=[absolute_override('%s_%s' % (name, attribute), attribute, value)
+                                 for attribute, value in overrides])
+
+
+def render_layer(name, collections, renderable=True):
+    return {
+        'renderSetupLayer': {
+            'name': name,
+            'renderable': renderable,
+            'visibility': False,
+            'collections': collections
+        }
+    }
+
+
+def override_value(value, value_type=None):
+    """
+    A setting's value the way an absolute override holds it.  value_type is the setAttr type the hdri settings file
+    gives, if any: a string is held as text and a vector as the list of its components.
+    """
+    if value_type == 'string':
+        return '%s' % value
+    if value_type in VECTOR_TYPES:
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        # The settings file may spell a vector the way setAttr takes it, "1 0.5 0"
+        return [float(component) for component in ('%s' % value).split()]
+    return value
+
+
+def hdri_overrides(hdri, hdri_setup=None, renderer=None):
+    """
+    The file and dome light overrides of one HDRI: its texture, plus whatever the hdri settings file asks for.
+    """
+    file_overrides = [('fileTextureName', hdri)]
+    dome_overrides = []
+    extra_settings = (hdri_setup or {}).get(os.path.basename(hdri), {})
+    for setting in extra_settings.get(renderer, []):
+        value = override_value(setting['value'], setting.get('type'))
+        if setting['node'] == 'light':
+            dome_overrides.append((setting['setting'], value))
+        elif setting['node'] == 'file':
+            file_overrides.append((setting['setting'], value))
+    return file_overrides, dome_overrides
+
+
+def turntable_render_setup(hdri_list=None, set_members=None, file_node=None, dome=None, light_trans=None,
+                           light_grp=None, lights=None, artist_lights=False, hdri_setup=None, renderer=None):
+    """
+    The render setup document of a turntable: a layer per HDRI and, if asked for, a layer lit by the artist's lights.
+
+    set_members are the balls and ground that go in every layer along with the turntable group.  Returns the
+    document and the names of its layers.
+    """
+    scene_pattern = ', '.join([TURNTABLE_GROUP] + list(set_members or []))
+    layers = []
+    layer_names = []
+    for hdri in hdri_list or []:
+        name = os.path.splitext(os.path.basename(hdri))[0]
+        file_overrides, dome_overrides = hdri_overrides(hdri, hdri_setup=hdri_setup, renderer=renderer)
+        collections = [
+            collection('Scene_%s' % name, scene_pattern),
+            node_collection(name, file_node, file_overrides)
+        ]
+        if dome_overrides:
+            collections.append(node_collection(name, dome, dome_overrides))
+        if lights:
+            collections.append(node_collection(name, light_trans, [('visibility', 1)]))
+            collections.append(node_collection(name, light_grp, [('visibility', 0)]))
+        layers.append(render_layer(name, collections))
+        layer_names.append(name)
+
+    if lights and artist_lights:
+        layers.append(render_layer(ARTIST_LIGHTS_LAYER, [
+            collection('geo', scene_pattern),
+            collection('artist_lights', ', '.join(lights)),
+            node_collection(ARTIST_LIGHTS_LAYER, light_trans, [('visibility', 0)]),
+            node_collection(ARTIST_LIGHTS_LAYER, light_grp, [('visibility', 1)])
+        ]))
+    return {'renderSetup': {'renderLayers': layers}}, layer_names
@@ -0,0 +1,154 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+One pass inventory of the scene nodes the turntable tool cares about.
+
+The DAG is walked once to sort lights, renderable geometry and leftover turntable parts into buckets.  After that
+the buckets are kept up to date from Maya's node added/removed/renamed callbacks rather than by rescanning.  Nodes
+are held as MObjectHandles, so names are always resolved at the time they are asked for.
+"""
+
+import sgtk
+from maya import cmds
+import maya.api.OpenMaya as om
+
+logger = sgtk.platform.get_logger(__name__)
+
+LIGHTS = 'lights'
+GEOMETRY = 'geometry'
+PARTS = 'parts'
+
+# Nodes the tool builds.  If any of these are in the scene, it has already been turntabled.
+TURNTABLE_PARTS = [
+    '_Turntable_Set_Prep',
+    '_turntable_cam',
+    'turn_table_cam1',
+    '_HDRI_light',
+    '_turntable_ground_plane',
+    '_turntable_chrome_ball',
+    '_turntable_gray_ball'
+]
+GEOMETRY_TYPES = ['mesh', 'nurbsSurface']
+
+
+class SceneInventory(object):
+    """
+    Lights, renderable geometry, ground candidates and leftover turntable parts, from a single DAG traversal.
+    """
+
+    def __init__(self, light_types=None, parts=TURNTABLE_PARTS):
+        self.light_types = set(light_types or [])
+        self.parts = set(parts)
+        self._nodes = {LIGHTS: {}, GEOMETRY: {}, PARTS: {}}
+        self._type_categories = {}
+        self._callbacks = []
+
+    def scan(self):
+        """
+        Walks the DAG once and fills every bucket.
+        """
+        for bucket in self._nodes.values():
+            bucket.clear()
+        dag_it = om.MItDag()
+        while not dag_it.isDone():
+            self._add(dag_it.currentItem())
+            dag_it.next()
+        logger.debug('Scene inventory: %i lights, %i geometry, %i turntable parts.' %
+                     (len(self._nodes[LIGHTS]), len(self._nodes[GEOMETRY]), len(self._nodes[PARTS])))
+
+    def start(self):
+        """
+        Scans the scene and starts following it through callbacks.
+        """
+        self.stop()
+        self.scan()
+        self._callbacks = [
+            om.MDGMessage.addNodeAddedCallback(self._node_added, 'dagNode'),
+            om.MDGMessage.addNodeRemovedCallback(self._node_removed, 'dagNode'),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self._name_changed)
+        ]
+
+    def stop(self):
+        if self._callbacks:
+            om.MMessage.removeCallbacks(self._callbacks)
+            self._callbacks = []
+
+    def lights(self):
+        return self._names(LIGHTS)
+
+    def geometry(self):
+        return self._names(GEOMETRY)
+
+    def ground_candidates(self):
+        return [geo for geo in self.geometry() if 'ground' in geo.lower()]
+
+    def leftover_parts(self):
+        return self._names(PARTS)
+
+    def _names(self, category):
+        names = []
+        bucket = self._nodes[category]
+        for key, handle in list(bucket.items()):
+            if not handle.isValid():
+                del bucket[key]
+                continue
+            names.append(_node_name(handle.object()))
+        return names
+
+    def _categories(self, type_name):
+        """
+        The buckets a node type belongs in, resolved once per type including inherited types.
+        """
+        categories = self._type_categories.get(type_name)
+        if categories is None:
+            inherited = set(cmds.nodeType(type_name, inherited=True, isTypeName=True) or [])
+            categories = set()
+            if type_name in self.light_types or 'light' in inherited:
+                categories.add(LIGHTS)
+            if inherited.intersection(GEOMETRY_TYPES):
+                categories.add(GEOMETRY)
+            self._type_categories[type_name] = categories
+        return categories
+
+    def _add(self, obj):
+        handle = om.MObjectHandle(obj)
+        key = handle.hashCode()
+        for category in self._categories(om.MFnDependencyNode(obj).typeName):
+            self._nodes[category][key] = handle
+        self._check_part(obj, handle)
+
+    def _check_part(self, obj, handle):
+        key = handle.hashCode()
+        if om.MFnDependencyNode(obj).name() in self.parts:
+            self._nodes[PARTS][key] = handle
+        else:
+            self._nodes[PARTS].pop(key, None)
+
+    def _node_added(self, obj, client_data=None):
+        self._add(obj)
+
+    def _node_removed(self, obj, client_data=None):
+        key = om.MObjectHandle(obj).hashCode()
+        for bucket in self._nodes.values():
+            bucket.pop(key, None)
+
+    def _name_changed(self, obj, old_name, client_data=None):
+        if obj.hasFn(om.MFn.kDagNode):
+            self._check_part(obj, om.MObjectHandle(obj))
+
+
+def _node_name(obj):
+    """
+    The shortest unique name of a node, the same as cmds.ls hands back.
+    """
+    if obj.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(obj).partialPathName()
+    return om.MFnDependencyNode(obj).name()
@@ -20,17 +20,9 @@ GOALS:
 import sgtk
 import platform
 import os
-import sys
-import maya.app.renderSetup.model.override as override
-import maya.app.renderSetup.model.selector as selector
-import maya.app.renderSetup.model.collection as collection
-import maya.app.renderSetup.model.renderLayer as renderLayer
 import maya.app.renderSetup.model.renderSetup as renderSetup
-import maya.app.renderSetup.views.overrideUtils as utils
+import maya.utils
 from maya import cmds
-import glob
-import re
-from time import sleep
 import math
 from datetime import datetime
 import json
@@ -39,6 +31,29 @@ import json
 # the code will be compatible with both PySide and PyQt.
 from sgtk.platform.qt import QtCore, QtGui
 from .ui.lazy_siouxsie_ui import Ui_lazySiouxsie
+from . import deadline_gateway
+from .deadline_gateway import DeadlineGateway
+from .project_settings import ProjectSettingsCache
+from .hdri_library import HdriLibrary
+from .hdri_thumbnails import HdriThumbnailCache
+from .hdri_model import HdriListModel, HdriFilterModel
+from .scene_inventory import SceneInventory
+from .build_executor import BuildExecutor, BuildStage, BuildAborted
+from .hierarchy import top_level_roots
+from .bounds import scene_bounds
+from .framing import solve_framing, solve_turntable_framing
+from .cost_model import FarmCostModel, RENDERER_KEY, QUALITY_KEY, PIXELS_KEY
+from .farm_metadata import FarmMetadata, choose_target
+from .render_layers import import_document, legacy_layer_name
+from .render_setup_doc import turntable_render_setup
+from .version_index import VERSION_INDEX
+from .task_cache import TaskCache
+from .draft_versions import create_versions, delete_versions
+from .deadline_submitter import merge_layer_jobs, pass_jobs, draft_job
+from .submission_spool import start_flusher, version_cleanup, SPOOL_DIR
+from .frame_slices import slice_frames, slice_frame_list, progressive_passes
+from .render_presets import render_settings, apply_settings, dump_settings, node_settings, BALL_SHADERS, \
+    GROUND_SHADERS, GROUND_RENDER_SETTINGS
 logger = sgtk.platform.get_logger(__name__)
 
 
@@ -117,28 +132,32 @@ class LazySiouxsie(QtGui.QWidget):
         self._app = sgtk.platform.current_bundle()
         logger.info('Starting Lazy Siouxsie!')
 
-        # Connect to Deadline
-        os_sys = platform.system()
+        # Start warming up the Deadline connection.  Nothing blocks on it until a submission needs it.
         self.computer = platform.node()
-        if os_sys == 'Windows':
-            # This should go into the paths.yml perhaps.  Setup a series of universal paths, and then call them here.
-            python_path = 'C:\\Python27\\Lib\\site-packages'
-        else:
-            python_path = '/Volumes/Applications/Python27/Lib/site-packages'
-        sys.path.append(python_path)
-        from Deadline import DeadlineConnect as connect
         deadline_connection = self._app.get_setting('deadline_connection')
         deadline_port = int(self._app.get_setting('deadline_port'))
-        self.dl = connect.DeadlineCon(deadline_connection, deadline_port)
-        logger.debug('Deadline Connection made!')
+        self.deadline = DeadlineGateway(host=deadline_connection, port=deadline_port, parent=self)
+        self.deadline.state_changed.connect(self.deadline_state_changed)
+        # Submissions go through a spool on disk that a background flusher keeps draining, even after the dialog has
+        # closed, so a farm outage never loses a turntable.
+        self.spool_flusher = start_flusher(os.path.join(self._app.cache_location, SPOOL_DIR), self.deadline.session(),
+                                           on_failed=self.spool_failed_callback(self._app.sgtk))
+        self.spool = self.spool_flusher.spool
+        logger.debug('Deadline Connection warming up...')
 
         self.turntable_task = self._app.get_setting('turntable_task')
         self.render_format = self._app.get_setting('output_format')
+        self.rotation_safe_framing = self._app.get_setting('rotation_safe_framing')
         logger.debug('Collected Turntable Configuration Settings.')
 
+        # The artist's own ground planes; the build adds its own to ground_plane, which is reset every build.
+        self.artist_ground_plane = []
         self.ground_plane = []
         self.scene_lights = None
         self.scene_selection = cmds.ls(sl=True)
+        # One traversal feeds the light check, the preflight check and the build.
+        self.inventory = SceneInventory(light_types=self.light_types)
+        self.inventory.start()
         self.has_lights = self.check_scene_lights()
         logger.debug('Preforming Flight Precheck...')
         self.preflight_check = self.do_preflight_check()
@@ -156,43 +175,44 @@ class LazySiouxsie(QtGui.QWidget):
         self.task = self.context.task['name']
         self.entity_id = self.context.entity['id']
         self.tt_task = None
+        self.versions = VERSION_INDEX
+        self.task_cache = TaskCache(tk=self.sg, cache_dir=self._app.cache_location)
+        self.executor = None
+        self.build_data = {}
         logger.debug('Shotgun context collected.')
 
-        filters = [
-            ['id', 'is', self.project_id]
-        ]
-        fields = [
-            'sg_pixel_aspect',
-            'sg_output_resolution',
-            'sg_renderers'
-        ]
-        sg_settings = self.sg.shotgun.find_one('Project', filters, fields)
-
-        sg_resolution = sg_settings['sg_output_resolution']
-        split_res = sg_resolution.split('x')
-        resolution_width = split_res[0]
-        resolution_height = split_res[1]
-        pixel_aspect = str(sg_settings['sg_pixel_aspect'])
-        renderers = sg_settings['sg_renderers'][0]['name']
-
-        self.ui.res_width.setText(resolution_width)
-        self.ui.res_height.setText(resolution_height)
-        self.ui.pixel_aspect.setText(pixel_aspect)
-        self.ui.rendering_engine.setCurrentText(renderers)
+        project_settings_ttl = int(self._app.get_setting('project_settings_ttl'))
+        self.project_settings = ProjectSettingsCache(tk=self.sg, cache_dir=self._app.cache_location,
+                                                     ttl=project_settings_ttl)
+        info = self.get_scene_details()
+        self.ui.res_width.setText(info['width'])
+        self.ui.res_height.setText(info['height'])
+        self.ui.pixel_aspect.setText(str(info['aspect_ratio']))
+        self.ui.rendering_engine.setCurrentText(info['render_engine'])
         hdri_path = self._app.get_setting('hdri_path')
         hdri_settings = self._app.get_setting('hdri_settings')
         logger.debug('Shotgun Render Settings Collected.')
 
-        if os.path.exists(hdri_path):
-            self.hdri_path = hdri_path
-            files = os.listdir(hdri_path)
-            for f in files:
-                filepath = os.path.join(hdri_path, f)
-                if os.path.isfile(filepath):
-                    if f.endswith('.hdr') or f.endswith('.exr'):
-                        hdri = QtGui.QListWidgetItem(f)
-                        self.ui.hdriList.addItem(hdri)
-                        self.ui.hdriList.setCurrentItem(hdri)
+        # Fill the HDRI list from the library index straight away, and catch up with the share in the background.
+        self.hdri_path = hdri_path
+        self.hdri_library = HdriLibrary(root=hdri_path, cache_dir=self._app.cache_location, parent=self)
+        self.hdri_library.updated.connect(self.fill_hdri_list)
+        self.hdri_thumbnails = HdriThumbnailCache(cache_dir=self._app.cache_location, parent=self)
+        self.hdri_model = HdriListModel(library=self.hdri_library, thumbnails=self.hdri_thumbnails, parent=self)
+        self.hdri_proxy = HdriFilterModel(parent=self)
+        self.hdri_proxy.setSourceModel(self.hdri_model)
+        self.ui.hdriList.setModel(self.hdri_proxy)
+        self.ui.hdriList.setIconSize(QtCore.QSize(128, 64))
+        # Picks are kept by name, so they survive filtering and library refreshes.
+        self.hdri_selection = set()
+        self.restoring_hdri_selection = False
+        # The last HDRI is picked for the artist, as before, once the library has any
+        self.hdri_defaulted = False
+        self.ui.hdriList.selectionModel().selectionChanged.connect(self.hdri_selection_changed)
+        self.ui.hdri_filter.textChanged.connect(self.filter_hdri_list)
+        self.fill_hdri_list()
+        if hdri_path:
+            self.hdri_library.refresh_async()
         if os.path.exists(hdri_settings):
             settings = open(hdri_settings, 'r')
             self.hdri_setup = json.load(settings)
@@ -204,9 +224,6 @@ class LazySiouxsie(QtGui.QWidget):
         self.ui.cancel_btn.clicked.connect(self.cancel)
         self.ui.spin_btn.clicked.connect(self.build_turn_table)
         self.ui.browse_btn.clicked.connect(self.browse)
-        info = self.get_scene_details()
-        self.ui.res_width.setText(info['width'])
-        self.ui.res_height.setText(info['height'])
         self.ui.build_progress.setValue(0)
         self.ui.total_frames.setEnabled(False)
         self.ui.startFrame.valueChanged.connect(self.set_frames)
@@ -217,8 +234,88 @@ class LazySiouxsie(QtGui.QWidget):
         self.ui.partial_circle.clicked.connect(self.set_range)
         self.ui.from_range.setEnabled(False)
         self.ui.to_range.setEnabled(False)
+        # Farm cost estimate, refitted in the background from the render times of earlier turntables
+        cores_per_task = int(self._app.get_setting('farm_cores_per_task'))
+        self.cost_model = FarmCostModel(gateway=self.deadline, cache_dir=self._app.cache_location,
+                                        cores_per_task=cores_per_task, parent=self)
+        self.cost_model.updated.connect(self.update_cost_estimate)
+        # A rescan can pick the default HDRI, which adds a layer
+        self.hdri_library.updated.connect(self.update_cost_estimate)
+        self.ui.rendering_engine.currentIndexChanged.connect(self.update_cost_estimate)
+        self.ui.res_width.textChanged.connect(self.update_cost_estimate)
+        self.ui.res_height.textChanged.connect(self.update_cost_estimate)
+        self.ui.res_scale.currentIndexChanged.connect(self.update_cost_estimate)
+        self.ui.total_frames.textChanged.connect(self.update_cost_estimate)
+        self.ui.render_slices.currentIndexChanged.connect(self.update_cost_estimate)
+        self.ui.quality_value.valueChanged.connect(self.update_cost_estimate)
+        self.ui.custom_hdri.textChanged.connect(self.update_cost_estimate)
+        self.ui.scene_lights.toggled.connect(self.update_cost_estimate)
+        self.ui.fit_to_budget.toggled.connect(self.update_cost_estimate)
+        self.ui.budget_hours.valueChanged.connect(self.update_cost_estimate)
+        self.update_cost_estimate()
+        # Pools, groups and workers of the farm, so the pool is picked, and shown, without asking Deadline again
+        self.farm = FarmMetadata(gateway=self.deadline, cache_dir=self._app.cache_location,
+                                 ttl=int(self._app.get_setting('farm_metadata_ttl')), parent=self)
+        self.farm.updated.connect(self.update_farm_target)
+        self.ui.rendering_engine.currentIndexChanged.connect(self.update_farm_target)
+        self.update_farm_target()
+        self.deadline.prewarm()
+        self.farm.prefetch()
+        self.cost_model.harvest_async()
         logger.debug('Tool setup complete!')
 
+    def fill_hdri_list(self):
+        names = self.hdri_library.names()
+        self.restoring_hdri_selection = True
+        self.hdri_model.set_names(names)
+        self.restoring_hdri_selection = False
+        if names and not self.hdri_defaulted:
+            self.hdri_defaulted = True
+            if not self.hdri_selection:
+                self.hdri_selection.add(names[-1])
+        self.restore_hdri_selection()
+        logger.debug('HDRI list filled with %i files.' % len(names))
+
+    def filter_hdri_list(self, text):
+        self.restoring_hdri_selection = True
+        self.hdri_proxy.set_filter_text(text)
+        self.restoring_hdri_selection = False
+        self.restore_hdri_selection()
+
+    def hdri_selection_changed(self, selected, deselected):
+        if self.restoring_hdri_selection:
+            return
+        for index in selected.indexes():
+            self.hdri_selection.add(index.data())
+        for index in deselected.indexes():
+            self.hdri_selection.discard(index.data())
+        self.update_cost_estimate()
+
+    def restore_hdri_selection(self):
+        selection = QtGui.QItemSelection()
+        for name in self.hdri_selection:
+            row = self.hdri_model.row_of(name)
+            if row is None:
+                continue
+            index = self.hdri_proxy.mapFromSource(self.hdri_model.index(row))
+            if index.isValid():
+                selection.select(index, index)
+        self.restoring_hdri_selection = True
+        selection_model = self.ui.hdriList.selectionModel()
+        selection_model.select(selection, QtGui.QItemSelectionModel.ClearAndSelect)
+        if not selection.isEmpty():
+            selection_model.setCurrentIndex(selection.indexes()[-1], QtGui.QItemSelectionModel.NoUpdate)
+        self.restoring_hdri_selection = False
+
+    def closeEvent(self, event):
+        if self.executor and self.executor.is_running():
+            self.ui.status_label.setText('A turntable is still building.  Cancel it first.')
+            event.ignore()
+            return
+        self.hdri_thumbnails.shutdown()
+        self.inventory.stop()
+        QtGui.QWidget.closeEvent(self, event)
+
     def set_frames(self):
         start = self.ui.startFrame.value()
         end = self.ui.endFrame.value()
@@ -226,6 +323,67 @@ class LazySiouxsie(QtGui.QWidget):
         total_frames = dif * 2
         self.ui.total_frames.setText(str(total_frames))
 
+    def cost_inputs(self):
+        """
+        What the turntable would be rendered with, as the cost model wants it.  None while the UI holds something
+        that can't be rendered.
+        """
+        try:
+            resolution_scale = float(self.ui.res_scale.currentText().strip('%')) / 100
+            width = int(self.ui.res_width.text()) * resolution_scale
+            height = int(self.ui.res_height.text()) * resolution_scale
+            total_frames = int(self.ui.total_frames.text())
+            degree = float(self.ui.render_slices.currentText())
+        except ValueError:
+            return None
+        # Only the frames of the render slice are submitted
+        start = self.ui.startFrame.value()
+        frames = len(slice_frames(start, start + total_frames - 1, degree))
+        layers = len(self.hdri_selection)
+        if self.ui.custom_hdri.text():
+            layers += 1
+        if self.has_lights and self.ui.scene_lights.isChecked():
+            layers += 1
+        return {
+            'renderer': self.ui.rendering_engine.currentText(),
+            'pixels': width * height,
+            'frames': frames,
+            'layers': max(layers, 1)
+        }
+
+    def update_cost_estimate(self, *args):
+        fit = self.ui.fit_to_budget.isChecked()
+        self.ui.budget_hours.setEnabled(fit)
+        self.ui.quality_slider.setEnabled(not fit)
+        self.ui.quality_value.setEnabled(not fit)
+        inputs = self.cost_inputs()
+        if not inputs:
+            self.ui.cost_estimate.setText('Estimated farm time: -')
+            return
+        if fit:
+            quality = self.cost_model.fit_quality(budget=self.ui.budget_hours.value(),
+                                                  lowest=self.ui.quality_value.minimum(),
+                                                  highest=self.ui.quality_value.maximum(), **inputs)
+            if quality != self.ui.quality_value.value():
+                # Comes straight back here through valueChanged
+                self.ui.quality_value.setValue(quality)
+                return
+        core_hours = self.cost_model.estimate(quality=self.ui.quality_value.value(), **inputs)
+        estimate = 'Estimated farm time: %.0f core-hours' % core_hours
+        if not self.cost_model.has_history(inputs['renderer']):
+            estimate += ' (no render history yet)'
+        self.ui.cost_estimate.setText(estimate)
+
+    def update_farm_target(self, *args):
+        metadata = self.farm.cached()
+        if not metadata:
+            self.ui.farm_target.setText('Farm: -')
+            return
+        pool, group = choose_target(metadata, self.ui.rendering_engine.currentText())
+        workers = metadata['pool_workers'].get(pool) or {}
+        self.ui.farm_target.setText('Pool: %s, Group: %s (%i of %i workers idle)' % (
+            pool, group, workers.get('idle', 0), workers.get('total', 0)))
+
     def set_range(self):
         if self.ui.full_circle.isChecked():
             self.ui.from_range.setEnabled(False)
@@ -235,223 +393,311 @@ class LazySiouxsie(QtGui.QWidget):
             self.ui.to_range.setEnabled(True)
 
     def cancel(self):
+        if self.executor and self.executor.is_running():
+            if self.executor.cancel():
+                self.ui.status_label.setText('Cancelling after the current step...')
+            else:
+                self.ui.status_label.setText('Too late to cancel, the jobs are being submitted.')
+            return
         self.close()
 
+    def deadline_state_changed(self, state):
+        # Don't bury the preflight warnings or the build progress under connection chatter.
+        if not self.preflight_check or (self.executor and self.executor.is_running()):
+            return
+        if state == deadline_gateway.FAILED:
+            self.ui.status_label.setText('Deadline is unreachable: %s' % self.deadline.error)
+        else:
+            self.ui.status_label.setText('Deadline: %s' % state)
+
     def build_turn_table(self):
+        # The build runs as a list of stages, deferred onto Maya's main thread one at a time so Maya stays
+        # responsive and the build can be cancelled between stages.  A cancelled or failed build reopens the
+        # working file, so nothing an earlier attempt made is left over to start from.
+        self.build_data = {}
+        self.ground_plane = list(self.artist_ground_plane)
+        stages = [
+            BuildStage('Finding the Turntable task...', self.build_find_task),
+            BuildStage('Saving Turntable file...', self.build_save_files, weight=3),
+            BuildStage('Selecting scene geometry...', self.build_group_geometry),
+            BuildStage('Building the Turntable Camera...', self.build_camera_stage, weight=3),
+            BuildStage('Set frame ranges...', self.build_frame_range),
+            BuildStage('Get scene lighting requirements...', self.build_scene_lights),
+            BuildStage('Build HDRI dome...', self.build_dome),
+            BuildStage('Check groundplane setting...', self.build_ground),
+            BuildStage('Checking for Chrome Sphere creation...', self.build_spheres),
+            BuildStage('Begin Layers Setup...', self.build_render_layers, weight=3),
+            BuildStage('Setting render settings...', self.build_render_settings, weight=2),
+            BuildStage('Creating Deadline Job...', self.build_submit, weight=4, cancellable=False),
+            BuildStage('Saving Turntable file...', self.build_finalize, weight=2, cancellable=False)
+        ]
+        self.executor = BuildExecutor(stages=stages, parent=self)
+        self.executor.progress.connect(self.build_progress_changed)
+        self.executor.finished.connect(self.build_finished)
+        self.executor.cancelled.connect(self.build_cancelled)
+        self.executor.failed.connect(self.build_failed)
+        self.ui.spin_btn.setEnabled(False)
+        self.ui.status_label.setStyleSheet('')
+        self.executor.start()
+
+    def build_progress_changed(self, percent, stage):
+        self.ui.build_progress.setValue(percent)
+        self.ui.status_label.setText(stage)
+
+    def build_finished(self):
+        self.ui.build_progress.setValue(100)
+        if self.scene_selection:
+            cmds.select(self.scene_selection, r=True)
+        failed_layers = self.build_data.get('failed_layers')
+        if failed_layers:
+            # Keep the dialog up so the artist sees which layers didn't make it to the farm.
+            self.ui.status_label.setText('Done, but these layers were not submitted: %s' %
+                                         ', '.join(sorted(failed_layers)))
+            self.ui.status_label.setStyleSheet('color: rgb(255, 0, 0);')
+            return
+        self.ui.status_label.setText('Done!')
+        # Leave "Done!" up for a moment without blocking Maya.
+        QtCore.QTimer.singleShot(3000, self.close)
+
+    def build_cancelled(self):
+        self.ui.build_progress.setValue(0)
+        self.ui.status_label.setText('Build cancelled.  The working file has been restored.')
+        self.ui.spin_btn.setEnabled(True)
+
+    def build_failed(self, error):
+        self.ui.build_progress.setValue(0)
+        self.ui.status_label.setStyleSheet('color: rgb(255, 0, 0);')
+        self.ui.status_label.setText('Build failed: %s' % error)
+        # Past the point of no return the turntable file is open, and building again would build on top of it.
+        if not self.executor.is_committed():
+            self.ui.spin_btn.setEnabled(True)
+
+    def build_find_task(self):
         # List tasks
         next_file = self.find_turntable_task()
-        if next_file:
-            self.ui.build_progress.setValue(1)
-            self.ui.status_label.setText('Saving working file...')
-            cmds.file(s=True)
-            self.ui.build_progress.setValue(5)
-            self.ui.status_label.setText('Saving Turntable file...')
-            cmds.file(rn=next_file)
-            cmds.file(s=True, type='mayaBinary')
-            self.ui.build_progress.setValue(8)
-            self.ui.status_label.setText('Getting HDRI Selections...')
-            selected_hdri = self.get_hdri_files()
-
-            # Temporarily hide all lights
-            if self.scene_lights:
-                cmds.hide(self.scene_lights)
-
-            # Select and group the set
-            self.ui.build_progress.setValue(10)
-            self.ui.status_label.setText('Selecting scene geometry...')
-            geo = cmds.ls(type=['mesh', 'nurbsSurface'])
-            if self.ground_plane:
-                for g in self.ground_plane:
-                    if g in geo:
-                        geo.remove(g)
-                cmds.select(self.ground_plane, r=True)
-                cmds.hide()
-            cmds.select(geo, r=True)
-            z = 1
-            while z < 100:
-                cmds.pickWalk(d='up')
-                z += 1
-            self.ui.build_progress.setValue(12)
-            self.ui.status_label.setText('Grouping the geometry...')
-            group = cmds.group(n='_Turntable_Set_Prep')
-
-            # Setup the camera bit
-            self.ui.build_progress.setValue(14)
-            self.ui.status_label.setText('Building the Turntable Camera...')
-            start = self.ui.startFrame.value()
-            end = self.ui.endFrame.value()
-            camera_data = self.build_camera(start=start, end=end, group=group)
-            camera = camera_data[0]
-            center = camera_data[1]
-            bb = camera_data[2]
-            scene_max_width = camera_data[3]
-            x_min = bb[0]
-            y_min = bb[1]
-            z_min = bb[2]
-            x_max = bb[3]
-            y_max = bb[4]
-            z_max = bb[5]
-
-            self.ui.build_progress.setValue(34)
-            self.ui.status_label.setText('Set frame ranges...')
-            total_frames = int(self.ui.total_frames.text())
-            add_frames = total_frames/2
-            extended_end = end + add_frames
-            cmds.playbackOptions(min=start, max=extended_end)
-            # Get the rendering engine
-            self.ui.build_progress.setValue(35)
-            self.ui.status_label.setText('Get the rendering engine...')
-            rendering_engine = self.ui.rendering_engine.currentText()
-            lights = self.ui.scene_lights.isChecked()
-
-            # This will need some major renumbering
-            self.ui.build_progress.setValue(36)
-            self.ui.status_label.setText('Get scene lighting requirements...')
-            # Restore lights
-            if self.scene_lights:
-                cmds.showHidden(self.scene_lights)
-
-            use_scene_lighting = self.ui.scene_lights.isChecked()
-            if use_scene_lighting and self.has_lights:
-                self.ui.build_progress.setValue(37)
-                self.ui.status_label.setText('Get Scene Lights...')
-                get_scene_lights = self.get_scene_lights(renderer=rendering_engine, group=group, center=center)
-                self.animate_dome(trans=get_scene_lights[1], start=end, end=extended_end)
-            elif not use_scene_lighting and self.has_lights:
-                self.ui.build_progress.setValue(37)
-                self.ui.status_label.setText('Packing Artist Lights...')
-                get_scene_lights = self.get_scene_lights(renderer=rendering_engine, group=group, center=center)
-            else:
-                self.ui.build_progress.setValue(37)
-                self.ui.status_label.setText('Ignoring scene lights...')
-                # Once this is rewritten, this should = None
-                get_scene_lights = [[], '']
-
-            self.ui.build_progress.setValue(40)
-            self.ui.status_label.setText('Build HDRI dome...')
-            hdri_dome = self.build_hdri_dome(renderer=rendering_engine, lights=lights, hdri_list=selected_hdri,
-                                             center=center)
-            dome = hdri_dome['dome']
-            file_node = hdri_dome['file']
-            light_trans = hdri_dome['translation']
-
-            self.ui.build_progress.setValue(50)
-            self.ui.status_label.setText('Animating the HDRI dome...')
-            self.animate_dome(trans=light_trans, start=end, end=extended_end)
-
-            self.ui.build_progress.setValue(51)
-            self.ui.status_label.setText('Check groundplane setting...')
-            # Reset the artists ground plane
-            if self.ground_plane:
-                cmds.select(self.ground_plane, r=True)
-                cmds.showHidden(self.ground_plane)
-            # Check for the auto-ground plane
-            ground = self.ui.ground_plane.isChecked()
-            ground_plane = None
-            if ground:
-                self.ui.build_progress.setValue(52)
-                self.ui.status_label.setText('Building Ground Plane...')
-                radius = 10 * scene_max_width
-                if cmds.about(q=True, v=True) < '2018':
-                    ground_plane = cmds.polyPlane(h=radius, w=radius, ax=[0, 1, 0], ch=True, cuv=2,
-                                                  n='_turntable_ground_plane', sx=10, sy=20)
-                    cmds.delete(ch=True)
-                    self.texture_ground(ground=ground_plane, renderer=rendering_engine, file_node=hdri_dome['file'])
-                else:
-                    cmds.polyDisc(s=4, sm=4, sd=3, r=radius)
-                    cmds.rename('_turntable_ground_plane')
-                    cmds.delete(ch=True)
-                    ground_plane = cmds.ls(sl=True)[0]
-                    self.texture_ground(ground=ground_plane, renderer=rendering_engine, file_node=hdri_dome['file'])
-                self.ui.build_progress.setValue(54)
-                self.ui.status_label.setText('Set the plane Position...')
-                cmds.select(ground_plane, r=True)
-                cmds.setAttr('%s.tx' % ground_plane, center[0])
-                cmds.setAttr('%s.ty' % ground_plane, y_min)
-                cmds.setAttr('%s.tz' % ground_plane, center[2])
-                cmds.addAttr(ground_plane, ln='original_file', dt='string')
-                original_file = os.path.basename(self.ui.file_path.text())
-                cmds.setAttr('%s.original_file' % ground_plane, original_file, type='string')
-                self.ground_plane.append(ground_plane)
-
-            self.ui.build_progress.setValue(55)
-            self.ui.status_label.setText('Checking for Chrome Sphere creation...')
-            get_spheres = self.ui.chrome_balls.isChecked()
-            spheres = []
-            if get_spheres:
-                # TODO: Need to refigure out how and where to put the chrome balls.  Check Tiger for example
-                self.ui.build_progress.setValue(56)
-                self.ui.status_label.setText('Finding Radius...')
-                # base_max_width = math.sqrt((math.pow((x_max - x_min), 2)) + (math.pow((y_max - y_min), 2)))
-                base_max_width = scene_max_width
-                sphere_radius = ((y_max - y_min)/2) * 0.25
-                self.ui.build_progress.setValue(58)
-                self.ui.status_label.setText('Making sphers...')
-                chrome_ball = cmds.polySphere(r=sphere_radius, n='_turntable_chrome_ball')
-                gray_ball = cmds.polySphere(r=sphere_radius, n='_turntable_gray_ball')
-                cmds.addAttr(chrome_ball, ln='original_file', dt='string')
-                original_file = os.path.basename(self.ui.file_path.text())
-                cmds.setAttr('%s.original_file' % chrome_ball[0], original_file, type='string')
-                cmds.addAttr(gray_ball, ln='original_file', dt='string')
-                cmds.setAttr('%s.original_file' % gray_ball[0], original_file, type='string')
-
-                self.ui.build_progress.setValue(60)
-                self.ui.status_label.setText('Positioning Spheres...')
-                # positioning of the chrome balls
-                chrome_x_point = center[0] + ((base_max_width / 2) * .85)
-                gray_x_point = chrome_x_point + (sphere_radius * 2.2)
-                sphere_ground = y_min + sphere_radius
-                cmds.setAttr('%s.tx' % chrome_ball[0], chrome_x_point)
-                cmds.setAttr('%s.ty' % chrome_ball[0], sphere_ground)
-                cmds.setAttr('%s.tz' % chrome_ball[0], center[2])
-                cmds.setAttr('%s.tx' % gray_ball[0], gray_x_point)
-                cmds.setAttr('%s.ty' % gray_ball[0], sphere_ground)
-                cmds.setAttr('%s.tz' % gray_ball[0], center[2])
-                spheres.append(chrome_ball)
-                spheres.append(gray_ball)
-                materials = self.texture_chrome_balls(spheres=spheres, renderer=rendering_engine)
-
-            self.ui.build_progress.setValue(62)
-            self.ui.status_label.setText('Begin Layers Setup...')
-            layers = self.setup_render_layers(dome=dome, file_node=file_node, ground=self.ground_plane,
-                                              light_trans=light_trans, hdri_list=selected_hdri,
-                                              lights=get_scene_lights[0], light_grp=get_scene_lights[1],  balls=spheres)
-
-            self.ui.build_progress.setValue(68)
-            self.ui.status_label.setText('Setting render settings...')
-            # Setup the rendering setup
-            self.setup_rendering_engine(renderer=rendering_engine, render_format=self.render_format,
-                                        task=self.turntable_task, filename=next_file, cam=camera)
-            # Send to the farm.
-            send_to_deadline = self.ui.submit_to_deadline.isChecked()
-            if send_to_deadline:
-                self.ui.build_progress.setValue(76)
-                self.ui.status_label.setText('Creating Deadline Job...')
-                self.submit_to_deadline(start=start, end=extended_end, renderer=rendering_engine, camera=camera,
-                                        layers=layers)
-
-            # Finalizing
-            self.ui.build_progress.setValue(96)
-            self.ui.status_label.setText('Saving Turntable file...')
-            cmds.file(s=True)
-            if self.ui.open_turntable.isChecked():
-                self.ui.build_progress.setValue(100)
-                self.ui.status_label.setText('Done!')
+        if not next_file:
+            raise BuildAborted('No Turntable file name could be made.')
+        self.build_data['next_file'] = next_file
+        self.executor.on_rollback(lambda: self.versions.release(next_file))
+
+    def build_save_files(self):
+        next_file = self.build_data['next_file']
+        working_file = self.ui.file_path.text()
+        self.ui.status_label.setText('Saving working file...')
+        cmds.file(s=True)
+        self.ui.status_label.setText('Saving Turntable file...')
+        cmds.file(rn=next_file)
+        cmds.file(s=True, type='mayaBinary')
+        # The file holds the version now
+        self.versions.release(next_file)
+        # Everything from here on happens in the turntable file, so rolling back is a matter of going back to
+        # the working file we just saved, which drops every node the build made.
+        self.executor.on_rollback(lambda: self.restore_working_file(working_file, next_file))
+
+    def restore_working_file(self, working_file, turntable_file):
+        logger.info('Rolling back to %s...' % working_file)
+        cmds.file(working_file, o=True, f=True)
+        if os.path.isfile(turntable_file):
+            os.remove(turntable_file)
+
+    def build_group_geometry(self):
+        self.ui.status_label.setText('Getting HDRI Selections...')
+        self.build_data['selected_hdri'] = self.get_hdri_files()
+
+        # Temporarily hide all lights
+        if self.scene_lights:
+            cmds.hide(self.scene_lights)
+
+        # Select and group the set
+        self.ui.status_label.setText('Selecting scene geometry...')
+        geo = self.inventory.geometry()
+        if self.ground_plane:
+            for g in self.ground_plane:
+                if g in geo:
+                    geo.remove(g)
+            cmds.select(self.ground_plane, r=True)
+            cmds.hide()
+        cmds.select(top_level_roots(geo), r=True)
+        self.ui.status_label.setText('Grouping the geometry...')
+        self.build_data['group'] = cmds.group(n='_Turntable_Set_Prep')
+
+    def build_camera_stage(self):
+        # Setup the camera bit
+        start = self.ui.startFrame.value()
+        end = self.ui.endFrame.value()
+        camera_data = self.build_camera(start=start, end=end, group=self.build_data['group'])
+        self.build_data['start'] = start
+        self.build_data['end'] = end
+        self.build_data['camera'] = camera_data[0]
+        self.build_data['center'] = camera_data[1]
+        self.build_data['bb'] = camera_data[2]
+        self.build_data['scene_max_width'] = camera_data[3]
+        self.build_data['bounds'] = camera_data[4]
+
+    def build_frame_range(self):
+        start = self.build_data['start']
+        end = self.build_data['end']
+        total_frames = int(self.ui.total_frames.text())
+        add_frames = total_frames/2
+        extended_end = end + add_frames
+        cmds.playbackOptions(min=start, max=extended_end)
+        self.build_data['extended_end'] = extended_end
+        # Get the rendering engine
+        self.build_data['rendering_engine'] = self.ui.rendering_engine.currentText()
+
+    def build_scene_lights(self):
+        rendering_engine = self.build_data['rendering_engine']
+        group = self.build_data['group']
+        center = self.build_data['center']
+        # Restore lights
+        if self.scene_lights:
+            cmds.showHidden(self.scene_lights)
+
+        use_scene_lighting = self.ui.scene_lights.isChecked()
+        if use_scene_lighting and self.has_lights:
+            self.ui.status_label.setText('Get Scene Lights...')
+            get_scene_lights = self.get_scene_lights(renderer=rendering_engine, group=group, center=center)
+            self.animate_dome(trans=get_scene_lights[1], start=self.build_data['end'],
+                              end=self.build_data['extended_end'])
+        elif not use_scene_lighting and self.has_lights:
+            self.ui.status_label.setText('Packing Artist Lights...')
+            get_scene_lights = self.get_scene_lights(renderer=rendering_engine, group=group, center=center)
+        else:
+            self.ui.status_label.setText('Ignoring scene lights...')
+            # Once this is rewritten, this should = None
+            get_scene_lights = [[], '']
+        self.build_data['scene_lights'] = get_scene_lights
+
+    def build_dome(self):
+        lights = self.ui.scene_lights.isChecked()
+        hdri_dome = self.build_hdri_dome(renderer=self.build_data['rendering_engine'], lights=lights,
+                                         hdri_list=self.build_data['selected_hdri'], center=self.build_data['center'])
+        self.build_data['hdri_dome'] = hdri_dome
+        self.ui.status_label.setText('Animating the HDRI dome...')
+        self.animate_dome(trans=hdri_dome['translation'], start=self.build_data['end'],
+                          end=self.build_data['extended_end'])
+
+    def build_ground(self):
+        rendering_engine = self.build_data['rendering_engine']
+        hdri_dome = self.build_data['hdri_dome']
+        center = self.build_data['center']
+        y_min = self.build_data['bb'][1]
+        # Reset the artists ground plane
+        if self.ground_plane:
+            cmds.select(self.ground_plane, r=True)
+            cmds.showHidden(self.ground_plane)
+        # Check for the auto-ground plane
+        ground = self.ui.ground_plane.isChecked()
+        ground_plane = None
+        if ground:
+            self.ui.status_label.setText('Building Ground Plane...')
+            radius = 10 * self.build_data['scene_max_width']
+            if cmds.about(q=True, v=True) < '2018':
+                ground_plane = cmds.polyPlane(h=radius, w=radius, ax=[0, 1, 0], ch=True, cuv=2,
+                                              n='_turntable_ground_plane', sx=10, sy=20)
+                cmds.delete(ch=True)
+                self.texture_ground(ground=ground_plane, renderer=rendering_engine, file_node=hdri_dome['file'])
             else:
-                self.ui.build_progress.setValue(99)
-                self.ui.status_label.setText('Reopening the main file...')
-                file_to_return = self.ui.file_path.text()
-                cmds.file(file_to_return, o=True)
-                self.ui.build_progress.setValue(100)
-                self.ui.status_label.setText('Done!')
-            sleep(3)
-            self.cancel()
-            if self.scene_selection:
-                cmds.select(self.scene_selection, r=True)
+                cmds.polyDisc(s=4, sm=4, sd=3, r=radius)
+                cmds.rename('_turntable_ground_plane')
+                cmds.delete(ch=True)
+                ground_plane = cmds.ls(sl=True)[0]
+                self.texture_ground(ground=ground_plane, renderer=rendering_engine, file_node=hdri_dome['file'])
+            self.ui.status_label.setText('Set the plane Position...')
+            cmds.select(ground_plane, r=True)
+            cmds.setAttr('%s.tx' % ground_plane, center[0])
+            cmds.setAttr('%s.ty' % ground_plane, y_min)
+            cmds.setAttr('%s.tz' % ground_plane, center[2])
+            cmds.addAttr(ground_plane, ln='original_file', dt='string')
+            original_file = os.path.basename(self.ui.file_path.text())
+            cmds.setAttr('%s.original_file' % ground_plane, original_file, type='string')
+            self.ground_plane.append(ground_plane)
+
+    def build_spheres(self):
+        center = self.build_data['center']
+        bb = self.build_data['bb']
+        y_min = bb[1]
+        y_max = bb[4]
+        get_spheres = self.ui.chrome_balls.isChecked()
+        spheres = []
+        if get_spheres:
+            # TODO: Need to refigure out how and where to put the chrome balls.  Check Tiger for example
+            self.ui.status_label.setText('Finding Radius...')
+            # base_max_width = math.sqrt((math.pow((x_max - x_min), 2)) + (math.pow((y_max - y_min), 2)))
+            base_max_width = self.build_data['scene_max_width']
+            sphere_radius = ((y_max - y_min)/2) * 0.25
+            self.ui.status_label.setText('Making sphers...')
+            chrome_ball = cmds.polySphere(r=sphere_radius, n='_turntable_chrome_ball')
+            gray_ball = cmds.polySphere(r=sphere_radius, n='_turntable_gray_ball')
+            cmds.addAttr(chrome_ball, ln='original_file', dt='string')
+            original_file = os.path.basename(self.ui.file_path.text())
+            cmds.setAttr('%s.original_file' % chrome_ball[0], original_file, type='string')
+            cmds.addAttr(gray_ball, ln='original_file', dt='string')
+            cmds.setAttr('%s.original_file' % gray_ball[0], original_file, type='string')
+
+            self.ui.status_label.setText('Positioning Spheres...')
+            # positioning of the chrome balls
+            chrome_x_point = center[0] + ((base_max_width / 2) * .85)
+            gray_x_point = chrome_x_point + (sphere_radius * 2.2)
+            sphere_ground = y_min + sphere_radius
+            cmds.setAttr('%s.tx' % chrome_ball[0], chrome_x_point)
+            cmds.setAttr('%s.ty' % chrome_ball[0], sphere_ground)
+            cmds.setAttr('%s.tz' % chrome_ball[0], center[2])
+            cmds.setAttr('%s.tx' % gray_ball[0], gray_x_point)
+            cmds.setAttr('%s.ty' % gray_ball[0], sphere_ground)
+            cmds.setAttr('%s.tz' % gray_ball[0], center[2])
+            spheres.append(chrome_ball)
+            spheres.append(gray_ball)
+            self.texture_chrome_balls(spheres=spheres, renderer=self.build_data['rendering_engine'])
+        self.build_data['spheres'] = spheres
+
+    def build_render_layers(self):
+        hdri_dome = self.build_data['hdri_dome']
+        get_scene_lights = self.build_data['scene_lights']
+        self.build_data['layers'] = self.setup_render_layers(dome=hdri_dome['dome'], file_node=hdri_dome['file'],
+                                                             ground=self.ground_plane,
+                                                             light_trans=hdri_dome['translation'],
+                                                             hdri_list=self.build_data['selected_hdri'],
+                                                             lights=get_scene_lights[0],
+                                                             light_grp=get_scene_lights[1],
+                                                             balls=self.build_data['spheres'])
+
+    def build_render_settings(self):
+        # Setup the rendering setup
+        settings = self.setup_rendering_engine(renderer=self.build_data['rendering_engine'],
+                                               render_format=self.render_format, task=self.turntable_task,
+                                               filename=self.build_data['next_file'], cam=self.build_data['camera'])
+        # Keep the table next to the turntable file so the farm can check what the scene should render with
+        if settings:
+            sidecar = '%s_render_settings.json' % os.path.splitext(self.build_data['next_file'])[0]
+            dump_settings(settings, sidecar)
+            self.executor.on_rollback(lambda: os.remove(sidecar))
+
+    def build_submit(self):
+        # Send to the farm.
+        send_to_deadline = self.ui.submit_to_deadline.isChecked()
+        if send_to_deadline:
+            self.build_data['failed_layers'] = self.submit_to_deadline(start=self.build_data['start'],
+                                                                       end=self.build_data['extended_end'],
+                                                                       renderer=self.build_data['rendering_engine'],
+                                                                       camera=self.build_data['camera'],
+                                                                       layers=self.build_data['layers'])
+
+    def build_finalize(self):
+        # Finalizing
+        cmds.file(s=True)
+        if not self.ui.open_turntable.isChecked():
+            self.ui.status_label.setText('Reopening the main file...')
+            file_to_return = self.ui.file_path.text()
+            cmds.file(file_to_return, o=True)
+        # The turntable file is saved, so the farm can have it
+        keys = self.build_data.get('spool_keys')
+        if keys:
+            self.spool.release(keys)
+            self.spool_flusher.wake()
 
     def texture_ground(self, ground=None, renderer=None, file_node=None):
         if ground:
-            self.ui.build_progress.setValue(53)
             self.ui.status_label.setText('Textureing the ground...')
             if renderer == 'arnold':
                 material = cmds.shadingNode('aiShadowMatte', asShader=True, n='_turntable_ground_mat')
@@ -464,17 +710,12 @@ class LazySiouxsie(QtGui.QWidget):
                 cmds.connectAttr('%s.outColor' % file_node, '%s.color' % vray_base_mat, f=True)
                 cmds.select(ground, r=True)
                 cmds.hyperShade(a=material)
-                cmds.setAttr('%s.matteSurface' % material, 1)
-                cmds.setAttr('%s.shadows' % material, 1)
-                cmds.setAttr('%s.affectAlpha' % material, 1)
-                cmds.setAttr('%s.alphaContribution' % material, -1)
-                cmds.setAttr('vraySettings.giOn', 0)
-                cmds.setAttr('vraySettings.cam_overrideEnvtex', 1)
+                apply_settings(node_settings(material, GROUND_SHADERS[renderer]) + GROUND_RENDER_SETTINGS[renderer],
+                               name='lazySiouxsieGround')
                 cmds.connectAttr('%s.outColor' % file_node, 'vraySettings.cam_envtexBg', f=True)
 
     def setup_rendering_engine(self, renderer=None, render_format=None, task=None, filename=None, cam=None):
         if renderer:
-            self.ui.build_progress.setValue(69)
             self.ui.status_label.setText('Getting UI and scene render settings...')
             split_path = filename.rsplit('.', 1)[0]
             version = split_path.rsplit('_', 1)[1]
@@ -490,113 +731,28 @@ class LazySiouxsie(QtGui.QWidget):
             resolutionHeight *= resolution_scale
             resolutionWidth *= resolution_scale
 
-            if renderer == 'vray':
-                self.ui.build_progress.setValue(69)
-                self.ui.status_label.setText('Creating VRay settings...')
-                cmds.setAttr('vraySettings.aspectLock', 0)
-                cmds.setAttr('vraySettings.animType', 1)
-                cmds.setAttr('defaultRenderGlobals.startFrame', start_frame)
-                cmds.setAttr('defaultRenderGlobals.endFrame', end_frame)
-                self.ui.build_progress.setValue(70)
-                self.ui.status_label.setText('Checking plugins...')
-                if not cmds.pluginInfo('vrayformaya', q=True, l=True):
-                    try:
-                        cmds.loadPlugin('vrayformaya')
-                    except:
-                        print 'CANNOT LOAD V-RAY'
-
-                self.ui.build_progress.setValue(71)
-                self.ui.status_label.setText('Setting engine...')
-                cmds.setAttr('defaultRenderGlobals.ren', renderer, type='string')
-
-                self.ui.build_progress.setValue(72)
-                self.ui.status_label.setText('Creating render string...')
-                pathSettings = '%s/<layer>/%s/<layer>_<scene>' % (task, version)
-                cmds.setAttr('vraySettings.fileNamePrefix', pathSettings, type='string')
-
-                self.ui.build_progress.setValue(73)
-                self.ui.status_label.setText('Setting up frame sizes and image format...')
-                cmds.setAttr('vraySettings.width', int(resolutionWidth))
-                cmds.setAttr('vraySettings.height', int(resolutionHeight))
-                cmds.setAttr('vraySettings.pixelAspect', float(pixel_aspect))
-
-                output = render_format.lower()
-                cmds.setAttr('vraySettings.imageFormatStr', self.vray_formats[output], type='string')
-
-                self.ui.build_progress.setValue(74)
-                self.ui.status_label.setText('Calculating quality settings...')
-                dmc_maxSubDivs = int(2.4 * quality)
-                dmc_threshold = 0.1 / quality
-                # Adaptive Amount base on the following equation with constants figured out from domain and range
-                # variables
-                # d = Adaptive Amplitude
-                # r = Adaptive Slope
-                # f(x) = d * arctan(r * x) - 1.05
-                adaptive_amplitude = 1.35950130973274
-                adaptive_slope = 0.99
-                adaptive_amount = adaptive_amplitude * math.atan(adaptive_slope * float(quality)) - 1.05
-                # Adaptive Threshold based on the following equation with constants figured out from domain/range
-                # variables
-                # d = Threshold Amplitude
-                # f(x) = -d * arctan(x) + 0.195
-                threshold_amplitude = 0.12915262442461
-                adaptive_threshold = ((-1 * threshold_amplitude) * math.atan(float(quality))) + 0.195
-
-                self.ui.build_progress.setValue(75)
-                self.ui.status_label.setText('Setting render quality...')
-                cmds.setAttr('vraySettings.samplerType', 4)
-                cmds.setAttr('vraySettings.minShadeRate', quality)
-                cmds.setAttr('vraySettings.giOn', 0)
-                cmds.setAttr('vraySettings.cam_overrideEnvtex', 1)
-                cmds.setAttr('vraySettings.dmcMinSubdivs', 1)
-                cmds.setAttr('vraySettings.dmcMaxSubdivs', dmc_maxSubDivs)
-                cmds.setAttr('vraySettings.dmcThreshold', dmc_threshold)
-                cmds.setAttr('vraySettings.dmcs_adaptiveAmount', adaptive_amount)
-                cmds.setAttr('vraySettings.dmcs_adaptiveThreshold', adaptive_threshold)
+            self.ui.status_label.setText('Checking plugins...')
+            plugin = {'vray': 'vrayformaya', 'arnold': 'mtoa'}.get(renderer)
+            if plugin and not cmds.pluginInfo(plugin, q=True, l=True):
+                try:
+                    cmds.loadPlugin(plugin)
+                except:
+                    logger.error('CANNOT LOAD %s!' % plugin)
 
+            self.ui.status_label.setText('Setting render quality and output settings...')
+            output = render_format.lower()
+            if renderer == 'vray':
+                image_format = self.vray_formats[output]
             elif renderer == 'arnold':
-                self.ui.build_progress.setValue(69)
-                self.ui.status_label.setText('Checking plugins...')
-                if not cmds.pluginInfo('mtoa', q=True, l=True):
-                    try:
-                        cmds.loadPlugin('mtoa')
-                    except:
-                        print 'CANNOT LOAD ARNOLD!'
-                self.ui.build_progress.setValue(71)
-                self.ui.status_label.setText('Setting engine and output path...')
-                pathSettings = '%s/<RenderLayer>/%s/<RenderLayer>_<Scene>' % (task, version)
-
-                cmds.setAttr('defaultRenderGlobals.ren', renderer, type='string')
-                self.ui.build_progress.setValue(72)
-                self.ui.status_label.setText('Setting up frame range and output settings...')
-                cmds.setAttr('defaultRenderGlobals.imageFilePrefix', pathSettings, type='string')
-                cmds.setAttr('defaultRenderGlobals.outFormatControl', 0)
-                cmds.setAttr('defaultRenderGlobals.animation', 1)
-                cmds.setAttr('defaultRenderGlobals.putFrameBeforeExt', 1)
-                cmds.setAttr('defaultRenderGlobals.extensionPadding', 4)
-                cmds.setAttr('defaultRenderGlobals.startFrame', start_frame)
-                cmds.setAttr('defaultRenderGlobals.endFrame', end_frame)
-
-                self.ui.build_progress.setValue(73)
-                self.ui.status_label.setText('Setting resolution and file format...')
-                cmds.setAttr('defaultResolution.width', resolutionWidth)
-                cmds.setAttr('defaultResolution.height', resolutionHeight)
-
-                output = render_format.lower()
-                cmds.setAttr('defaultArnoldDriver.ai_translator', self.arnold_formate[output], type='string')
-
-                self.ui.build_progress.setValue(74)
-                self.ui.status_label.setText('Calculating quality settings...')
-                quality_mult = 0.4
-                secondary_samples = int(math.ceil(quality * quality_mult))
-                self.ui.build_progress.setValue(75)
-                self.ui.status_label.setText('Setting rendering quality...')
-                cmds.setAttr('defaultArnoldRenderOptions.AASamples', quality)
-                cmds.setAttr('defaultArnoldRenderOptions.GIDiffuseSamples', secondary_samples)
-                cmds.setAttr('defaultArnoldRenderOptions.GISpecularSamples', secondary_samples)
-                cmds.setAttr('defaultArnoldRenderOptions.GITransmissionSamples', secondary_samples)
-                cmds.setAttr('defaultArnoldRenderOptions.GISssSamples', secondary_samples)
-                cmds.setAttr('defaultArnoldRenderOptions.GIVolumeSamples', (secondary_samples - 1))
+                image_format = self.arnold_formate[output]
+            else:
+                image_format = None
+            settings = render_settings(renderer=renderer, quality=quality, width=resolutionWidth,
+                                       height=resolutionHeight, pixel_aspect=pixel_aspect, start_frame=start_frame,
+                                       end_frame=end_frame, image_format=image_format, task=task, version=version)
+            apply_settings(settings, name='lazySiouxsieRenderSettings')
+            return settings
+        return []
 
     def texture_chrome_balls(self, spheres=None, renderer=None):
         materials = {}
@@ -612,19 +768,6 @@ class LazySiouxsie(QtGui.QWidget):
                 cmds.hyperShade(a=chrome_surface)
                 cmds.select(gray_transform, r=True)
                 cmds.hyperShade(a=gray_surface)
-
-                cmds.setAttr('%s.metalness' % chrome_surface, 1)
-                cmds.setAttr('%s.base' % chrome_surface, 1)
-                cmds.setAttr('%s.baseColor' % chrome_surface, 1, 1, 1, type='double3')
-                cmds.setAttr('%s.specular' % chrome_surface, 0)
-                cmds.setAttr('%s.specularAnisotropy' % chrome_surface, 0.5)
-
-                cmds.setAttr('%s.base' % gray_surface, 1)
-                cmds.setAttr('%s.baseColor' % gray_surface, 0.5, 0.5, 0.5, type='double3')
-                cmds.setAttr('%s.specularColor' % gray_surface, 0.5, 0.5, 0.5, type='double3')
-                cmds.setAttr('%s.specular' % gray_surface, 1)
-                cmds.setAttr('%s.specularRoughness' % gray_surface, 0.65)
-
             elif renderer == 'vray':
                 gray_surface = cmds.shadingNode('VRayMtl', asShader=True, n='_turntable_gray_mat')
                 chrome_surface = cmds.shadingNode('VRayMtl', asShader=True, n='_turntable_chrome_mat')
@@ -632,17 +775,6 @@ class LazySiouxsie(QtGui.QWidget):
                 cmds.hyperShade(a=chrome_surface)
                 cmds.select(gray_transform, r=True)
                 cmds.hyperShade(a=gray_surface)
-
-                cmds.setAttr('%s.useFresnel' % chrome_surface, 0)
-                cmds.setAttr('%s.reflectionColor' % chrome_surface, 1, 1, 1, type='double3')
-                cmds.setAttr('%s.diffuseColorAmount' % chrome_surface, 0)
-                cmds.setAttr('%s.color' % chrome_surface, 1, 1, 1, type='double3')
-
-                cmds.setAttr('%s.color' % gray_surface, 0.5, 0.5, 0.5, type='double3')
-                cmds.setAttr('%s.reflectionColor' % gray_surface, 0.5, 0.5, 0.5, type='double3')
-                cmds.setAttr('%s.hilightGlossinessLock' % gray_surface, 0)
-                cmds.setAttr('%s.reflectionGlossiness' % gray_surface, 0)
-                cmds.setAttr('%s.hilightGlossiness' % gray_surface, 0.35)
             elif renderer == 'renderman':
                 pass
             elif renderer == 'redshift':
@@ -655,6 +787,11 @@ class LazySiouxsie(QtGui.QWidget):
                 cmds.select(gray_transform, r=True)
                 cmds.hyperShade(a=gray_surface)
 
+            if renderer in BALL_SHADERS:
+                shaders = BALL_SHADERS[renderer]
+                apply_settings(node_settings(chrome_surface, shaders['chrome']) +
+                               node_settings(gray_surface, shaders['gray']), name='lazySiouxsieBalls')
+
             materials['gray_shader'] = gray_surface
             materials['chrome_shader'] = chrome_surface
 
@@ -663,15 +800,12 @@ class LazySiouxsie(QtGui.QWidget):
     def build_hdri_dome(self, renderer=None, lights=None, hdri_list=None, center=None):
         hdri = {}
         if renderer == 'arnold':
-            self.ui.build_progress.setValue(41)
             self.ui.status_label.setText('Create Arnold SkyDome...')
             light = cmds.createNode('aiSkyDomeLight')
-            self.ui.build_progress.setValue(42)
             self.ui.status_label.setText('Get parent translation...')
             cmds.pickWalk(d='up')
             cmds.rename('_HDRI_light')
             light_trans = cmds.ls(sl=True)[0]
-            self.ui.build_progress.setValue(44)
             self.ui.status_label.setText('Connect Light to file...')
             cmds.connectAttr('%s.instObjGroups' % light_trans, 'defaultLightSet.dagSetMembers', na=True)
             file_node = cmds.createNode('file')
@@ -680,15 +814,12 @@ class LazySiouxsie(QtGui.QWidget):
             hdri['file'] = file_node
             hdri['translation'] = light_trans
         elif renderer == 'vray':
-            self.ui.build_progress.setValue(46)
             self.ui.status_label.setText('Create VRay Dome Light...')
             light = cmds.createNode('VRayLightDomeShape', n='_HDRI_lightShape')
-            self.ui.build_progress.setValue(47)
             self.ui.status_label.setText('Get parent translation...')
             cmds.pickWalk(d='up')
             cmds.rename('_HDRI_light')
             light_trans = cmds.ls(sl=True)[0]
-            self.ui.build_progress.setValue(48)
             self.ui.status_label.setText('Connect Light to file...')
             cmds.setAttr('%s.useDomeTex' % light, 1)
             file_node = cmds.createNode('file')
@@ -721,12 +852,11 @@ class LazySiouxsie(QtGui.QWidget):
 
     def get_hdri_files(self):
         hdri_files = []
-        files_list = self.ui.hdriList.selectedItems()
-        self.ui.build_progress.setValue(9)
+        files_list = [name for name in self.hdri_library.names() if name in self.hdri_selection]
         self.ui.status_label.setText('Collecting HDRIs...')
         if files_list:
             for hdri in files_list:
-                hdri_files.append(self.hdri_path + '/' + hdri.text())
+                hdri_files.append(self.hdri_path + '/' + hdri)
         if self.ui.custom_hdri.text():
             hdri_files.append(self.ui.custom_hdri.text())
         return hdri_files
@@ -734,7 +864,6 @@ class LazySiouxsie(QtGui.QWidget):
     def setup_render_layers(self, dome=None, file_node=None, ground=[], light_trans=None, hdri_list=None,
                             lights=[], light_grp=None, balls=[]):
         layers = []
-        self.ui.build_progress.setValue(63)
         self.ui.status_label.setText('Setting up render layers...')
         renderer = self.ui.rendering_engine.currentText()
         rs = renderSetup.instance()
@@ -753,93 +882,28 @@ class LazySiouxsie(QtGui.QWidget):
                             break
                 else:
                     new_ground.append(g)
-            ground_list = ', '.join(new_ground)
-        else:
-            ground_list = ''
 
-        self.ui.build_progress.setValue(64)
         self.ui.status_label.setText('Collecting Turntable Geo...')
-        chrome_balls = ''
-        if balls:
-            self.ui.build_progress.setValue(65)
-            self.ui.status_label.setText('Adding spheres...')
-            for ball in balls:
-                chrome_balls = '%s, %s' % (chrome_balls, ball[0])
-        if hdri_list:
-            self.ui.build_progress.setValue(66)
+        set_members = [ball[0] for ball in balls or []] + new_ground
+        if hdri_list or lights:
             self.ui.status_label.setText('Creating render layers...')
-            for hdri in hdri_list:
-                # Get the basic filename for the render layer name
-                basename = os.path.basename(hdri)
-                base = os.path.splitext(basename)[0]
-                render_layer = rs.createRenderLayer(base)
-                layers.append(base)
-                collection_set = render_layer.createCollection('Scene_%s' % base)
-                collection_set.getSelector().setPattern('_Turntable_Set_Prep, %s, %s' %
-                                                        (chrome_balls, ground_list))
-                rs.switchToLayer(render_layer)
-                utils.createAbsoluteOverride(file_node, 'fileTextureName')
-                cmds.setAttr('%s.fileTextureName' % file_node, hdri, type='string')
-                if self.hdri_setup:
-                    extra_settings = self.hdri_setup[basename]
-                    settings = extra_settings[renderer]
-                    for setting in settings:
-                        node = setting['node']
-                        if node == 'light':
-                            utils.createAbsoluteOverride(dome, setting['setting'])
-                            if setting['type']:
-                                cmds.setAttr('%s.%s' % (dome, setting['setting']), setting['value'],
-                                             type=setting['type'])
-                            else:
-                                cmds.setAttr('%s.%s' % (dome, setting['setting']), setting['value'])
-                        elif node == 'file':
-                            utils.createAbsoluteOverride(file_node, setting['setting'])
-                            if setting['type']:
-                                cmds.setAttr('%s.%s' % (file_node, setting['setting']), setting['value'],
-                                             type=setting['type'])
-                            else:
-                                cmds.setAttr('%s.%s' % (file_node, setting['setting']), setting['value'])
-
-                if lights:
-                    utils.createAbsoluteOverride(light_trans, 'visibility')
-                    cmds.select(light_trans, r=True)
-                    cmds.setAttr('%s.visibility' % light_trans, 1)
-                    utils.createAbsoluteOverride(light_grp, 'visibility')
-                    cmds.select(light_grp, r=True)
-                    cmds.setAttr('%s.visibility' % light_grp, 0)
-
-        if lights and self.ui.scene_lights.isChecked():
-            render_layer = rs.createRenderLayer('Artist_Lights')
-            collection_set = render_layer.createCollection('geo')
-            collection_set.getSelector().setPattern('_Turntable_Set_Prep, %s, %s' % (chrome_balls, ground_list))
-            light_collection = render_layer.createCollection('artist_lights')
-            light_list = ''
-            for light in lights:
-                light_list += '%s, ' % light
-            light_collection.getSelector().setPattern(light_list)
-            rs.switchToLayer(render_layer)
-            utils.createAbsoluteOverride(light_trans, 'visibility')
-            cmds.setAttr('%s.visibility' % light_trans, 0)
-            utils.createAbsoluteOverride(light_grp, 'visibility')
-            cmds.select(light_grp, r=True)
-            cmds.setAttr('%s.visibility' % light_grp, 1)
-        elif lights and not self.ui.scene_lights.isChecked():
+            document, layers = turntable_render_setup(hdri_list=hdri_list, set_members=set_members,
+                                                      file_node=file_node, dome=dome, light_trans=light_trans,
+                                                      light_grp=light_grp, lights=lights,
+                                                      artist_lights=self.ui.scene_lights.isChecked(),
+                                                      hdri_setup=self.hdri_setup, renderer=renderer)
+            import_document(document)
+        if lights and not self.ui.scene_lights.isChecked():
             cmds.select(light_grp, r=True)
             cmds.setAttr('%s.visibility' % light_grp, 0)
 
-        rs.switchToLayer(None)
+        # Only switch if something left another layer visible; the layers above never needed it.
+        if rs.getVisibleRenderLayer() != default_render_layer:
+            rs.switchToLayer(None)
         return layers
 
     def check_scene_lights(self):
-        lights = []
-        light_types = self.light_types
-        for light in light_types:
-            type_list = cmds.ls(type=light)
-            for t in type_list:
-                lights.append(t)
-        maya_light_types = cmds.ls(lights=True)
-        for light in maya_light_types:
-            lights.append(light)
+        lights = self.inventory.lights()
         if lights:
             self.ui.scene_lights.setChecked(True)
             self.ui.status_label.setText('Lights in the Scene!')
@@ -859,36 +923,15 @@ class LazySiouxsie(QtGui.QWidget):
     def get_scene_lights(self, renderer=None, group=None, center=None):
         logger.debug('Begin packing scene lights.')
         lights = []
-        self.ui.build_progress.setValue(38)
         self.ui.status_label.setText('Getting Lights...')
-        light_types = self.light_types
-
         logger.debug('Checking for known light types...')
-        for light in light_types:
-            type_list = cmds.ls(type=light)
-            for t in type_list:
-                lights.append(t)
-
-        self.ui.build_progress.setValue(39)
-        self.ui.status_label.setText('getting Maya Lights...')
-        for light in cmds.ls(lt=True):
+        for light in self.inventory.lights():
             lights.append(light)
 
         logger.debug('Lights collected.')
-        light_roots = []
         if lights:
             logger.debug('Parsing lights.')
-            for light in lights:
-                cmds.select(light, r=True)
-                i = 0
-                while i < 100:
-                    cmds.pickWalk(d='up')
-                    i += 1
-                if cmds.ls(sl=True)[0] not in light_roots:
-                    light_roots.append(cmds.ls(sl=True)[0])
-            for root in light_roots:
-                if root == group:
-                    light_roots.remove(root)
+            light_roots = top_level_roots(lights, exclude=[group])
             cmds.select(light_roots, r=True)
         if lights:
             logger.debug('Grouping Lights...')
@@ -909,29 +952,10 @@ class LazySiouxsie(QtGui.QWidget):
 
     def get_scene_details(self):
         logger.debug('Getting scene details from Shotgun...')
-        filters = [
-            ['name', 'is', self.project]
-        ]
-        fields = ['sg_renderers', 'sg_output_resolution', 'sg_frame_rate', 'sg_render_format', 'sg_pixel_aspect']
-        projectInfo = self.sg.shotgun.find_one("Project", filters, fields)
-        info = {}
-        resolution = projectInfo['sg_output_resolution']
-        info['width'] = resolution.split('x')[0]
-        info['height'] = resolution.split('x')[1]
-        info['frame_rate'] = projectInfo['sg_frame_rate']
-        info['render_format'] = projectInfo['sg_render_format']['name']
-        info['render_engine'] = projectInfo['sg_renderers'][0]['name']
-        info['aspect_ratio'] = projectInfo['sg_pixel_aspect']
-        return info
+        return self.project_settings.get(self.project_id)
 
     def find_turntable_task(self):
         logger.info('Collecting Turntable file name from Shotgun and System...')
-        filters = [
-            ['entity', 'is', {'type': 'Asset', 'id': self.entity_id}]
-        ]
-        fields = ['content']
-        tasks = self.sg.shotgun.find('Task', filters, fields)
-        self.ui.build_progress.setValue(1)
         self.ui.status_label.setText('Getting Shotgun Tasks...')
         template = self.sg.templates['asset_work_area_maya']
         this_file = self.ui.file_path.text()
@@ -940,71 +964,20 @@ class LazySiouxsie(QtGui.QWidget):
         # path = 'assets' + path
         path = path.replace('\\', '/')
         settings = template.get_fields(path)
-        for task in tasks:
-            content = task['content']
-            task_id = task['id']
-            if content == self.turntable_task:
-                turntable = content
-                turntable_id = task_id
-                self.tt_task = task_id
-                break
-            else:
-                turntable = None
-                turntable_id = None
+        self.tt_task = self.task_cache.task_id(self.entity_id, self.turntable_task)
         tt_path = path.replace(settings['task_name'], self.turntable_task)
-        self.ui.build_progress.setValue(3)
         self.ui.status_label.setText('Turntable path: %s' % tt_path)
-        logger.debug('Find version number...')
-        version_pattern = r'(_v\d*|_V\d*)'
-        if turntable:
-            # Find latest turntable task
+        if self.tt_task:
             logger.debug('Turntable task already exists!')
-            if os.path.isdir(tt_path):
-                files = glob.glob('%s/*[0-9]*' % tt_path)
-                if files:
-                    files.sort()
-                    last_file = files[-1]
-                    basename = os.path.basename(last_file)
-                    version_string = re.search(version_pattern, basename)
-                    last_version = version_string.group().lower()
-                    version_number = last_version.strip('_v')
-                    version_count = len(version_number)
-                    version_number = int(version_number)
-                    next_version = version_number + 1
-                    version_number = str('{n:0{l}d}'.format(n=version_number, l=version_count))
-                    next_version_number = str('{n:0{l}d}'.format(n=next_version, l=version_count))
-                    version = last_version.replace(version_number, next_version_number)
-                    next_file = last_file.replace(last_version, version)
-                    logger.debug('Next filename created!  %s' % next_file)
-                else:
-                    next_file = '%s/%s_%s_v001.mb' % (tt_path, settings['Asset'], self.turntable_task)
-                    logger.debug('First filename created!  %s' % next_file)
-            else:
-                os.makedirs(tt_path)
-                next_file = '%s/%s_%s_v001.mb' % (tt_path, settings['Asset'], self.turntable_task)
-                logger.debug('First filename and folder structure created!  %s' % next_file)
         else:
             # Create Turntable Task
             logger.info('Creating initial turntable task on Shotgun...')
-            filters = [
-                ['code', 'is', 'Turntable']
-            ]
-            fields = ['id']
-            step = self.sg.shotgun.find_one('Step', filters, fields)
-            task_data = {
-                'project': {'type': 'Project', 'id': self.project_id},
-                'entity': {'type': 'Asset', 'id': self.entity_id},
-                'content': self.turntable_task,
-                'step': {'type': 'Step', 'id': step['id']},
-            }
-            new_task = self.sg.shotgun.create('Task', task_data)
+            new_task = self.task_cache.create_task(self.project_id, self.entity_id, self.turntable_task, 'Turntable')
             self.tt_task = new_task['id']
             logger.debug('Task created!: %s' % new_task)
-            if not os.path.isdir(tt_path):
-                os.makedirs(tt_path)
-                next_file = '%s/%s_%s_v001.mb' % (tt_path, settings['Asset'], self.turntable_task)
-                logger.debug('Task set on Shotgun and new filename and folder structure created! %s' % next_file)
-        self.ui.build_progress.setValue(4)
+        # Claim the next version, so nobody else building a turntable of this asset can end up with the same one.
+        logger.debug('Find version number...')
+        next_file = self.versions.reserve(tt_path, '%s_%s' % (settings['Asset'], self.turntable_task))
         self.ui.status_label.setText('New Filename: %s' % next_file)
         logger.info('New Filename: %s' % next_file)
         return next_file
@@ -1012,16 +985,15 @@ class LazySiouxsie(QtGui.QWidget):
     def build_camera(self, start=1, end=120, group=None):
         # Get the set/scene size from the bounding box
         logger.info('Building the camera system...')
-        cmds.select(group, r=True)
-        self.ui.build_progress.setValue(16)
         self.ui.status_label.setText('Getting scene center point...')
         logger.debug('Getting scene center point...')
-        scene_bb = cmds.xform(q=True, bb=True)
+        # Tight bounds from the actual points, rather than the loose, transform stacked xform box
+        bounds = scene_bounds(group)
+        scene_bb = bounds.aabb
         # Find the center from the bounding box
         x_center = scene_bb[3] - ((scene_bb[3] - scene_bb[0]) / 2)
         y_center = scene_bb[4] - ((scene_bb[4] - scene_bb[1]) / 2)
         z_center = scene_bb[5] - ((scene_bb[5] - scene_bb[2]) / 2)
-        self.ui.build_progress.setValue(18)
         self.ui.status_label.setText('Animating the Set...')
         logger.debug('Animating the set...')
         cmds.select(group, r=True)
@@ -1035,111 +1007,45 @@ class LazySiouxsie(QtGui.QWidget):
             cam_height = float(user_cam_height) + scene_bb[1]
         else:
             cam_height = scene_bb[4] - scene_bb[1]
-        # Create a new camera and fit it to the current view
-        self.ui.build_progress.setValue(20)
+        # Create a new camera and solve its placement from the lens and the bounds, no viewport needed
         self.ui.status_label.setText('Creating camera...')
         logger.debug('Creating camera...')
         cam = cmds.camera(n='turn_table_cam')
-        cmds.lookThru(cam)
-        cmds.viewFit()
-        self.ui.build_progress.setValue(21)
         self.ui.status_label.setText('Beginning camera position calculations...')
         logger.info('Beginning camera position calculations...')
-        # Get the position of the new camera after placement
-        cam_pos = cmds.xform(q=True, ws=True, t=True)
-        logger.debug('Get initial camera position from frame.')
-        # Separate out the mins and maxs of the bounding box for triangulation
-        self.ui.build_progress.setValue(22)
-        x_min = scene_bb[0]
-        x_max = scene_bb[3]
-        y_min = scene_bb[1]
-        y_max = scene_bb[4]
-        z_min = scene_bb[2]
-        z_max = scene_bb[5]
-        # Get the cube root hypotenuse of the bounding box to calculate the overall scene's widest distance
-        self.ui.build_progress.setValue(24)
+        # The bounding sphere's diameter is the overall scene's widest distance
         logger.info('Calculating maximum scene scale...')
-        cube_diff = math.pow((x_max - x_min), 3) + math.pow((y_max - y_min), 3) + math.pow((z_max - z_min), 3)
-        max_hypotenuse = cube_diff ** (1. / 3.)
-        # Cut the width in half to create a 90 degree angle
-        self.ui.build_progress.setValue(26)
+        max_hypotenuse = 2 * bounds.sphere_radius
         res_width = float(self.ui.res_width.text())
         res_height = float(self.ui.res_height.text())
         aspect_ratio = res_width / res_height
-        height = (y_max - y_min)
-        width = (x_max - x_min)
-        depth = (z_max - z_min)
-
-        logger.debug('Set base frame width...')
-        half_width = max_hypotenuse / 2
-        # Get the horizontal aperture. Only the inch aperture is accessible, so mm aperture and field of view
-        # must be calculated from that
         logger.debug('Get camera aperture and focal length...')
-        horizontalApertureInch = cmds.getAttr('%s.horizontalFilmAperture' % cam[1])
-        # convert to mm
-        horizontalAperture_mm = 2.54 * horizontalApertureInch * 10
-        # Get focal length
-        focalLength = cmds.getAttr('%s.focalLength' % cam[1])
-        # Calculate FOV from horizontal aperture and focal length
-        self.ui.build_progress.setValue(27)
-        logger.debug('Calculate the FOV...')
-        fov = math.degrees(2 * math.atan(horizontalAperture_mm / (focalLength * 2)))
-        # Cut the FOV in half to get angle of right angle.
-        half_angle = fov / 2
-        # Calculate the distance for the camera
-        self.ui.build_progress.setValue(28)
-        logger.info('Calculating the camera distance...')
-        angle_tan = math.tan(half_angle)
-        distance = cam_pos[2] - (half_width / angle_tan)
-        # Set the new camera distance and height
-        self.ui.build_progress.setValue(29)
+        horizontal_aperture = cmds.getAttr('%s.horizontalFilmAperture' % cam[1])
+        vertical_aperture = cmds.getAttr('%s.verticalFilmAperture' % cam[1])
+        focal_length = cmds.getAttr('%s.focalLength' % cam[1])
+        film_fit = cmds.getAttr('%s.filmFit' % cam[1])
+        logger.info('Calculating the camera distance and angle...')
+        if self.rotation_safe_framing:
+            # Fit the set at every angle it spins through, around the pivot it spins on
+            start_angle, end_angle = self.turntable_arc()
+            pivot_radius = math.sqrt(sum(math.pow(size / 2.0, 2) for size in bounds.size))
+            framing = solve_turntable_framing(bounds.points, bb_center, start_angle, end_angle, horizontal_aperture,
+                                              vertical_aperture, focal_length, aspect_ratio, height=cam_height,
+                                              radius=pivot_radius, film_fit=film_fit)
+        else:
+            framing = solve_framing(bounds.sphere_center, bounds.sphere_radius, horizontal_aperture,
+                                    vertical_aperture, focal_length, aspect_ratio, height=cam_height,
+                                    film_fit=film_fit)
+        logger.info('camera distance = %s, camera angle = %s' % (framing.distance, framing.rotate[0]))
+        # Set the camera position and declination angle in one go
         self.ui.status_label.setText('Adjusting camera position...')
         logger.debug('Repositioning camera...')
-        cmds.setAttr('%s.ty' % cam[0], cam_height)
-        cmds.setAttr('%s.tz' % cam[0], distance)
-        # Get the new camera position
-        new_cam_pos = cmds.xform(q=True, t=True, ws=True)
-        # Calculate the decension angle from the center of the scene to the new camera position
-        # TODO: Adjust this so that low cam angles look higher, and higher ones look lower.
-        self.ui.build_progress.setValue(30)
-        self.ui.status_label.setText('Adjusting camera angle...')
-        logger.info('Calculating the camera angle...')
-        # The camera height and distance are what is being used to create the angle calculation.
-        # The Height calculation can be "inaccurate" on purpose to create a greater angle.
-        # For instance, camera goes higher than 110% of the bounding box Y Max.
-        # The height from the center point is no longer valid, the height should be increased to make the camera look
-        # further down toward the base of the object at Y Min.
-        # Or if the camera goes below center, the height should increase to look up at Y Max
-        # print '-' * 100
-        # print new_cam_pos[1]
-        # print bb_center[1]
-        # print 'ABSOLUTE DIFF: %s' % (new_cam_pos[1] - bb_center[1])
-
-        cam_height = (new_cam_pos[1] - bb_center[1])
-        logger.info('cam_height = %s' % cam_height)
-
-        cam_dist = new_cam_pos[2] - bb_center[2]
-        logger.info('cam_dist = %s' % cam_dist)
-        # Turning this off until I figure out if I really need it.
-        # if new_cam_pos[1] < bb_center[1]:
-        #     limit = float(y_max) - bb_center[1]
-        #     logger.info('limit = %s' % limit)
-        #     overage = float(bb_center[1]) - new_cam_pos[1]
-        #     logger.info('overage = %s' % overage)
-        #     if overage > limit:
-        #         overage = limit
-        #     cam_height -= (overage/4)
-        #     logger.info('cam_height = %s' % cam_height)
-        cam_angle = -1 * (math.degrees(math.atan(cam_height / cam_dist)))
-        logger.info('cam_angle = %s' % cam_angle)
-        # Set the declination angle
-        cmds.setAttr('%s.rx' % cam[0], cam_angle)
+        cmds.xform(cam[0], ws=True, t=framing.translate, ro=framing.rotate)
         # Group the camera, center the pivot, and animate the rotation
 
-        self.ui.build_progress.setValue(32)
         self.ui.status_label.setText('Grouping the camera setup...')
         logger.debug('Grouping the camera setup...')
-        cmds.group(n='_turntable_cam')
+        cmds.group(cam[0], n='_turntable_cam')
         cameras = cmds.listCameras(p=True, o=True)
         logger.debug('Set camera renderabilities for all cameras...')
         for camera in cameras:
@@ -1151,24 +1057,27 @@ class LazySiouxsie(QtGui.QWidget):
             else:
                 cmds.setAttr('%s.renderable' % camera, 0)
         logger.info('Camera setup complete!')
-        return [cam, bb_center, scene_bb, max_hypotenuse]
+        return [cam, bb_center, scene_bb, max_hypotenuse, bounds]
 
-    def animate_dome(self, trans=None, start=None, end=None):
-        logger.info('Animating %s...' % trans)
+    def turntable_arc(self):
+        """
+        The start and end rotation, in degrees, the set is keyed to spin through.
+        """
         rot_range_type = self.ui.full_circle.isChecked()
         if rot_range_type:
-            start_angle = 25.0
-            end_angle = -335.0
-        else:
-            start_angle = float(self.ui.from_range.text())
-            end_angle = float(self.ui.to_range.text())
+            return 25.0, -335.0
+        return float(self.ui.from_range.text()), float(self.ui.to_range.text())
+
+    def animate_dome(self, trans=None, start=None, end=None):
+        logger.info('Animating %s...' % trans)
+        start_angle, end_angle = self.turntable_arc()
         if trans:
             cmds.setKeyframe('%s.ry' % trans, v=start_angle, ott='linear', t=start)
             cmds.setKeyframe('%s.ry' % trans, v=end_angle, itt='linear', t=end)
 
-    def create_draft_version(self, version_name=None, layer=None):
-        version_title = '%s_%s' % (version_name, layer)
-        data = {
+    def draft_version_data(self, version_name=None, layer=None):
+        version_title = '%s_%s' % (version_name, layer) if layer else version_name
+        return {
             'project': {'type': 'Project', 'id': self.project_id},
             'description': 'Lazy Siouxsie Auto Turntable',
             'sg_status_list': 'rev',
@@ -1176,18 +1085,16 @@ class LazySiouxsie(QtGui.QWidget):
             'entity': {'type': 'Asset', 'id': self.entity_id},
             'sg_task': {'type': 'Task', 'id': self.tt_task}
         }
-        version_data = self.sg.shotgun.create('Version', data)
-        return version_data
 
     def submit_to_deadline(self, start=1, end=144, renderer=None, width=None, height=None, camera=None, layers=[]):
         logger.info('Submitting to Deadline...')
-        self.ui.build_progress.setValue(77)
-        self.ui.status_label.setText('Collect Deadline Pools...')
-        logger.debug('Collecting the Deadline Pools...')
-        all_pools = self.list_deadline_pools()
+        try:
+            farm = self.farm.metadata()
+        except Exception, e:
+            logger.warning('Could not get the farm pools from Deadline: %s' % e)
+            farm = {}
         ext = self.ui.render_format.currentText()
 
-        self.ui.build_progress.setValue(78)
         self.ui.status_label.setText('Setup Deadline Environments and Datetime...')
         logger.debug('Setup Deadline Environment and Datetime...')
         file_name = cmds.file(q=True, sn=True)
@@ -1201,242 +1108,216 @@ class LazySiouxsie(QtGui.QWidget):
         #  'extension': u'mb'}
         output_path = '%s/publish/renders/' % proj_root
         version = task['version']
-        t = 0
+        # One job renders every layer in a single Maya session, so the scene is loaded once per frame, not once per
+        # frame and layer.  Each layer still gets its own Version and movie, from a Draft job per layer.
+        single_job = self.ui.single_job.isChecked()
+        # Every layer's Shotgun Version for Draft, in one request
+        logger.info('Creating Shotgun Versions for %i layers...' % len(layers))
+        self.ui.status_label.setText('Creating Shotgun Versions...')
+        drafts, version_failures = create_versions(self.sg.shotgun, [
+            (str(layer), self.draft_version_data(version_name=base_name, layer=str(layer))) for layer in layers])
+        self.executor.on_rollback(lambda: delete_versions(self.sg.shotgun, list(drafts.values())))
+        failed_layers = dict(version_failures)
         logger.info('Parsing Render Layers into Render Jobs...')
+        logger.debug('Collecting user, resolution, frames and pool data...')
+        user_name = os.environ['USERNAME']
+        # Only the frames of the render slice are submitted; 0 degrees is every frame.
+        degree = float(self.ui.render_slices.currentText())
+        frames = slice_frame_list(start, end, degree)
+        logger.debug('Rendering frames %s for %s degree slices.' % (frames, degree))
+        # Progressive renders go out as coarse to fine passes, so there is something to review within minutes
+        passes = progressive_passes(start, end, degree) if self.ui.progressive.isChecked() else []
+        pool, group = choose_target(farm, renderer)
+        logger.debug('Submitting to pool %s, group %s.' % (pool, group))
+        scheduled = datetime.now().strftime('%d/%m/%Y %H:%M')
+        resolutionWidth = int(self.ui.res_width.text())
+        resolutionHeight = int(self.ui.res_height.text())
+        resolution_scale = self.ui.res_scale.currentText()
+        resolution_scale = float(resolution_scale.strip('%'))
+        resolution_scale /= 100
+        resolutionHeight *= resolution_scale
+        resolutionWidth *= resolution_scale
+        if cmds.about(q=True, w64=True):
+            win = '64bit'
+        else:
+            win = '32bit'
+        maya_version = cmds.about(q=True, v=True)
+
+        jobs = []
         for layer in layers:
             lyr = str(layer)
-            job_info = ''
-            plugin_info = ''
-            job_path = os.environ['TEMP'] + '\\_job_submissions'
-            logger.debug('Checking job submission path...')
-            if not os.path.exists(job_path):
-                os.mkdir(job_path)
-            logger.debug('Setting Job date and time...')
-            h = datetime.now().hour
-            m = datetime.now().minute
-            s = datetime.now().second
-            h = '%02d' % h
-            m = '%02d' % m
-            s = '%02d' % s
-            D = datetime.now().day
-            D = '%02d' % D
-            M = datetime.now().month
-            M = '%02d' % M
-            Y = datetime.now().year
-            d = '%s-%s-%s' % (D, M, Y)
-            d_flat = str(d).replace('-', '')
-            logger.debug('Creating job and plugin files...')
-            ji_filename = '%s_%s%s%s%s%s_jobInfo.job' % (base_name, d_flat, h, m, s, t)
-            ji_filepath = job_path + '\\' + ji_filename
-            pi_filename = '%s_%s%s%s%s%s_pluginInfo.job' % (base_name, d_flat, h, m, s, t)
-            pi_filepath = job_path + '\\' + pi_filename
-            job_info_file = open(ji_filepath, 'w+')
-            plugin_info_file = open(pi_filepath, 'w+')
-
-            # Create a Shotgun Version for Draft...
-            logger.info('Creating Shotgun Version for layer %s...' % lyr)
-            draft = self.create_draft_version(version_name=base_name, layer=lyr)
-
-            # Setup JobInfo
-            logger.debug('Collecting user, resolution, frames and pool data...')
-            user_name = os.environ['USERNAME']
-            frames = '%s-%s' % (start, end)
-            pool = None
-            for p in all_pools:
-                if renderer in p:
-                    pool = p
-                    break
-
+            draft = drafts.get(lyr)
+            if not draft:
+                continue
             version_name = '%s_%s' % (base_name, lyr)
 
-            resolutionWidth = int(self.ui.res_width.text())
-            resolutionHeight = int(self.ui.res_height.text())
-            resolution_scale = self.ui.res_scale.currentText()
-            resolution_scale = float(resolution_scale.strip('%'))
-            resolution_scale /= 100
-            resolutionHeight *= resolution_scale
-            resolutionWidth *= resolution_scale
-
-            self.ui.build_progress.setValue(79)
-            self.ui.status_label.setText('Create Job Info File...')
-            logger.debug('Creating Job Info File...')
-            job_info += 'Name=%s - %s\n' % (base_name, lyr)
-            job_info += 'BatchName=%s\n' % base_name
-            job_info += 'UserName=%s\n' % user_name
-            job_info += 'Region=none\n'
-            job_info += 'Comment=Lazy Siouxsie Automatic Turntable\n'
-            job_info += 'Frames=%s\n' % frames
-            job_info += 'Pool=%s\n' % pool
-            job_info += 'Priority=65\n'
-            job_info += 'Blacklist=\n'
-            job_info += 'MachineLimit=5\n'
-            job_info += 'ScheduledStartDateTime=%s/%s/%s %s:%s\n' % (D, M, Y, h, m)
-            job_info += 'ExtraInfo0=%s\n' % task['task_name']
-            job_info += 'ExtraInfo1=%s\n' % project
-            job_info += 'ExtraInfo2=%s\n' % task['Asset']
-            job_info += 'ExtraInfo3=%s\n' % version_name
-            job_info += 'ExtraInfo4=Lazy Siouxsie Auto Turntable\n'
-            job_info += 'ExtraInfo5=%s\n' % user_name
-            # Draft Submission details
-            # TODO: Rework the Draft Submission
-            # The following needs to be added after the main submission.
-            # Essentially, Submit the job, find the version ID that it created, and then amend the Job Properties with
-            # the following.  For now, it will just create 2 different versions that don't entirely work right.
-            # small price to pay for the moment.
-            job_info += 'ExtraInfoKeyValue0=UserName=%s\n' % user_name
-            job_info += 'ExtraInfoKeyValue1=DraftFrameRate=24\n'
-            job_info += 'ExtraInfoKeyValue2=DraftExtension=mov\n'
-            job_info += 'ExtraInfoKeyValue3=DraftCodec=h264\n'
-            job_info += 'ExtraInfoKeyValue4=DraftQuality=100\n'
-            job_info += 'ExtraInfoKeyValue5=Description=Lazy Siouxsie Turntable Draft\n'
-            job_info += 'ExtraInfoKeyValue6=ProjectName=%s\n' % project
-            job_info += 'ExtraInfoKeyValue7=EntityName=%s\n' % task['Asset']
-            job_info += 'ExtraInfoKeyValue8=EntityType=Asset\n'
-            job_info += 'ExtraInfoKeyValue9=DraftType=movie\n'
-            job_info += 'ExtraInfoKeyValue10=VersionId=%s\n' % draft['id']
-            job_info += 'ExtraInfoKeyValue11=DraftColorSpaceIn=Identity\n'
-            job_info += 'ExtraInfoKeyValue12=DraftColorSpaceOut=Identity\n'
-            job_info += 'ExtraInfoKeyValue13=VersionName=%s\n' % version_name
-            job_info += 'ExtraInfoKeyValue14=TaskId=-1\n'
-            job_info += 'ExtraInfoKeyValue15=ProjectId=%s\n' % self.project_id
-            job_info += 'ExtraInfoKeyValue16=DraftUploadToShotgun=True\n'
-            job_info += 'ExtraInfoKeyValue17=TaskName=%s\n' % task['task_name']
-            job_info += 'ExtraInfoKeyValue18=DraftResolution=1\n'
-            job_info += 'ExtraInfoKeyValue19=EntityId=%s\n' % self.entity_id
-            job_info += 'ExtraInfoKeyValue20=SubmitQuickDraft=True\n'
-            # End Draft Submission details
-            job_info += 'OverrideTaskExtraInfoNames=False\n'
-            job_info += 'MachineName=%s\n' % platform.node()
-            job_info += 'Plugin=MayaCmd\n'
-            output_file = '%s_%s.####.%s' % (layer, base_name, ext)
-            output_directory = '%s%s/%s/v%03d' % (output_path, task['task_name'], layer, version)
-            # output_directory = output_directory.replace('/', '\\')
-            job_info += 'OutputDirectory0=%s\n' % output_directory
-            job_info += 'OutputFilename0=%s\n' % output_file
-            job_info += 'EventOptIns='
-            job_info_file.write(job_info)
-            job_info_file.close()
+            # Setup JobInfo
+            logger.debug('Creating Job Info for %s...' % lyr)
+            job_info = {
+                'Name': '%s - %s' % (base_name, lyr),
+                'BatchName': base_name,
+                'UserName': user_name,
+                'Region': 'none',
+                'Comment': 'Lazy Siouxsie Automatic Turntable',
+                'Frames': frames,
+                'Pool': pool,
+                'Group': group,
+                'Priority': 65,
+                'Blacklist': '',
+                'MachineLimit': 5,
+                'ScheduledStartDateTime': scheduled,
+                'ExtraInfo0': task['task_name'],
+                'ExtraInfo1': project,
+                'ExtraInfo2': task['Asset'],
+                'ExtraInfo3': version_name,
+                'ExtraInfo4': 'Lazy Siouxsie Auto Turntable',
+                'ExtraInfo5': user_name,
+                # Draft Submission details
+                # TODO: Rework the Draft Submission
+                # The following needs to be added after the main submission.
+                # Essentially, Submit the job, find the version ID that it created, and then amend the Job Properties
+                # with the following.  For now, it will just create 2 different versions that don't entirely work
+                # right.  small price to pay for the moment.
+                'ExtraInfoKeyValue0': 'UserName=%s' % user_name,
+                'ExtraInfoKeyValue1': 'DraftFrameRate=24',
+                'ExtraInfoKeyValue2': 'DraftExtension=mov',
+                'ExtraInfoKeyValue3': 'DraftCodec=h264',
+                'ExtraInfoKeyValue4': 'DraftQuality=100',
+                'ExtraInfoKeyValue5': 'Description=Lazy Siouxsie Turntable Draft',
+                'ExtraInfoKeyValue6': 'ProjectName=%s' % project,
+                'ExtraInfoKeyValue7': 'EntityName=%s' % task['Asset'],
+                'ExtraInfoKeyValue8': 'EntityType=Asset',
+                'ExtraInfoKeyValue9': 'DraftType=movie',
+                'ExtraInfoKeyValue10': 'VersionId=%s' % draft['id'],
+                'ExtraInfoKeyValue11': 'DraftColorSpaceIn=Identity',
+                'ExtraInfoKeyValue12': 'DraftColorSpaceOut=Identity',
+                'ExtraInfoKeyValue13': 'VersionName=%s' % version_name,
+                'ExtraInfoKeyValue14': 'TaskId=-1',
+                'ExtraInfoKeyValue15': 'ProjectId=%s' % self.project_id,
+                'ExtraInfoKeyValue16': 'DraftUploadToShotgun=True',
+                'ExtraInfoKeyValue17': 'TaskName=%s' % task['task_name'],
+                'ExtraInfoKeyValue18': 'DraftResolution=1',
+                'ExtraInfoKeyValue19': 'EntityId=%s' % self.entity_id,
+                'ExtraInfoKeyValue20': 'SubmitQuickDraft=True',
+                # What the cost model learns render times against
+                'ExtraInfoKeyValue21': '%s=%s' % (RENDERER_KEY, renderer),
+                'ExtraInfoKeyValue22': '%s=%s' % (QUALITY_KEY, self.ui.quality_value.value()),
+                'ExtraInfoKeyValue23': '%s=%i' % (PIXELS_KEY, resolutionWidth * resolutionHeight),
+                # End Draft Submission details
+                'OverrideTaskExtraInfoNames': False,
+                'MachineName': platform.node(),
+                'Plugin': 'MayaCmd',
+                'OutputDirectory0': '%s%s/%s/v%03d' % (output_path, task['task_name'], layer, version),
+                'OutputFilename0': '%s_%s.####.%s' % (layer, base_name, ext),
+                'EventOptIns': ''
+            }
 
             # Setup PluginInfo
-            self.ui.build_progress.setValue(80)
-            self.ui.status_label.setText('Build Plugin Info File...')
-            logger.debug('Creating PluginInfo file...')
-            plugin_info += 'Animation=1\n'
-            plugin_info += 'Renderer=%s\n' % renderer
-            plugin_info += 'UsingRenderLayers=1\n'
-            plugin_info += 'RenderLayer=\n'
-            plugin_info += 'RenderHalfFrames=0\n'
-            plugin_info += 'FrameNumberOffset=0\n'
-            plugin_info += 'LocalRendering=0\n'
-            plugin_info += 'StrictErrorChecking=0\n'
-            plugin_info += 'MaxProcessors=0\n'
-            plugin_info += 'Version=%s\n' % cmds.about(q=True, v=True)
-            plugin_info += 'UsingLegacyRenderLayers=0\n'
-            if cmds.about(q=True, w64=True):
-                win = '64bit'
-            else:
-                win = '32bit'
-            plugin_info += 'Build=%s\n' % win
-            plugin_info += 'ProjectPath=%s\n' % proj_root
-            plugin_info += 'CommandLineOptions=\n'
-            plugin_info += 'ImageWidth=%s\n' % resolutionWidth
-            plugin_info += 'ImageHeight=%s\n' % resolutionHeight
-            plugin_info += 'OutputFilePath=%s\n' % output_path
-            plugin_info += 'OutputFilePrefix=\n'
-            plugin_info += 'Camera=%s\n' % camera[0]
-            plugin_info += 'Camera0=\nCamera1=%s\n' % camera[0]
-            plugin_info += 'Camera2=front\nCamera3=persp\nCamera4=side\nCamera5=top\n'
-            plugin_info += 'SceneFile=%s\n' % file_name
-            plugin_info += 'IgnoreError211=1\n'
-            plugin_info += 'UseOnlyCommandLineOptions=False\n'
-            plugin_info_file.write(plugin_info)
-            plugin_info_file.close()
-
-            self.ui.build_progress.setValue(81)
-            self.ui.status_label.setText('Getting slice status. Ignore 0 degrees...')
-            logger.debug('Getting slice status.  Ignoring 0 degrees...')
-            degree_slice = self.ui.render_slices.currentText()
-            degree = float(degree_slice)
-            frame_range = float(end - start + 1)
-            slice_mult = (frame_range/2) / 360.00
-            slice_frames = int(slice_mult * degree)
-            slice_frame = 0
-            try:
-                self.ui.build_progress.setValue(82)
-                self.ui.status_label.setText('Submitting the Job to Deadline...')
-                logger.info('Submitting the job to Deadline...')
-                submitted = self.dl.Jobs.SubmitJobFiles(ji_filepath, pi_filepath, idOnly=True)
-                # TODO: The following example is the basic idea behind submitting the python file:
-                # submitted = self.dl.Jobs.SubmitJobFiles(ji_filepath, pi_filepath, aux=[pythonFile], idOnly=True)
-                # How that's fully implemented remains to be figured out.
-
-                # Setup slice conditions here, to then suspend specific job tasks.
-                if submitted and degree != 0:
-                    self.ui.build_progress.setValue(83)
-                    self.ui.status_label.setText('Parsing Slices...')
-                    logger.info('Parsing slices....')
-                    job_id = submitted['_id']
-                    tasks = self.dl.Tasks.GetJobTasks(job_id)
-                    task_count = len(tasks)
-                    task_percent = 12.0 / float(task_count)
-                    percent = 84.0
-                    task_list = []
-                    for tsk in tasks['Tasks']:
-                        task_id = int(tsk['TaskID'])
-                        percent += task_percent
-                        if task_id != slice_frame:
-                            task_list.append(task_id)
-                        else:
-                            self.ui.build_progress.setValue(int(percent))
-                            self.ui.status_label.setText('Setting %i Frame to Render...' % task_id)
-                            logger.debug('Rendering frame %s' % task_id)
-                            slice_frame += slice_frames
-                    if task_list:
-                        logger.debug('Suspending non-sliced tasks...')
-                        self.dl.Tasks.SuspendJobTasks(jobId=job_id, taskIds=task_list)
-            except Exception, e:
-                submitted = False
-                logger.error('JOB SUBMISSION FAILED! %s' % e)
-            t += 1
-
-    def list_deadline_pools(self):
-        try:
-            # pools = ['none', 'maya_vray', 'nuke', 'maya_redshift', 'houdini', 'alembics', 'arnold', 'caching']
-            logger.debug('Return Deadline pools.')
-            pools = self.dl.Pools.GetPoolNames()
-        except Exception:
-            pools = []
-        return pools
+            plugin_info = {
+                'Animation': 1,
+                'Renderer': renderer,
+                'UsingRenderLayers': 1,
+                # Just this job's layer; a merged job renders every renderable layer instead
+                'RenderLayer': legacy_layer_name(lyr),
+                'RenderHalfFrames': 0,
+                'FrameNumberOffset': 0,
+                'LocalRendering': 0,
+                'StrictErrorChecking': 0,
+                'MaxProcessors': 0,
+                'Version': maya_version,
+                'UsingLegacyRenderLayers': 0,
+                'Build': win,
+                'ProjectPath': proj_root,
+                'CommandLineOptions': '',
+                'ImageWidth': resolutionWidth,
+                'ImageHeight': resolutionHeight,
+                'OutputFilePath': output_path,
+                'OutputFilePrefix': '',
+                'Camera': camera[0],
+                'Camera0': '',
+                'Camera1': camera[0],
+                'Camera2': 'front',
+                'Camera3': 'persp',
+                'Camera4': 'side',
+                'Camera5': 'top',
+                'SceneFile': file_name,
+                'IgnoreError211': 1,
+                'UseOnlyCommandLineOptions': False
+            }
+            jobs.append((lyr, job_info, plugin_info))
+        if len(passes) > 1:
+            logger.info('Rendering in %i passes: %s' % (len(passes), ', '.join(['%g' % p[0] for p in passes])))
+        frame_count = len(slice_frames(start, end, degree))
+        # (job name, chain, layers) of every chain of dependent jobs to submit
+        chains = []
+        if single_job and jobs:
+            logger.debug('Merging %i layers into one job...' % len(jobs))
+            merged = merge_layer_jobs(base_name, jobs)
+            # Each task renders every layer, which the cost model sees as that many more pixels per frame
+            merged[1]['ExtraInfoKeyValue23'] = '%s=%i' % (PIXELS_KEY, resolutionWidth * resolutionHeight * len(jobs))
+            chain = pass_jobs(merged, passes) if len(passes) > 1 else [merged]
+            # The merged job makes no movie, so every layer's Draft job follows it to make that layer's own
+            chain += [draft_job(job, frame_count) for job in jobs]
+            chains.append((base_name, chain, [job[0] for job in jobs]))
+        else:
+            for job in jobs:
+                if len(passes) > 1:
+                    # Passes make no movie; the Draft job encodes the whole slice once the last pass is done
+                    chain = pass_jobs(job, passes) + [draft_job(job, frame_count)]
+                else:
+                    chain = [job]
+                chains.append((job[0], chain, [job[0]]))
+
+        # Spooled held, as the farm renders the turntable file, which is only saved once the build is done.  The
+        # background flusher submits them from there, so the artist never waits on Deadline, and reports refusals.
+        keys = []
+        for job_name, chain, job_layers in chains:
+            metadata = {'layer': job_name, 'asset': task['Asset'], 'layers': job_layers,
+                        'versions': [drafts[name]['id'] for name in job_layers]}
+            key = self.spool.add(chain, metadata=metadata, held=True)
+            self.executor.on_rollback(lambda key=key: self.spool.drop(key))
+            keys.append(key)
+        self.build_data['spool_keys'] = keys
+        logger.info('Spooled %i Deadline submissions.' % len(keys))
+        if failed_layers:
+            for lyr in sorted(failed_layers):
+                logger.error('Layer %s was not submitted: %s' % (lyr, failed_layers[lyr]))
+            self.ui.status_label.setText('%i of %i layers failed to submit: %s' % (
+                len(failed_layers), len(layers), ', '.join(sorted(failed_layers))))
+        return failed_layers
+
+    @staticmethod
+    def spool_failed_callback(tk):
+        """
+        What the spool flusher does with a submission Deadline refused, or one set aside as never released: tell the
+        artist, and remove the Versions that would never get their movies.  It runs on the flusher's thread and
+        outlives the dialog, so it only holds on to the toolkit instance and warns through Maya's main thread.
+        """
+        drop_versions = version_cleanup(tk.shotgun)
+
+        def refused(result):
+            message = 'The turntable of %s was not submitted: %s' % (result.metadata.get('layer', result.key),
+                                                                      result.error)
+            maya.utils.executeDeferred(cmds.warning, message)
+            drop_versions(result)
+        return refused
 
     def do_preflight_check(self):
-        system_parts = [
-            '_Turntable_Set_Prep',
-            '_turntable_cam',
-            'turn_table_cam1',
-            '_HDRI_light',
-            '_turntable_ground_plane',
-            '_turntable_chrome_ball',
-            '_turntable_gray_ball'
-        ]
-        for part in system_parts:
-            if cmds.objExists(part):
-                self.ui.status_label.setText('Turntable parts are already found in the scene! Run from a clean scene.')
-                logger.warning('This scene has previous turntable configuration parts in it.  Open a clean file!')
-                return False
+        if self.inventory.leftover_parts():
+            self.ui.status_label.setText('Turntable parts are already found in the scene! Run from a clean scene.')
+            logger.warning('This scene has previous turntable configuration parts in it.  Open a clean file!')
+            return False
         file_name = cmds.file(q=True, sn=True)
         if self.turntable_task in file_name:
             self.ui.status_label.setText('It looks like this is already a turntable file. Run from a clean scene.')
             logger.warning('This is already a turntable file, and the setup should already be done.  Try running the '
                            'tool from a model or lookdev file.')
             return False
-        all_geo = cmds.ls(type=['mesh', 'nurbsSurface'])
-        grounds = []
-        for geo in all_geo:
-            if 'ground' in geo.lower():
-                grounds.append(geo)
+        grounds = self.inventory.ground_candidates()
         if grounds:
             self.ui.ground_plane.setChecked(False)
             logger.debug('Ground plane detected.  Turning off auto ground plane.')
-            self.ground_plane = grounds
+            self.artist_ground_plane = grounds
+            self.ground_plane = list(grounds)
         return True
 
@@ -0,0 +1,502 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Durable local spool of Deadline submissions.
+
+Every submission is written to the spool before Deadline is asked for anything: one JSON file per layer, holding its
+chain of jobs, the ids of the jobs that already made it to the farm and when to try again.  A background flusher
+drains the spool, backing off exponentially while the farm is down or slow, so a farm outage never costs an artist
+their turntable or keeps them waiting on the dialog.  Each job carries an idempotency key, so a submission whose reply
+got lost is found on the farm rather than sent twice.  Submissions Deadline refuses outright are set aside in
+failed/ for a person to look at.
+
+A submission can be spooled held, so it isn't sent until release() says the scene it renders is ready; one held for
+longer than HOLD_TIMEOUT was left by a build that never finished, and is set aside in failed/.  Whoever
+flushes a submission first claims it by exclusively creating "<key>.json.lock" next to it, so two threads, or two
+Maya sessions sharing the spool, never send the same submission together.
+
+The spool can be inspected and drained from a shell:
+
+    python submission_spool.py --spool <dir> list
+    python submission_spool.py --spool <dir> flush --host <web service host> --port <port> \
+        --shotgun <site url> --script <script name> --key <script key>
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import errno
+import random
+import socket
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+
+try:
+    import sgtk
+    logger = sgtk.platform.get_logger(__name__)
+except ImportError:
+    logger = logging.getLogger(__name__)
+
+try:
+    from .deadline_submitter import DeadlineSession, DeadlineError, submit_chain
+    from .draft_versions import delete_versions
+    from .file_utils import write_json
+except (ImportError, ValueError):
+    # Run from the command line, outside of the app
+    from deadline_submitter import DeadlineSession, DeadlineError, submit_chain
+    from draft_versions import delete_versions
+    from file_utils import write_json
+
+SPOOL_DIR = 'deadline_spool'
+FAILED_DIR = 'failed'
+# Retry delays, in seconds: BASE_DELAY doubled per failed attempt, up to MAX_DELAY
+BASE_DELAY = 5
+MAX_DELAY = 600
+MAX_WORKERS = 4
+# How long the flusher sleeps when there is nothing to do
+IDLE_POLL = 60
+LOCK_SUFFIX = '.lock'
+# A claim not touched for this long, in seconds, was left by a process that died while flushing
+CLAIM_TIMEOUT = 900
+# A submission held for this long, in seconds, was spooled by a build that crashed or never finished
+HOLD_TIMEOUT = 3600
+
+# What became of a flushed submission
+SUBMITTED = 'submitted'
+SPOOLED = 'spooled'
+FAILED = 'failed'
+
+
+class SpoolResult(object):
+    """
+    What happened to one spooled submission.
+    """
+
+    def __init__(self, key=None, state=None, job_ids=None, error=None, metadata=None):
+        self.key = key
+        self.state = state
+        self.job_ids = job_ids or []
+        self.error = error
+        self.metadata = metadata or {}
+
+    @property
+    def job_id(self):
+        """
+        The last job of the submission, the one that finishes it.
+        """
+        return self.job_ids[-1] if self.job_ids else None
+
+
+class SubmissionSpool(object):
+    """
+    Pending submissions, one file each, in spool_dir.
+    """
+
+    def __init__(self, spool_dir=None):
+        self.spool_dir = spool_dir
+
+    def add(self, chain, metadata=None, delay=0, held=False):
+        """
+        Spools a chain of (layer, job_info, plugin_info) jobs and returns its key.  A delay keeps the flusher off it
+        for that many seconds.  A held submission isn't sent at all until it is released.
+        """
+        entry = {
+            'key': uuid.uuid4().hex,
+            'created': time.time(),
+            'attempts': 0,
+            'next_attempt': None if held else time.time() + delay,
+            'uncertain': False,
+            'chain': [list(job) for job in chain],
+            'job_ids': [],
+            'metadata': metadata or {},
+            'error': None
+        }
+        self._write(self._path(entry['key']), entry)
+        return entry['key']
+
+    def entries(self, failed=False):
+        """
+        The spooled submissions, oldest first.  Those Deadline refused if failed is set.
+        """
+        directory = self._failed_dir() if failed else self.spool_dir
+        if not os.path.isdir(directory):
+            return []
+        entries = []
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            entry = self._read(os.path.join(directory, name))
+            if entry:
+                entries.append(entry)
+        return sorted(entries, key=lambda e: e['created'])
+
+    def get(self, key):
+        return self._read(self._path(key)) or self._read(self._path(key, failed=True))
+
+    def due(self, now=None):
+        """
+        The submissions whose next attempt is due.
+        """
+        now = time.time() if now is None else now
+        return [entry for entry in self.entries() if _is_due(entry, now)]
+
+    def next_attempt(self):
+        """
+        When the earliest pending submission is due, or None if nothing but held submissions are spooled.
+        """
+        attempts = [entry['next_attempt'] for entry in self.entries() if entry['next_attempt'] is not None]
+        if not attempts:
+            return None
+        return min(attempts)
+
+    def release(self, keys):
+        """
+        Lets held submissions go, due now.  Returns how many of them were held.
+        """
+        released = 0
+        for key in keys:
+            entry = self._read(self._path(key))
+            if entry and entry['next_attempt'] is None:
+                entry['next_attempt'] = time.time()
+                self._write(self._path(key), entry)
+                released += 1
+        return released
+
+    def retry(self, key):
+        """
+        Puts a failed submission back in the queue, due now.
+        """
+        entry = self._read(self._path(key, failed=True))
+        if not entry:
+            return False
+        entry.update({'attempts': 0, 'next_attempt': 0, 'error': None})
+        self._write(self._path(key), entry)
+        os.remove(self._path(key, failed=True))
+        return True
+
+    def drop(self, key):
+        """
+        Forgets a submission, pending or failed.
+        """
+        for path in (self._path(key), self._path(key, failed=True)):
+            if os.path.exists(path):
+                os.remove(path)
+                return True
+        return False
+
+    def flush(self, session, keys=None, force=False, workers=MAX_WORKERS, on_failed=None):
+        """
+        Submits the due submissions, or just those in keys, through a bounded pool sharing session.  force ignores
+        the back off, but a held submission is never sent before it is released.  Returns a SpoolResult per
+        submission it got to flush, or set aside as never released; those another thread or process is flushing are
+        left to it.  on_failed(result) is called for every submission Deadline refuses or that is set aside.
+        """
+        now = time.time()
+        results = self._expire_held(now)
+        entries = [entry for entry in self.entries()
+                   if entry['next_attempt'] is not None and (force or entry['next_attempt'] <= now)]
+        if keys is not None:
+            entries = [entry for entry in entries if entry['key'] in keys]
+        if entries:
+            pool = ThreadPool(max(1, min(workers, len(entries))))
+            try:
+                flushed = pool.map(lambda entry: self._flush_claimed(session, entry['key'], force), entries)
+            finally:
+                pool.close()
+                pool.join()
+            results.extend(result for result in flushed if result)
+        if on_failed:
+            for result in results:
+                if result.state == FAILED:
+                    on_failed(result)
+        return results
+
+    def _flush_claimed(self, session, key, force=False):
+        """
+        Flushes one submission if it can be claimed, and returns its SpoolResult, or None if it wasn't flushed.
+        """
+        if not self._claim(key):
+            logger.debug('Spooled submission %s is already being flushed.' % key)
+            return None
+        try:
+            # Read again now that it is ours, as whoever had it before may have submitted some of it, or all of it
+            entry = self._read(self._path(key))
+            if not entry or entry['next_attempt'] is None or not (force or _is_due(entry, time.time())):
+                return None
+            return self._flush_entry(session, entry)
+        finally:
+            self._release(key)
+
+    def _expire_held(self, now):
+        """
+        Sets aside, in failed/, the submissions held for longer than HOLD_TIMEOUT, and returns their SpoolResults.
+        """
+        results = []
+        for entry in self.entries():
+            if entry['next_attempt'] is not None or now - entry['created'] < HOLD_TIMEOUT:
+                continue
+            key = entry['key']
+            if not self._claim(key):
+                continue
+            try:
+                # Released, or dropped, in the meantime?
+                entry = self._read(self._path(key))
+                if not entry or entry['next_attempt'] is not None:
+                    continue
+                entry['error'] = 'Never released; the build that spooled it did not finish'
+                logger.warning('The submission of layer %s was never released, setting it aside.' % (
+                    entry['metadata'].get('layer', key)))
+                self._fail(entry)
+                results.append(SpoolResult(key, FAILED, entry['job_ids'], entry['error'], entry['metadata']))
+            finally:
+                self._release(key)
+        return results
+
+    def _flush_entry(self, session, entry):
+        def record(job_ids):
+            entry['job_ids'] = list(job_ids)
+            self._write(self._path(entry['key']), entry)
+            # Still flushing, however long the chain takes
+            os.utime(self._path(entry['key']) + LOCK_SUFFIX, None)
+
+        layer = entry['metadata'].get('layer', entry['key'])
+        try:
+            job_ids = submit_chain(session, entry['chain'], submission_key=entry['key'], job_ids=entry['job_ids'],
+                                   uncertain=entry['uncertain'], on_submitted=record)
+        except Exception as e:
+            entry['attempts'] += 1
+            entry['error'] = str(e)
+            if isinstance(e, DeadlineError) and not e.transient:
+                logger.error('JOB SUBMISSION FAILED for layer %s! %s' % (layer, e))
+                self._fail(entry)
+                return SpoolResult(entry['key'], FAILED, entry['job_ids'], entry['error'], entry['metadata'])
+            # The request may have reached the farm before the connection, or whatever else, went
+            entry['uncertain'] = not isinstance(e, DeadlineError)
+            entry['next_attempt'] = time.time() + backoff(entry['attempts'])
+            self._write(self._path(entry['key']), entry)
+            if isinstance(e, (DeadlineError, httplib.HTTPException, socket.error)):
+                logger.warning('Deadline is unavailable, layer %s stays spooled (attempt %i): %s' % (
+                    layer, entry['attempts'], e))
+            else:
+                logger.exception('Submitting layer %s failed, it stays spooled (attempt %i)' % (
+                    layer, entry['attempts']))
+            return SpoolResult(entry['key'], SPOOLED, entry['job_ids'], entry['error'], entry['metadata'])
+        _remove(self._path(entry['key']))
+        logger.info('Layer %s submitted as job %s.' % (layer, ', '.join(job_ids)))
+        return SpoolResult(entry['key'], SUBMITTED, job_ids, None, entry['metadata'])
+
+    def _fail(self, entry):
+        self._write(self._path(entry['key'], failed=True), entry)
+        _remove(self._path(entry['key']))
+
+    def _claim(self, key):
+        """
+        Claims a submission for this thread, unless someone else has.  A claim nobody touched in CLAIM_TIMEOUT is
+        taken over.
+        """
+        lock = self._path(key) + LOCK_SUFFIX
+        for attempt in range(2):
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            try:
+                if time.time() - os.path.getmtime(lock) < CLAIM_TIMEOUT:
+                    return False
+            except OSError:
+                # Released in the meantime
+                continue
+            logger.warning('Taking over the stale claim on spooled submission %s.' % key)
+            self._release(key)
+        return False
+
+    def _release(self, key):
+        try:
+            os.remove(self._path(key) + LOCK_SUFFIX)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logger.warning('Could not remove the claim on spooled submission %s: %s' % (key, e))
+
+    def _failed_dir(self):
+        return os.path.join(self.spool_dir, FAILED_DIR)
+
+    def _path(self, key, failed=False):
+        return os.path.join(self._failed_dir() if failed else self.spool_dir, '%s.json' % key)
+
+    def _read(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except IOError:
+            return None
+        except ValueError as e:
+            logger.warning('Ignoring unreadable spooled submission %s: %s' % (path, e))
+            return None
+
+    def _write(self, path, entry):
+        write_json(path, entry)
+
+
+def version_cleanup(sg):
+    """
+    An on_failed handler that removes the Shotgun Versions of a submission that will never render, as they would
+    never get their movies.
+    """
+    def drop_versions(result):
+        # Entries spooled before layers had a Version each name just the one
+        version_ids = result.metadata.get('versions') or [result.metadata.get('version')]
+        delete_versions(sg, [{'type': 'Version', 'id': version_id} for version_id in version_ids if version_id])
+    return drop_versions
+
+
+def _is_due(entry, now):
+    return entry['next_attempt'] is not None and entry['next_attempt'] <= now
+
+
+def _remove(path):
+    # The submission may have been dropped while it was being flushed
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def backoff(attempts):
+    """
+    Seconds to wait before attempt number attempts + 1, with some jitter so a farm coming back isn't hit by every
+    artist at once.
+    """
+    delay = min(BASE_DELAY * 2 ** max(attempts - 1, 0), MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class SpoolFlusher(object):
+    """
+    Drains a spool on a background thread, for as long as the session lasts.
+    """
+
+    def __init__(self, spool=None, session=None, on_failed=None):
+        self.spool = spool
+        self.session = session
+        self.on_failed = on_failed
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name='lazy_siouxsie_spool')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wake(self):
+        """
+        Looks at the spool now rather than when the next submission is due.
+        """
+        self._wake.set()
+
+    def _run(self):
+        failures = 0
+        while True:
+            try:
+                self.spool.flush(self.session, on_failed=self.on_failed)
+                next_attempt = self.spool.next_attempt()
+                wait = IDLE_POLL if next_attempt is None else min(max(next_attempt - time.time(), 1), IDLE_POLL)
+                failures = 0
+            except Exception as e:
+                # Not one submission but the spool itself is in trouble, so don't hammer it
+                failures += 1
+                wait = backoff(failures)
+                logger.error('Flushing the Deadline spool failed: %s' % e)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+
+# One flusher per spool directory, shared by every dialog in the session
+_FLUSHERS = {}
+_FLUSHERS_LOCK = threading.Lock()
+
+
+def start_flusher(spool_dir, session, on_failed=None):
+    """
+    Starts the background flusher of the spool in spool_dir, unless it is already running, and returns it.  Its
+    spool is the one to add submissions to, so they are never flushed twice at the same time.
+    """
+    with _FLUSHERS_LOCK:
+        flusher = _FLUSHERS.get(spool_dir)
+        if not flusher:
+            flusher = SpoolFlusher(spool=SubmissionSpool(spool_dir=spool_dir), session=session, on_failed=on_failed)
+            _FLUSHERS[spool_dir] = flusher
+            flusher.start()
+    return flusher
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Inspect and drain the Lazy Siouxsie Deadline submission spool.')
+    parser.add_argument('--spool', required=True, help='The spool directory, <app cache>/%s.' % SPOOL_DIR)
+    commands = parser.add_subparsers(dest='command')
+    list_command = commands.add_parser('list', help='List the pending submissions.')
+    list_command.add_argument('--failed', action='store_true', help='List the refused submissions instead.')
+    commands.add_parser('show', help='Print a submission.').add_argument('key')
+    flush_command = commands.add_parser('flush', help='Submit everything pending now, ignoring the back off.  '
+                                                      'Held submissions wait until they are released.')
+    flush_command.add_argument('--host', required=True)
+    flush_command.add_argument('--port', type=int, default=8082)
+    # Refused submissions' Versions are removed, as the app does
+    flush_command.add_argument('--shotgun', required=True, help='The Shotgun site URL.')
+    flush_command.add_argument('--script', required=True, help='A Shotgun script name.')
+    flush_command.add_argument('--key', required=True, help="The script's application key.")
+    commands.add_parser('release', help='Let a held submission go, once its file is saved.').add_argument('key')
+    commands.add_parser('retry', help='Queue a refused submission again.').add_argument('key')
+    commands.add_parser('drop', help='Forget a submission.').add_argument('key')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    spool = SubmissionSpool(spool_dir=args.spool)
+    if args.command == 'list':
+        for entry in spool.entries(failed=args.failed):
+            print('%s  %-24s  %i/%i jobs  %i attempts  %s' % (
+                entry['key'], entry['metadata'].get('layer', ''), len(entry['job_ids']), len(entry['chain']),
+                entry['attempts'], entry['error'] or ('held' if entry['next_attempt'] is None else '')))
+    elif args.command == 'show':
+        entry = spool.get(args.key)
+        if not entry:
+            return 1
+        print(json.dumps(entry, indent=2, sort_keys=True))
+    elif args.command == 'flush':
+        import shotgun_api3
+        sg = shotgun_api3.Shotgun(args.shotgun, script_name=args.script, api_key=args.key)
+        results = spool.flush(DeadlineSession(host=args.host, port=args.port), force=True,
+                              on_failed=version_cleanup(sg))
+        return 0 if all(result.state == SUBMITTED for result in results) else 1
+    elif args.command == 'release':
+        return 0 if spool.release([args.key]) else 1
+    elif args.command == 'retry':
+        return 0 if spool.retry(args.key) else 1
+    elif args.command == 'drop':
+        return 0 if spool.drop(args.key) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
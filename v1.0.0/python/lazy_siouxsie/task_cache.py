@@ -0,0 +1,126 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Cached lookups of the turntable Task of an Asset and of Pipeline Step ids.
+
+Shotgun is only asked for the one Task that matches, filtered on the server, and only when it isn't already known.
+Answers are kept in memory for the session and on disk between sessions, so batch runs over many assets don't repeat
+the same queries.  Creating a Task replaces whatever was cached for that Asset.
+"""
+
+import sgtk
+import os
+import json
+import time
+import threading
+
+from .file_utils import write_json
+logger = sgtk.platform.get_logger(__name__)
+
+CACHE_FILE = 'shotgun_ids.json'
+
+
+class TaskCache(object):
+    """
+    Asset -> turntable Task ids and Step code -> Step ids.
+    """
+
+    def __init__(self, tk=None, cache_dir=None, ttl=86400):
+        self.tk = tk
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = {'tasks': {}, 'steps': {}}
+        self._load()
+
+    def task_id(self, asset_id, content):
+        """
+        The id of the Task named content on an Asset, or None if there isn't one.
+        """
+        key = '%s/%s' % (asset_id, content)
+        task_id = self._get('tasks', key)
+        if task_id:
+            return task_id
+        filters = [
+            ['entity', 'is', {'type': 'Asset', 'id': asset_id}],
+            ['content', 'is', content]
+        ]
+        task = self.tk.shotgun.find_one('Task', filters, ['id'])
+        if not task:
+            return None
+        self._put('tasks', key, task['id'])
+        return task['id']
+
+    def step_id(self, code):
+        """
+        The id of the Step with code, or None if there isn't one.
+        """
+        step_id = self._get('steps', code)
+        if step_id:
+            return step_id
+        step = self.tk.shotgun.find_one('Step', [['code', 'is', code]], ['id'])
+        if not step:
+            return None
+        self._put('steps', code, step['id'])
+        return step['id']
+
+    def create_task(self, project_id, asset_id, content, step_code):
+        """
+        Creates the Task on the Asset and caches it in place of whatever was known before.
+        """
+        step_id = self.step_id(step_code)
+        if not step_id:
+            raise ValueError('There is no "%s" Step on Shotgun to create the %s task under.' % (step_code, content))
+        task_data = {
+            'project': {'type': 'Project', 'id': project_id},
+            'entity': {'type': 'Asset', 'id': asset_id},
+            'content': content,
+            'step': {'type': 'Step', 'id': step_id},
+        }
+        new_task = self.tk.shotgun.create('Task', task_data)
+        self._put('tasks', '%s/%s' % (asset_id, content), new_task['id'])
+        return new_task
+
+    def _get(self, kind, key):
+        with self._lock:
+            cached = self._ids[kind].get(key)
+        if cached and time.time() - cached[1] <= self.ttl:
+            return cached[0]
+        return None
+
+    def _put(self, kind, key, value):
+        with self._lock:
+            self._ids[kind][key] = [value, time.time()]
+        self._save()
+
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, CACHE_FILE)
+
+    def _load(self):
+        if not self.cache_dir or not os.path.isfile(self._cache_file()):
+            return
+        try:
+            with open(self._cache_file(), 'r') as f:
+                data = json.load(f)
+            for kind in self._ids:
+                self._ids[kind].update(data.get(kind, {}))
+        except (IOError, ValueError) as e:
+            logger.warning('Ignoring unreadable Shotgun id cache: %s' % e)
+
+    def _save(self):
+        if not self.cache_dir:
+            return
+        with self._lock:
+            data = dict((kind, dict(ids)) for kind, ids in self._ids.items())
+        try:
+            write_json(self._cache_file(), data)
+        except (IOError, OSError) as e:
+            logger.warning('Could not write the Shotgun id cache: %s' % e)
@@ -39,11 +39,18 @@ class Ui_lazySiouxsie(object):
         self.hdri_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignTop)
         self.hdri_label.setObjectName("hdri_label")
         self.horizontalLayout.addWidget(self.hdri_label)
-        self.hdriList = QtGui.QListWidget(lazySiouxsie)
+        self.verticalLayout_3 = QtGui.QVBoxLayout()
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.hdri_filter = QtGui.QLineEdit(lazySiouxsie)
+        self.hdri_filter.setObjectName("hdri_filter")
+        self.verticalLayout_3.addWidget(self.hdri_filter)
+        self.hdriList = QtGui.QListView(lazySiouxsie)
         self.hdriList.setAlternatingRowColors(True)
         self.hdriList.setSelectionMode(QtGui.QAbstractItemView.MultiSelection)
+        self.hdriList.setUniformItemSizes(True)
         self.hdriList.setObjectName("hdriList")
-        self.horizontalLayout.addWidget(self.hdriList)
+        self.verticalLayout_3.addWidget(self.hdriList)
+        self.horizontalLayout.addLayout(self.verticalLayout_3)
         self.verticalLayout_2.addLayout(self.horizontalLayout)
         self.horizontalLayout_3 = QtGui.QHBoxLayout()
         self.horizontalLayout_3.setObjectName("horizontalLayout_3")
@@ -234,6 +241,10 @@ class Ui_lazySiouxsie(object):
         self.degreeLabel = QtGui.QLabel(lazySiouxsie)
         self.degreeLabel.setObjectName("degreeLabel")
         self.horizontalLayout_7.addWidget(self.degreeLabel)
+        self.progressive = QtGui.QCheckBox(lazySiouxsie)
+        self.progressive.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.progressive.setObjectName("progressive")
+        self.horizontalLayout_7.addWidget(self.progressive)
         self.verticalLayout_2.addLayout(self.horizontalLayout_7)
         self.horizontalLayout_11 = QtGui.QHBoxLayout()
         self.horizontalLayout_11.setObjectName("horizontalLayout_11")
@@ -269,6 +280,29 @@ class Ui_lazySiouxsie(object):
         self.quality_value.setObjectName("quality_value")
         self.horizontalLayout_10.addWidget(self.quality_value)
         self.verticalLayout_2.addLayout(self.horizontalLayout_10)
+        self.horizontalLayout_14 = QtGui.QHBoxLayout()
+        self.horizontalLayout_14.setObjectName("horizontalLayout_14")
+        self.cost_estimate = QtGui.QLabel(lazySiouxsie)
+        self.cost_estimate.setObjectName("cost_estimate")
+        self.horizontalLayout_14.addWidget(self.cost_estimate)
+        self.farm_target = QtGui.QLabel(lazySiouxsie)
+        self.farm_target.setObjectName("farm_target")
+        self.horizontalLayout_14.addWidget(self.farm_target)
+        spacerItem10 = QtGui.QSpacerItem(40, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
+        self.horizontalLayout_14.addItem(spacerItem10)
+        self.fit_to_budget = QtGui.QCheckBox(lazySiouxsie)
+        self.fit_to_budget.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.fit_to_budget.setObjectName("fit_to_budget")
+        self.horizontalLayout_14.addWidget(self.fit_to_budget)
+        self.budget_hours = QtGui.QDoubleSpinBox(lazySiouxsie)
+        self.budget_hours.setEnabled(False)
+        self.budget_hours.setDecimals(0)
+        self.budget_hours.setMinimum(1.0)
+        self.budget_hours.setMaximum(100000.0)
+        self.budget_hours.setProperty("value", 200.0)
+        self.budget_hours.setObjectName("budget_hours")
+        self.horizontalLayout_14.addWidget(self.budget_hours)
+        self.verticalLayout_2.addLayout(self.horizontalLayout_14)
         self.horizontalLayout_9 = QtGui.QHBoxLayout()
         self.horizontalLayout_9.setObjectName("horizontalLayout_9")
         self.scene_lights = QtGui.QCheckBox(lazySiouxsie)
@@ -297,6 +331,10 @@ class Ui_lazySiouxsie(object):
         self.open_turntable = QtGui.QCheckBox(lazySiouxsie)
         self.open_turntable.setObjectName("open_turntable")
         self.horizontalLayout_13.addWidget(self.open_turntable)
+        self.single_job = QtGui.QCheckBox(lazySiouxsie)
+        self.single_job.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.single_job.setObjectName("single_job")
+        self.horizontalLayout_13.addWidget(self.single_job)
         self.submit_to_deadline = QtGui.QCheckBox(lazySiouxsie)
         self.submit_to_deadline.setLayoutDirection(QtCore.Qt.RightToLeft)
         self.submit_to_deadline.setChecked(True)
@@ -350,7 +388,6 @@ class Ui_lazySiouxsie(object):
         self.quality_label.setBuddy(self.quality_slider)
 
         self.retranslateUi(lazySiouxsie)
-        self.hdriList.setCurrentRow(-1)
         self.res_scale.setCurrentIndex(3)
         QtCore.QObject.connect(self.quality_slider, QtCore.SIGNAL("valueChanged(int)"), self.quality_value.setValue)
         QtCore.QObject.connect(self.quality_value, QtCore.SIGNAL("valueChanged(int)"), self.quality_slider.setValue)
@@ -363,12 +400,16 @@ class Ui_lazySiouxsie(object):
         lazySiouxsie.setTabOrder(self.res_scale, self.camera_height)
         lazySiouxsie.setTabOrder(self.camera_height, self.rendering_engine)
         lazySiouxsie.setTabOrder(self.rendering_engine, self.render_slices)
-        lazySiouxsie.setTabOrder(self.render_slices, self.render_format)
+        lazySiouxsie.setTabOrder(self.render_slices, self.progressive)
+        lazySiouxsie.setTabOrder(self.progressive, self.render_format)
         lazySiouxsie.setTabOrder(self.render_format, self.quality_value)
-        lazySiouxsie.setTabOrder(self.quality_value, self.scene_lights)
+        lazySiouxsie.setTabOrder(self.quality_value, self.fit_to_budget)
+        lazySiouxsie.setTabOrder(self.fit_to_budget, self.budget_hours)
+        lazySiouxsie.setTabOrder(self.budget_hours, self.scene_lights)
         lazySiouxsie.setTabOrder(self.scene_lights, self.ground_plane)
         lazySiouxsie.setTabOrder(self.ground_plane, self.chrome_balls)
-        lazySiouxsie.setTabOrder(self.chrome_balls, self.submit_to_deadline)
+        lazySiouxsie.setTabOrder(self.chrome_balls, self.single_job)
+        lazySiouxsie.setTabOrder(self.single_job, self.submit_to_deadline)
         lazySiouxsie.setTabOrder(self.submit_to_deadline, self.full_circle)
         lazySiouxsie.setTabOrder(self.full_circle, self.partial_circle)
         lazySiouxsie.setTabOrder(self.partial_circle, self.from_range)
@@ -377,7 +418,8 @@ class Ui_lazySiouxsie(object):
         lazySiouxsie.setTabOrder(self.res_width, self.res_height)
         lazySiouxsie.setTabOrder(self.res_height, self.pixel_aspect)
         lazySiouxsie.setTabOrder(self.pixel_aspect, self.quality_slider)
-        lazySiouxsie.setTabOrder(self.quality_slider, self.hdriList)
+        lazySiouxsie.setTabOrder(self.quality_slider, self.hdri_filter)
+        lazySiouxsie.setTabOrder(self.hdri_filter, self.hdriList)
         lazySiouxsie.setTabOrder(self.hdriList, self.custom_hdri)
         lazySiouxsie.setTabOrder(self.custom_hdri, self.total_frames)
         lazySiouxsie.setTabOrder(self.total_frames, self.file_path)
@@ -394,6 +436,10 @@ class Ui_lazySiouxsie(object):
         self.file_path.setPlaceholderText(QtGui.QApplication.translate("lazySiouxsie", "The Current File to be sent to the farm", None))
         self.hdri_label.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "HDRII list provided by a Shotgun directory of Studio HDRIs", None))
         self.hdri_label.setText(QtGui.QApplication.translate("lazySiouxsie", "HDRIs", None))
+        self.hdri_filter.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Type to filter the HDRI list", None))
+        self.hdri_filter.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "Type to filter the HDRI list", None))
+        self.hdri_filter.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "Type to filter the HDRI list", None))
+        self.hdri_filter.setPlaceholderText(QtGui.QApplication.translate("lazySiouxsie", "Filter HDRIs...", None))
         self.hdriList.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "HDRI list provided by a Shotgun directory of Studio HDRIs", None))
         self.hdriList.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "HDRI list provided by a Shotgun directory of Studio HDRIs", None))
         self.hdriList.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "HDRI list provided by a Shotgun directory of Studio HDRIs", None))
@@ -476,13 +522,13 @@ class Ui_lazySiouxsie(object):
         self.rendering_engine.setItemText(2, QtGui.QApplication.translate("lazySiouxsie", "redshift", None))
         self.rendering_engine.setItemText(3, QtGui.QApplication.translate("lazySiouxsie", "renderman", None))
         self.rendering_engine.setItemText(4, QtGui.QApplication.translate("lazySiouxsie", "mayasoftware", None))
-        self.render_slices_label.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
-        self.render_slices_label.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
-        self.render_slices_label.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
+        self.render_slices_label.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
+        self.render_slices_label.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
+        self.render_slices_label.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
         self.render_slices_label.setText(QtGui.QApplication.translate("lazySiouxsie", "Render Slices", None))
-        self.render_slices.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
-        self.render_slices.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
-        self.render_slices.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. All frames will be submitted to the farm, but only frames at the chosen angle will automatically be rendered, leaving the remaining frames suspended. 0° renders all frames", None))
+        self.render_slices.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
+        self.render_slices.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
+        self.render_slices.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "The render slices set a percentage of frames to be rendered based on rotational degrees. Only the frames at the chosen angle are submitted to the farm. 0° renders all frames", None))
         self.render_slices.setItemText(0, QtGui.QApplication.translate("lazySiouxsie", "0", None))
         self.render_slices.setItemText(1, QtGui.QApplication.translate("lazySiouxsie", "5", None))
         self.render_slices.setItemText(2, QtGui.QApplication.translate("lazySiouxsie", "10", None))
@@ -532,6 +578,14 @@ class Ui_lazySiouxsie(object):
         self.quality_value.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The quality setting for the renderer.  ", None))
         self.quality_value.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "The quality setting for the renderer.  ", None))
         self.quality_value.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "The quality setting for the renderer.  ", None))
+        self.cost_estimate.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Estimated farm cost of the turntable, from the render times of previous turntables.", None))
+        self.cost_estimate.setText(QtGui.QApplication.translate("lazySiouxsie", "Estimated farm time: -", None))
+        self.farm_target.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "The Deadline pool and group the turntable will be submitted to, from the cached farm metadata.", None))
+        self.farm_target.setText(QtGui.QApplication.translate("lazySiouxsie", "Farm: -", None))
+        self.fit_to_budget.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Pick the highest quality that fits in the farm budget.", None))
+        self.fit_to_budget.setText(QtGui.QApplication.translate("lazySiouxsie", "Fit to budget", None))
+        self.budget_hours.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Farm budget for the whole turntable, in core-hours.", None))
+        self.budget_hours.setSuffix(QtGui.QApplication.translate("lazySiouxsie", " core-hours", None))
         self.scene_lights.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "When checked, any lights created in the scene will be rendered as one of the render passes.  Otherwise the existing lights will be ignored.", None))
         self.scene_lights.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "When checked, any lights created in the scene will be rendered as one of the render passes.  Otherwise the existing lights will be ignored.", None))
         self.scene_lights.setText(QtGui.QApplication.translate("lazySiouxsie", "Use Scene Lights", None))
@@ -544,6 +598,12 @@ class Ui_lazySiouxsie(object):
         self.chrome_balls.setWhatsThis(QtGui.QApplication.translate("lazySiouxsie", "Automatically generate Chrome and 50% Gray Spheres", None))
         self.chrome_balls.setText(QtGui.QApplication.translate("lazySiouxsie", "Auto Chrome Balls", None))
         self.open_turntable.setText(QtGui.QApplication.translate("lazySiouxsie", "Open Turntable File When Finished", None))
+        self.progressive.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Render every 45°, then every 15°, then the remaining frames, as dependent jobs, so a first pass is ready to review quickly.", None))
+        self.progressive.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "Render every 45°, then every 15°, then the remaining frames, as dependent jobs, so a first pass is ready to review quickly.", None))
+        self.progressive.setText(QtGui.QApplication.translate("lazySiouxsie", "Coarse to Fine", None))
+        self.single_job.setToolTip(QtGui.QApplication.translate("lazySiouxsie", "Submit one Deadline job that renders every layer per frame, so the scene is loaded once instead of once per layer. Each layer still gets its own Shotgun Version, whose movie a small Draft job makes once the frames are done.", None))
+        self.single_job.setStatusTip(QtGui.QApplication.translate("lazySiouxsie", "Submit one Deadline job that renders every layer per frame, so the scene is loaded once instead of once per layer. Each layer still gets its own Shotgun Version, whose movie a small Draft job makes once the frames are done.", None))
+        self.single_job.setText(QtGui.QApplication.translate("lazySiouxsie", "One Job for All Layers", None))
         self.submit_to_deadline.setText(QtGui.QApplication.translate("lazySiouxsie", "Submit to Deadline", None))
         self.status_label.setText(QtGui.QApplication.translate("lazySiouxsie", "Ready...", None))
         self.cancel_btn.setText(QtGui.QApplication.translate("lazySiouxsie", "Cancel", None))
@@ -0,0 +1,149 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Version numbers of the files in a work area, and race free reservation of the next one.
+
+A directory is streamed once with scandir and the highest _v### in it is kept, keyed on the directory's mtime, so
+asking again costs a single stat until something is added or removed.  Versions are compared as numbers, so _v100
+comes after _v99.  The next version is claimed by exclusively creating "<file>.lock" next to it: only one artist or
+farm worker can create it, and everybody else's scan sees the version as taken from then on.  A claim older than
+LOCK_TIMEOUT was left by a session that died before saving, and is removed by the next reservation in its directory.
+"""
+
+import sgtk
+import os
+import re
+import time
+import errno
+import threading
+
+from .file_utils import scandir
+logger = sgtk.platform.get_logger(__name__)
+
+VERSION_PATTERN = re.compile(r'_[vV](\d+)')
+LOCK_SUFFIX = '.lock'
+DEFAULT_PADDING = 3
+# How many taken versions to step over before giving up on a reservation
+MAX_ATTEMPTS = 100
+# Seconds after which a claim that was never released is taken to be left over from a crash
+LOCK_TIMEOUT = 3600
+
+
+class VersionIndex(object):
+    """
+    Highest version per directory, cached on the directory mtime.
+    """
+
+    def __init__(self):
+        # directory: (mtime, version, padding)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def latest(self, directory):
+        """
+        The highest version in directory and its zero padding.  (0, DEFAULT_PADDING) if there are none.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return 0, DEFAULT_PADDING
+        with self._lock:
+            cached = self._cache.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        version, padding = scan_versions(directory)
+        with self._lock:
+            self._cache[directory] = (mtime, version, padding)
+        return version, padding
+
+    def reserve(self, directory, prefix, extension='.mb'):
+        """
+        Claims the next version of "<prefix>_v###<extension>" in directory and returns its path.  The claim holds
+        until release() is called, normally once the file itself has been saved.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.reclaim_stale(directory)
+        version, padding = self.latest(directory)
+        for attempt in range(MAX_ATTEMPTS):
+            version += 1
+            path = '%s/%s_v%0*d%s' % (directory, prefix, padding, version, extension)
+            if os.path.exists(path):
+                continue
+            try:
+                handle = os.open(path + LOCK_SUFFIX, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    logger.debug('Version %s is already claimed, trying the next one.' % version)
+                    continue
+                raise
+            os.close(handle)
+            with self._lock:
+                self._cache.pop(directory, None)
+            return path
+        raise IOError('Could not claim a new version in %s after %i tries.' % (directory, MAX_ATTEMPTS))
+
+    def reclaim_stale(self, directory, timeout=LOCK_TIMEOUT):
+        """
+        Removes the claims in directory older than timeout, so versions burnt by a crash can be used again.
+        """
+        now = time.time()
+        for name in _list_names(directory):
+            if not name.endswith(LOCK_SUFFIX):
+                continue
+            lock = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(lock) < timeout:
+                    continue
+                os.remove(lock)
+            except OSError as e:
+                # Somebody else got to it first
+                if e.errno != errno.ENOENT:
+                    logger.warning('Could not remove the stale version lock %s: %s' % (lock, e))
+                continue
+            logger.warning('Removed the stale version lock %s.' % lock)
+            with self._lock:
+                self._cache.pop(directory, None)
+
+    def release(self, path):
+        """
+        Drops the claim on a reserved path.
+        """
+        try:
+            os.remove(path + LOCK_SUFFIX)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logger.warning('Could not remove the version lock of %s: %s' % (path, e))
+
+
+def scan_versions(directory):
+    """
+    The highest version of any file (or claim) in directory, and the padding it is written with.
+    """
+    version = 0
+    padding = DEFAULT_PADDING
+    for name in _list_names(directory):
+        for match in VERSION_PATTERN.finditer(name):
+            number = int(match.group(1))
+            if number > version:
+                version = number
+                padding = len(match.group(1))
+    return version, padding
+
+
+def _list_names(directory):
+    if scandir is None:
+        return os.listdir(directory)
+    return [entry.name for entry in scandir(directory)]
+
+
+# Shared by every dialog in the session, so the per directory cache outlives a single build.
+VERSION_INDEX = VersionIndex()